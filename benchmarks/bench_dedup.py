@@ -0,0 +1,98 @@
+"""
+Times MinHash signatures and LSH lookups for near-duplicate detection, and checks
+which resume variants are caught at DEDUP_THRESHOLD.
+
+Run from the repository root:
+    python -m benchmarks.bench_dedup --indexed 2000
+"""
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from benchmarks.bench_skill_matcher import FILLER, TECHNOLOGIES
+from config import DEDUP_THRESHOLD
+from utils.dedup import NearDuplicateIndex, minhash_signature, similarity
+
+
+def make_resume_text(rng, seed, roles=6):
+    lines = [f"Candidate {seed}", f"candidate{seed}@example.com | Pune, India", "EXPERIENCE"]
+    for index in range(roles):
+        lines.append(f"Company {rng.randrange(500)} - {rng.choice(['Engineer', 'Analyst', 'Lead'])} "
+                     f"(Jan {2005 + index} – Dec {2006 + index})")
+        words = [rng.choice(FILLER + tuple(TECHNOLOGIES)) for _ in range(45)]
+        lines.append(" ".join(words) + ".")
+    lines.append("SKILLS")
+    lines.append(" | ".join(rng.sample(TECHNOLOGIES, 12)))
+    return "\n".join(lines)
+
+
+def variants(rng, text):
+    """
+    (label, text, expected duplicate?) variants of one resume.
+    """
+    lines = text.splitlines()
+    edited = list(lines)
+    edited[4] = edited[4].replace(" ", "  ", 3) + " Promoted twice."
+    reflowed = " ".join(text.split())  # what a PDF vs DOCX export difference looks like
+    extra_role = lines + ["Company 999 - Engineer (Jan 2024 – Present)", "Led migration of billing services."]
+    return [
+        ("exact copy", text, True),
+        ("re-exported (reflowed)", reflowed, True),
+        ("minor edit", "\n".join(edited), True),
+        ("one more role", "\n".join(extra_role), True),
+        ("other candidate", make_resume_text(rng, -1), False),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--indexed", type=int, default=2000, help="resumes already in the index")
+    parser.add_argument("--probes", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    texts = [make_resume_text(rng, seed) for seed in range(args.indexed)]
+
+    start = time.perf_counter()
+    signatures = [minhash_signature(text) for text in texts]
+    signature_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+    folder = tempfile.mkdtemp(prefix="bench-dedup-")
+    try:
+        index = NearDuplicateIndex(os.path.join(folder, "dedup.sqlite3"))
+        start = time.perf_counter()
+        for seed, signature in enumerate(signatures):
+            index.add(f"resume_{seed}.pdf", signature)
+        add_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+        caught = {}
+        lookup_seconds = []
+        for seed in rng.sample(range(args.indexed), min(args.probes, args.indexed)):
+            for label, text, expected in variants(rng, texts[seed]):
+                signature = minhash_signature(text)
+                start = time.perf_counter()
+                match = index.match(signature)
+                lookup_seconds.append(time.perf_counter() - start)
+                hit = match is not None and match["path"] == f"resume_{seed}.pdf"
+                true_similarity = similarity(signature, signatures[seed])
+                stats = caught.setdefault(label, [0, 0, expected, []])
+                stats[0] += hit
+                stats[1] += 1
+                stats[3].append(true_similarity)
+        index.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    lookup_seconds.sort()
+    print(f"{args.indexed} indexed resumes, threshold {DEDUP_THRESHOLD}: signature {signature_ms:.2f} ms, "
+          f"add {add_ms:.2f} ms, lookup p50 {lookup_seconds[len(lookup_seconds) // 2] * 1000:.2f} ms")
+    print(f"{'variant':<24} {'flagged':>8} {'expected':>9} {'mean sim':>9}")
+    for label, (hits, total, expected, scores) in caught.items():
+        print(f"{label:<24} {hits:>4}/{total:<3} {'dup' if expected else 'unique':>9} {sum(scores) / len(scores):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Runs several worker processes against one job queue per backend and checks the
+queue's guarantees:
+- every job is completed exactly once, by one worker;
+- jobs leased by a worker that crashed are re-queued when the lease expires;
+- jobs that keep failing end up dead-lettered after JOB_MAX_ATTEMPTS;
+- with utils.worker.work (pipeline stubbed out), a worker whose leases ran out
+  mid-batch completes none of those jobs, every job is completed once, and the
+  summary / search index are rebuilt exactly once after the queue drains.
+
+Run from the repository root (exits non-zero if a check fails):
+    python -m benchmarks.bench_job_queue --jobs 2000 --workers 4
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+from config import JOB_MAX_ATTEMPTS
+from utils.job_queue import DEAD, DONE, JOB_QUEUE_BACKENDS, open_job_queue
+from utils.run_manifest import STAGES, RunManifest, file_hash
+
+LEASE_SECONDS = 1.0
+
+
+def _drain(backend, location, worker, batch, results, crash_after=None):
+    """
+    Claims and "processes" jobs until the queue is empty. Poison jobs fail; with
+    `crash_after`, the worker exits holding its leases once it has that many.
+    """
+    job_queue = open_job_queue(backend, location, lease_seconds=LEASE_SECONDS)
+    completed = []
+    while True:
+        jobs = job_queue.claim(worker, limit=batch)
+        if not jobs:
+            stats = job_queue.stats()
+            if not stats["queued"] and not stats["leased"]:
+                break
+            time.sleep(0.05)
+            continue
+        if crash_after is not None and len(jobs) >= crash_after:
+            os._exit(0)  # dies mid-batch: no complete/fail, no more heartbeats
+        for job in jobs:
+            if "poison" in job["path"]:
+                job_queue.fail(worker, job["id"], "poison resume")
+            elif job_queue.complete(worker, job["id"], ["extract", "llm"]):
+                completed.append(job["path"])
+    job_queue.close()
+    if results is not None:
+        results.put((worker, completed))
+
+
+def run_backend(backend, folder, paths, workers, batch):
+    location = os.path.join(folder, "jobs.sqlite3" if backend == "sqlite" else "jobs")
+    job_queue = open_job_queue(backend, location, lease_seconds=LEASE_SECONDS)
+    start = time.perf_counter()
+    added = job_queue.add(paths)
+    add_seconds = time.perf_counter() - start
+    readded = job_queue.add(paths)
+
+    # A worker first leases a batch and dies with it; the others must pick it up
+    crasher = multiprocessing.Process(target=_drain, args=(backend, location, "crasher", batch, None),
+                                      kwargs={"crash_after": 1})
+    crasher.start()
+    crasher.join()
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_drain, args=(backend, location, f"worker-{index}", batch, results))
+        for index in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    completions = [results.get() for _ in range(workers)]
+    for process in processes:
+        process.join()
+    drain_seconds = time.perf_counter() - start
+
+    done_by = {}
+    for worker, paths_done in completions:
+        for path in paths_done:
+            done_by.setdefault(path, []).append(worker)
+    jobs = {job["path"]: job for job in job_queue.jobs()}
+    job_queue.close()
+
+    normal = [path for path in paths if "poison" not in path]
+    poison = [path for path in paths if "poison" in path]
+    failures = []
+    if added != len(paths) or readded:
+        failures.append(f"add queued {added} then {readded} (expected {len(paths)} then 0)")
+    twice = [path for path, by in done_by.items() if len(by) > 1]
+    if twice:
+        failures.append(f"{len(twice)} job(s) completed more than once")
+    missing = [path for path in normal if path not in done_by or jobs[path]["state"] != DONE]
+    if missing:
+        failures.append(f"{len(missing)} job(s) never completed")
+    not_dead = [path for path in poison if jobs[path]["state"] != DEAD or jobs[path]["attempts"] != JOB_MAX_ATTEMPTS]
+    if not_dead:
+        failures.append(f"{len(not_dead)} poison job(s) not dead-lettered after {JOB_MAX_ATTEMPTS} attempts")
+    retried = sum(1 for path in normal if jobs[path]["attempts"] > 1)
+
+    print(f"{backend:<10} add {len(paths) / add_seconds:8.0f} jobs/s   drain {len(paths)} jobs with "
+          f"{workers} workers in {drain_seconds:5.2f}s ({len(paths) / drain_seconds:6.0f} jobs/s)   "
+          f"re-leased after crash: {retried}   dead: {len(poison)}")
+    for failure in failures:
+        print(f"   ❌ {failure}")
+    return failures
+
+
+def _work(backend, location, worker, folder, events, hung=False):
+    """
+    Runs utils.worker.work with the pipeline and the output rebuild stubbed out,
+    reporting pipeline passes, completions and rebuilds to `events`. A `hung`
+    worker stops heartbeating and sleeps through its leases on its first batch.
+    """
+    import utils.pipeline
+    import utils.worker
+
+    def fake_run_pipeline(filepaths, manifest_path, summary_path, index_folder, **options):
+        events.put(("pipeline", worker, summary_path, index_folder))
+        if hung:
+            time.sleep(LEASE_SECONDS * 3)
+        manifest = RunManifest(manifest_path)
+        for path in filepaths:
+            manifest.start(path, file_hash(path))
+            for stage in STAGES:
+                manifest.mark(path, stage)
+        manifest.close()
+
+    utils.pipeline.run_pipeline = fake_run_pipeline
+    utils.worker.rebuild_outputs = lambda **options: events.put(("rebuild", worker))
+
+    job_queue = open_job_queue(backend, location, lease_seconds=LEASE_SECONDS)
+    if hung:
+        job_queue.heartbeat = lambda worker_id, ids: set()
+    complete = job_queue.complete
+
+    def recording_complete(worker_id, id, stages=()):
+        completed = complete(worker_id, id, stages)
+        events.put(("complete", worker, id, completed))
+        return completed
+
+    job_queue.complete = recording_complete
+    utils.worker.work(
+        job_queue, worker=worker, batch_size=4, heartbeat_seconds=LEASE_SECONDS / 5, idle_seconds=0.05,
+        manifest_path=os.path.join(folder, f"manifest-{worker}.sqlite3"),
+    )
+    job_queue.close()
+    events.put(("exit", worker))
+
+
+def run_workers(backend, folder, paths, workers):
+    location = os.path.join(folder, "work-jobs.sqlite3" if backend == "sqlite" else "work-jobs")
+    job_queue = open_job_queue(backend, location, lease_seconds=LEASE_SECONDS)
+    job_queue.add(paths)
+
+    # The hung worker leases its batch first; the others must take it over
+    events = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_work, args=(backend, location, "hung", folder, events, True))]
+    processes[0].start()
+    received = [events.get()]
+    processes.extend(
+        multiprocessing.Process(target=_work, args=(backend, location, f"worker-{index}", folder, events))
+        for index in range(workers)
+    )
+    start = time.perf_counter()
+    for process in processes[1:]:
+        process.start()
+    exited = 0
+    while exited < len(processes):
+        event = events.get()
+        received.append(event)
+        exited += event[0] == "exit"
+    for process in processes:
+        process.join()
+    seconds = time.perf_counter() - start
+
+    jobs = job_queue.jobs()
+    job_queue.close()
+    completions = {}
+    for event in received:
+        if event[0] == "complete" and event[3]:
+            completions.setdefault(event[2], []).append(event[1])
+    hung_completions = [event for event in received if event[0] == "complete" and event[1] == "hung"]
+    rebuilds = [event for event in received if event[0] == "rebuild"]
+    shared_writes = [event for event in received if event[0] == "pipeline" and (event[2] or event[3])]
+
+    failures = []
+    if any(len(by) > 1 for by in completions.values()) or len(completions) != len(paths):
+        failures.append(f"{len(completions)} of {len(paths)} jobs completed, "
+                        f"{sum(len(by) > 1 for by in completions.values())} more than once")
+    if not hung_completions or any(event[3] for event in hung_completions):
+        failures.append("the hung worker completed jobs whose lease it had lost")
+    if any(job["state"] != DONE for job in jobs):
+        failures.append(f"{sum(job['state'] != DONE for job in jobs)} job(s) not done")
+    if len(rebuilds) != 1:
+        failures.append(f"{len(rebuilds)} output rebuilds (expected exactly 1)")
+    if shared_writes:
+        failures.append("a pipeline pass was asked to write the shared summary or search index")
+
+    print(f"{backend:<10} work() with {workers}+1 workers: {len(paths)} jobs in {seconds:5.2f}s   "
+          f"lost-lease completions refused: {len(hung_completions)}   rebuilds: {len(rebuilds)}")
+    for failure in failures:
+        print(f"   ❌ {failure}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--backend", choices=sorted(JOB_QUEUE_BACKENDS), action="append")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench-jobs-")
+    try:
+        paths = []
+        for index in range(args.jobs):
+            name = f"poison_{index}.pdf" if index % 100 == 7 else f"resume_{index}.pdf"
+            path = os.path.join(folder, name)
+            with open(path, "w") as f:
+                f.write(f"resume {index}")
+            paths.append(path)
+
+        failures = []
+        for backend in args.backend or sorted(JOB_QUEUE_BACKENDS):
+            failures.extend(run_backend(backend, folder, paths, args.workers, args.batch))
+            normal = [path for path in paths if "poison" not in path][:200]
+            failures.extend(run_workers(backend, folder, normal, args.workers))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if failures:
+        sys.exit(1)
+    print("✅ Every job completed exactly once; crashed leases were retried; poison jobs dead-lettered; "
+          "outputs rebuilt once.")
+
+
+if __name__ == "__main__":
+    main()
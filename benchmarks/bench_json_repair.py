@@ -0,0 +1,253 @@
+"""
+Compares the legacy JSON sanitizers against utils.json_repair on a fuzz-style
+corpus of broken model outputs: how many parse, how many match the intended
+object, and how long each takes.
+
+json_repair must parse every case and match every case exactly except the
+truncated ones (480/520 on the default corpus); anything less is a regression.
+Deeply nested output must fail with JSONRepairError, not RecursionError.
+
+Run from the repository root (exits non-zero on a regression):
+    python -m benchmarks.bench_json_repair
+"""
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+from utils.json_repair import MAX_NESTING_DEPTH, JSONRepairError, parse_json
+
+
+def legacy_sanitize_json_output(raw):
+    """
+    The previous utils.ibm_extractor.sanitize_json_output: line-based brace counting.
+    """
+    cleaned = raw.strip()
+    cleaned = cleaned.replace("```json", "").replace("```", "").strip()
+
+    lines = cleaned.splitlines()
+    json_lines = []
+    inside_json = False
+    brace_balance = 0
+
+    for line in lines:
+        if not inside_json:
+            if line.strip().startswith("{"):
+                inside_json = True
+                brace_balance = line.count("{") - line.count("}")
+                json_lines.append(line)
+        else:
+            brace_balance += line.count("{") - line.count("}")
+            json_lines.append(line)
+            if brace_balance == 0:
+                break
+
+    if not json_lines:
+        raise ValueError("❌ No JSON block found in output.")
+
+    return "\n".join(json_lines).strip()
+
+
+def legacy_sanitize_llama_output(raw_output):
+    """
+    The previous llm.llama3_prompting.sanitize_llama_output: seven regex passes.
+    """
+    raw_output = re.sub(r'^.*?{', '{', raw_output, flags=re.DOTALL)
+    raw_output = raw_output.replace("“", '"').replace("”", '"').replace("`", '"')
+    raw_output = re.sub(r'"([^"\n]+)\':', r'"\1":', raw_output)
+    raw_output = re.sub(r'\}\s*"([A-Za-z])', r'},\n"\1', raw_output)
+    raw_output = re.sub(r'\]\s*"([A-Za-z])', r'],\n"\1', raw_output)
+    raw_output = re.sub(r',\s*(\}|\])', r'\1', raw_output)
+    raw_output = re.sub(r'":\s*"([^"]*)$', r'": "Not Specified"', raw_output)
+    open_braces = raw_output.count("{")
+    close_braces = raw_output.count("}")
+    if close_braces < open_braces:
+        raw_output += "}" * (open_braces - close_braces)
+    return raw_output.strip()
+
+
+def make_resume_json(rng, roles):
+    return {
+        "Personal Details": {
+            "Full Name": f"Candidate {rng.randint(1, 9999)}",
+            "Email": "candidate@example.com",
+            "Phone": "9473840788",
+            "Location": "Pune, India",
+        },
+        "Recent Employer": "Infosys Limited",
+        "Job Title": "Software Engineer",
+        "Professional Summary": "Engineer with {curly} braces and \"quotes\" in the summary.",
+        "Employment History": {
+            f"Company {index}": [{
+                "Role": "Developer",
+                "Duration": f"Jan {2010 + index} - Dec {2011 + index}",
+                "Description": "Built APIs; maintained {config} files.",
+            }] for index in range(roles)
+        },
+        "Skills": {"Hard Skill": ["Python", "C++", "AWS"], "Soft Skill": ["Communication"]},
+        "Certifications": [],
+        "Education": [{"Degree": "B.Tech", "Institution": "Amity University", "Duration": "2010-2014"}],
+        "Languages": ["English", "Hindi"],
+        "Projects": [{"Title": "Resume Parser", "Stack": "Python", "Description": "Parses resumes."}],
+    }
+
+
+# Unescaped double quotes and the strings they delimit
+_QUOTE = r'(?<!\\)"'
+_STRING = r'(?<!\\)"((?:[^"\\\n]|\\.)*)"'
+
+
+# Each mutation: (name, fn(pretty JSON text, rng) -> broken text, fn(data) -> intended object)
+MUTATIONS = [
+    ("strict", lambda text, rng: text, None),
+    ("chatter", lambda text, rng: f"Sure! Here is the JSON:\n{text}\nLet me know if you need more.", None),
+    ("inline chatter", lambda text, rng: f"Sure! {text}", None),
+    ("code fence", lambda text, rng: f"```json\n{text}\n```", None),
+    ("single quotes", lambda text, rng: re.sub(_QUOTE, "'", text), None),
+    ("smart quotes", lambda text, rng: re.sub(_STRING, r"“\1”", text), None),
+    ("trailing commas", lambda text, rng: re.sub(r"\n(\s*)([}\]])", r",\n\1\2", text), None),
+    ("missing commas", lambda text, rng: re.sub(r",\n", "\n", text, count=rng.randint(1, 5)), None),
+    ("missing colon", lambda text, rng: text.replace('"Email": ', '"Email"L', 1), None),
+    ("mismatched key quote", lambda text, rng: text.replace('"Full Name":', '"Full Name\':', 1), None),
+    ("python literals", lambda text, rng: text.replace('"Certifications": []', '"Certifications": None'),
+     lambda data: dict(data, Certifications=None)),
+    ("raw newlines", lambda text, rng: text.replace("Built APIs; ", "Built APIs;\n"),
+     lambda data: json.loads(json.dumps(data).replace("Built APIs; ", "Built APIs;\\n"))),
+    ("truncated", lambda text, rng: text[:rng.randint(len(text) // 2, len(text) - 2)], None),
+]
+# Mutations json_repair only has to parse: the rest must come back exactly as intended
+PARSE_ONLY_MUTATIONS = {"truncated"}
+
+
+def build_corpus(cases, seed):
+    """
+    Returns [(mutation name, broken text, intended object)].
+    Truncated outputs can never match exactly; they only count as parsed.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(cases):
+        name, mutate, intended = MUTATIONS[index % len(MUTATIONS)]
+        data = make_resume_json(rng, rng.randint(1, 6))
+        text = mutate(json.dumps(data, indent=2, ensure_ascii=False), rng)
+        corpus.append((name, text, intended(data) if intended else data))
+    return corpus
+
+
+# (name, text) pairs nested past MAX_NESTING_DEPTH; each must raise JSONRepairError
+DEEP_CASES = [
+    ("unclosed arrays", '{"a":' + "[" * 500),
+    ("unclosed objects", '{"a":' * 5000),
+    ("strict arrays", "[" * 100000 + "]" * 100000),
+]
+
+
+def check_deep_nesting():
+    """
+    Returns the failures for DEEP_CASES, plus nesting right at the limit (which must parse).
+    """
+    failures = []
+    for name, text in DEEP_CASES:
+        try:
+            parse_json(text)
+            failures.append(f"deep nesting '{name}' parsed")
+        except JSONRepairError:
+            pass
+        except RecursionError:
+            failures.append(f"deep nesting '{name}' raised RecursionError")
+    at_limit = "[" * MAX_NESTING_DEPTH + "1" + "]" * (MAX_NESTING_DEPTH - 1)
+    try:
+        parse_json(at_limit)
+    except (JSONRepairError, RecursionError) as e:
+        failures.append(f"nesting at the limit failed: {type(e).__name__}")
+    return failures
+
+
+def _legacy_granite(raw):
+    return json.loads(legacy_sanitize_json_output(raw))
+
+
+def _legacy_llama(raw):
+    start, end = raw.find("{"), raw.rfind("}")
+    return json.loads(legacy_sanitize_llama_output(raw[start:end + 1]))
+
+
+def _tolerant(raw):
+    return parse_json(raw)[0]
+
+
+SANITIZERS = [
+    ("legacy granite", _legacy_granite),
+    ("legacy llama", _legacy_llama),
+    ("json_repair", _tolerant),
+]
+
+
+def run(parse, corpus, repeat):
+    """
+    Returns (parsed per mutation, exact matches per mutation, best total seconds).
+    """
+    parsed, exact = {}, {}
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, raw, expected in corpus:
+            try:
+                value = parse(raw)
+            except Exception:
+                continue
+            parsed[name] = parsed.get(name, 0) + 1
+            if value == expected:
+                exact[name] = exact.get(name, 0) + 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return ({k: v // repeat for k, v in parsed.items()},
+            {k: v // repeat for k, v in exact.items()}, best)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=520)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.cases, args.seed)
+    per_mutation = {name: sum(1 for n, _, _ in corpus if n == name) for name, _, _ in MUTATIONS}
+    results = {label: run(parse, corpus, args.repeat) for label, parse in SANITIZERS}
+
+    print(f"{'mutation':<22}" + "".join(f"{label + ' ok/exact':>24}" for label, _ in SANITIZERS))
+    for name, _, _ in MUTATIONS:
+        cells = "".join(
+            f"{f'{results[label][0].get(name, 0)}/{results[label][1].get(name, 0)}':>24}"
+            for label, _ in SANITIZERS
+        )
+        print(f"{name + f' ({per_mutation[name]})':<22}{cells}")
+
+    print()
+    for label, _ in SANITIZERS:
+        parsed, exact, seconds = results[label]
+        print(f"{label:<16} parsed {sum(parsed.values()):>5}/{len(corpus)}  "
+              f"exact {sum(exact.values()):>5}/{len(corpus)}  "
+              f"{seconds * 1e6 / len(corpus):>8.1f} µs/doc")
+
+    parsed, exact, _ = results["json_repair"]
+    failures = check_deep_nesting()
+    if sum(parsed.values()) < len(corpus):
+        failures.append(f"json_repair parsed {sum(parsed.values())}/{len(corpus)} (expected all)")
+    for name, cases in per_mutation.items():
+        if name not in PARSE_ONLY_MUTATIONS and exact.get(name, 0) < cases:
+            failures.append(f"json_repair matched {exact.get(name, 0)}/{cases} '{name}' cases exactly")
+    if failures:
+        for failure in failures:
+            print(f"   ❌ {failure}")
+        sys.exit(1)
+    expected_exact = sum(cases for name, cases in per_mutation.items() if name not in PARSE_ONLY_MUTATIONS)
+    print(f"✅ json_repair parsed every case, matched {expected_exact}/{len(corpus)} exactly "
+          f"and rejected {len(DEEP_CASES)} deeply nested outputs.")
+
+
+if __name__ == "__main__":
+    main()
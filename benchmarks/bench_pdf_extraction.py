@@ -0,0 +1,132 @@
+"""
+Compares the legacy two-pass PDF text extraction against the single-pass
+extract_pdf_text on synthetic multi-page resumes.
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf_extraction --pages 1 5 20 --repeat 5
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import fitz  # PyMuPDF
+
+from extractors.pdf_extractor import extract_pdf_text
+
+
+def legacy_extract_pdf_text(pdf_path, include_tables=True):
+    """
+    The previous implementation: page.get_text() plus page.get_text("dict") per page.
+    """
+    text_lines = []
+
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            page_text = page.get_text().strip()
+            if page_text:
+                text_lines.append(page_text)
+
+            if include_tables:
+                blocks = page.get_text("dict").get("blocks", [])
+                for block in blocks:
+                    if "lines" in block:
+                        for line in block["lines"]:
+                            parts = [
+                                span.get("text", "").strip()
+                                for span in line.get("spans", [])
+                                if span.get("text", "").strip()
+                            ]
+                            if parts:
+                                text_lines.append(" | ".join(parts))
+
+    seen = set()
+    deduped_lines = []
+    for line in text_lines:
+        if line not in seen:
+            deduped_lines.append(line)
+            seen.add(line)
+
+    return "\n".join(deduped_lines).strip()
+
+
+FIRST_NAMES = ["Jane", "Arjun", "Maria", "Wei", "Fatima", "Lukas", "Priya", "Kwame", "Sofia", "Hiro"]
+LAST_NAMES = ["Candidate", "Sharma", "Okafor", "Novak", "Tanaka", "Silva", "Haddad", "Kumar", "Berg", "Moreau"]
+EMPLOYERS = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Systems", "Wayne Tech",
+             "Cyberdyne", "Soylent Data", "Tyrell Analytics", "Wonka Cloud", "Vandelay Imports"]
+TECHNOLOGIES = ["Python", "Java", "Go", "Scala", "AWS", "Azure", "Kafka", "Spark", "Docker", "Kubernetes",
+                "PostgreSQL", "Redis", "React", "TypeScript", "Terraform", "Airflow", "Snowflake", "Rust"]
+WORK = ["data pipelines", "billing APIs", "search services", "ML feature stores", "payment gateways",
+        "reporting dashboards", "event streaming", "identity services", "mobile backends", "ETL jobs"]
+OUTCOMES = ["on schedule", "under budget", "ahead of the release", "with zero downtime", "across three regions",
+            "for two million users", "after a full redesign", "with a team of five"]
+
+
+def make_resume_pdf(path, pages, seed=0):
+    """
+    Writes a text resume with prose lines, mixed-font lines and table-like rows.
+    The candidate, employers, skills and projects are drawn from `seed`, so resumes
+    with different seeds are not near-duplicates of each other.
+    """
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    bold, regular = fitz.Font("hebo"), fitz.Font("helv")
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        y = 60
+        page.insert_text((72, y), f"{name} - Senior Engineer - Page {page_number + 1}", fontsize=12)
+        y += 22
+        writer = fitz.TextWriter(page.rect)
+        for item in range(12):
+            # Bold label and regular text on one line -> one line with two spans
+            writer.append((72, y), f"{rng.choice(EMPLOYERS)}: ", font=bold, fontsize=10)
+            writer.append(writer.last_point, f"Built {rng.choice(WORK)} in {rng.choice(TECHNOLOGIES)} and "
+                                             f"{rng.choice(TECHNOLOGIES)} for client {rng.randint(100, 999)}.",
+                          font=regular, fontsize=10)
+            y += 16
+        writer.write_text(page)
+        for row in range(10):
+            cells = [rng.choice(TECHNOLOGIES), f"{rng.randint(1, 12)} years",
+                     rng.choice(["Beginner", "Intermediate", "Advanced"])]
+            for column, cell in enumerate(cells):
+                page.insert_text((72 + column * 160, y), cell, fontsize=10)
+            y += 16
+        for item in range(10):
+            page.insert_text((72, y), f"Delivered {rng.choice(WORK)} project {rng.randint(10, 99)} "
+                                      f"{rng.choice(OUTCOMES)}.", fontsize=10)
+            y += 16
+    doc.save(path)
+    doc.close()
+
+
+def time_call(fn, path, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 3, 10, 30])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'legacy ms':>10} {'single ms':>10} {'speedup':>8} {'legacy chars':>13} {'single chars':>13}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for pages in args.pages:
+            path = os.path.join(tmpdir, f"resume_{pages}.pdf")
+            make_resume_pdf(path, pages)
+
+            legacy_time, legacy_text = time_call(legacy_extract_pdf_text, path, args.repeat)
+            single_time, single_text = time_call(lambda p: extract_pdf_text(p, ocr=False), path, args.repeat)
+
+            print(f"{pages:>6} {legacy_time * 1000:>10.1f} {single_time * 1000:>10.1f} "
+                  f"{legacy_time / single_time:>7.2f}x {len(legacy_text):>13} {len(single_text):>13}")
+
+
+if __name__ == "__main__":
+    main()
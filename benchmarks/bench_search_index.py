@@ -0,0 +1,115 @@
+"""
+Builds a search index over synthetic candidates and times boolean queries against it.
+
+Run from the repository root:
+    python -m benchmarks.bench_search_index --candidates 100000
+"""
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from benchmarks.bench_skill_matcher import TECHNOLOGIES
+from utils.search_index import SEGMENT_FILE, SearchIndex, candidate_summary, write_segment
+
+LOCATIONS = ["Pune", "Bengaluru", "Hyderabad", "Chennai", "New Delhi", "Mumbai", "Gurugram", "Noida",
+             "Kolkata", "Ahmedabad", "London", "Singapore", "Dubai", "Toronto", "Austin"]
+EMPLOYERS = ["Infosys", "TCS", "Wipro", "Accenture", "Cognizant", "HCL", "Capgemini", "IBM", "Deloitte",
+             "Amazon", "Microsoft", "Google", "Flipkart", "Zomato", "Tech Mahindra", "Oracle", "SAP"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Engineer", "Data Scientist", "DevOps Engineer",
+          "QA Engineer", "Product Manager", "Business Analyst", "Frontend Developer", "Backend Developer",
+          "Machine Learning Engineer", "Solutions Architect", "Engineering Manager"]
+DEGREES = ["B.Tech", "M.Tech", "B.E.", "MCA", "MBA", "B.Sc", "M.Sc"]
+INSTITUTIONS = ["IIT Delhi", "IIT Bombay", "NIT Trichy", "Anna University", "Amity University", "BITS Pilani",
+                "VIT Vellore", "Pune University"]
+QUERIES = [
+    "skill:python",
+    "skill:python AND skill:aws",
+    "skill:python AND years>=5",
+    "(skill:java OR skill:scala) AND location:pune AND NOT employer:tcs",
+    'title:"data engineer" AND years>3 AND years<=10',
+    "employer:amazon OR employer:google OR employer:microsoft",
+    'education:"iit delhi" AND skill:kubernetes',
+    "NOT skill:python",
+    "kafka",
+    "years>=15",
+]
+
+
+def make_candidate(rng, seed):
+    employers = rng.sample(EMPLOYERS, rng.randint(1, 4))
+    start_year = rng.randint(1998, 2023)
+    return {
+        "Personal Details": {"Full Name": f"Candidate {seed}", "Email": f"candidate{seed}@example.com",
+                             "Location": f"{rng.choice(LOCATIONS)}, India"},
+        "Recent Employer": employers[0],
+        "Job Title": rng.choice(TITLES),
+        "Employment History": {
+            employer: [{"Role": rng.choice(TITLES), "Duration": f"Jan {start_year + i} – Dec {start_year + i + 1}"}]
+            for i, employer in enumerate(employers)
+        },
+        "Skills": {"Hard Skill": rng.sample(TECHNOLOGIES, rng.randint(5, 25))},
+        "Education": [{"Degree": rng.choice(DEGREES), "Institution": rng.choice(INSTITUTIONS)}],
+        "Languages": ["English", rng.choice(["Hindi", "Tamil", "Marathi", "Telugu"])],
+        "Total Years of Experience": str(rng.randint(0, 25)) if rng.random() < 0.7 else None,
+    }
+
+
+def time_queries(index, repeat):
+    results = []
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            matches = index.count(query)
+            timings.append(time.perf_counter() - start)
+        results.append((query, matches, min(timings) * 1000, sorted(timings)[len(timings) // 2] * 1000))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--updates", type=int, default=500, help="incremental adds timed after the build")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    folder = tempfile.mkdtemp(prefix="bench-search-")
+    try:
+        start = time.perf_counter()
+        docs = [candidate_summary(f"resume_{i}", make_candidate(rng, i)) for i in range(args.candidates)]
+        summarize_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        write_segment(os.path.join(folder, SEGMENT_FILE), docs)
+        build_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(os.path.join(folder, SEGMENT_FILE)) / 1e6
+
+        start = time.perf_counter()
+        index = SearchIndex(folder, compact_every=0)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for i in range(args.updates):
+            index.add(f"resume_{rng.randrange(args.candidates)}", make_candidate(rng, args.candidates + i))
+        add_ms = (time.perf_counter() - start) * 1000 / max(args.updates, 1)
+
+        print(f"{args.candidates} candidates: summaries {summarize_seconds:.1f}s, segment build {build_seconds:.1f}s "
+              f"({size_mb:.1f} MB), open {open_ms:.1f} ms, incremental add {add_ms:.3f} ms")
+        print(f"{'query':<70} {'matches':>8} {'best ms':>8} {'p50 ms':>8}")
+        for query, matches, best, median in time_queries(index, args.repeat):
+            print(f"{query:<70} {matches:>8} {best:>8.2f} {median:>8.2f}")
+
+        start = time.perf_counter()
+        index.compact()
+        print(f"compact after {args.updates} updates: {time.perf_counter() - start:.1f}s")
+        index.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
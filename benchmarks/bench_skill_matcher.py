@@ -0,0 +1,144 @@
+"""
+Compares the legacy per-skill substring loop in estimate_technology_durations
+against SkillMatcher, on resumes that each list their own `--skills` skills
+(so matchers can't be reused between resumes, as in real batches).
+
+Also checks that padded and repeated skill names are credited under the names
+as given. Run from the repository root (exits non-zero if that check fails):
+    python -m benchmarks.bench_skill_matcher --skills 150 --roles 12 --resumes 200
+"""
+import sys
+import time
+import random
+import argparse
+
+from utils.skill_matcher import SkillMatcher
+from utils.tech_duration_estimator import estimate_technology_durations
+
+TECHNOLOGIES = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C", "C++", "C#", ".NET", "R", "Scala",
+    "Kotlin", "Swift", "Ruby", "PHP", "Perl", "Bash", "PowerShell", "SQL", "NoSQL", "PostgreSQL", "MySQL",
+    "SQLite", "Oracle", "MongoDB", "Redis", "Cassandra", "DynamoDB", "Elasticsearch", "Kafka", "RabbitMQ",
+    "Spark", "Hadoop", "Hive", "Airflow", "dbt", "Snowflake", "BigQuery", "Redshift", "Databricks", "Flink",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Helm", "Terraform", "Ansible", "Jenkins", "GitLab",
+    "GitHub Actions", "CI/CD", "Git", "Linux", "Nginx", "Apache", "React", "Angular", "Vue.js", "Node.js",
+    "Express", "Django", "Flask", "FastAPI", "Spring", "Spring Boot", "Hibernate", "GraphQL", "REST",
+    "gRPC", "Microservices", "Pandas", "NumPy", "Scikit-learn", "TensorFlow", "PyTorch", "Keras",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "OpenCV", "Tableau", "Power BI",
+    "Excel", "Jira", "Confluence", "Agile", "Scrum", "Kanban", "Selenium", "Cypress", "JUnit", "PyTest",
+    "Jest", "Mocha", "Webpack", "Babel", "HTML", "CSS", "Sass", "Tailwind", "Bootstrap", "jQuery",
+    "Redux", "Next.js", "Svelte", "Flutter", "Dart", "Android", "iOS", "Xamarin", "Unity", "Unreal",
+    "MATLAB", "SAS", "SPSS", "Stata", "Julia", "Haskell", "Erlang", "Elixir", "Clojure", "F#", "COBOL",
+    "Fortran", "Assembly", "VHDL", "Verilog", "Embedded C", "RTOS", "MQTT", "Zigbee", "Bluetooth",
+    "Prometheus", "Grafana", "Splunk", "Datadog", "New Relic", "ELK", "Logstash", "Kibana", "Istio",
+    "Envoy", "Consul", "Vault", "OpenShift", "VMware", "Hyper-V", "SAP", "Salesforce", "ServiceNow",
+    "SharePoint", "Dynamics 365", "Informatica", "Talend", "SSIS", "SSRS", "Looker", "Qlik",
+]
+FILLER = ("designed", "built", "maintained", "good", "goals", "for", "clients", "with", "the", "team",
+          "improved", "reliability", "of", "services", "and", "delivered", "reports", "on", "time")
+
+
+def legacy_estimate_technology_durations(extracted_data, technologies):
+    """
+    The previous implementation: a lowercase substring test per skill per role.
+    """
+    employment_history = extracted_data.get("Employment History", {})
+    durations = {}
+
+    for tech in technologies:
+        durations[tech] = 0
+
+    for company, roles in employment_history.items():
+        for role in roles:
+            description = role.get("Description", "").lower()
+            for tech in technologies:
+                if tech.lower() in description:
+                    durations[tech] += 12
+
+    return durations
+
+
+def make_resume(rng, skills, roles):
+    history = {}
+    for index in range(roles):
+        words = [rng.choice(FILLER) for _ in range(60)]
+        for _ in range(6):
+            words.insert(rng.randrange(len(words)), rng.choice(skills))
+        history[f"Company {index}"] = [{"Role": "Engineer", "Duration": "Jan 2019 – Mar 2022",
+                                        "Description": " ".join(words) + "."}]
+    return {"Employment History": history, "Skills": {"Hard Skill": skills}}
+
+
+def check_input_names():
+    """
+    Skill lists from the LLM can have padded and repeated names; durations stay keyed
+    by the names as given. Returns a list of failures.
+    """
+    resume = {"Employment History": {"X": [{"Description": "Built Python and SQL services"}]}}
+    skills = ["Python ", " SQL", "Python ", "python", "Go", "", "  "]
+    durations = estimate_technology_durations(resume, skills)
+    expected = {"Python ": 12, " SQL": 12, "python": 12, "Go": 0, "": 0, "  ": 0}
+    if durations != expected:
+        return [f"padded/duplicate skill names: got {durations}, expected {expected}"]
+    return []
+
+
+def time_call(fn, batches):
+    """
+    Best time over the batches; each batch holds fresh resumes, so nothing
+    cached for one resume's skill list helps the next run.
+    """
+    best = None
+    for resumes in batches:
+        start = time.perf_counter()
+        results = [fn(resume, resume["Skills"]["Hard Skill"]) for resume in resumes]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, default=150)
+    parser.add_argument("--roles", type=int, default=12)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = check_input_names()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+
+    rng = random.Random(7)
+    skill_count = min(args.skills, len(TECHNOLOGIES))
+    batches = [
+        [make_resume(rng, rng.sample(TECHNOLOGIES, skill_count), args.roles) for _ in range(args.resumes)]
+        for _ in range(args.repeat)
+    ]
+    resumes = batches[-1]
+
+    legacy_time, legacy_results = time_call(legacy_estimate_technology_durations, batches)
+    matcher_time, matcher_results = time_call(estimate_technology_durations, batches)
+
+    # Each description mentions 6 skills; anything beyond that is a false hit
+    expected = 6 * args.roles * len(resumes) * 12
+    legacy_credit = sum(sum(result.values()) for result in legacy_results)
+    matcher_credit = sum(sum(result.values()) for result in matcher_results)
+
+    build_start = time.perf_counter()
+    for resume in resumes:
+        SkillMatcher(resume["Skills"]["Hard Skill"])
+    build_ms = (time.perf_counter() - build_start) * 1000 / len(resumes)
+
+    print(f"{skill_count} skills, {args.roles} roles/resume, {len(resumes)} resumes "
+          f"(matcher build: {build_ms:.3f} ms/resume)")
+    print(f"{'':<10} {'ms/resume':>10} {'months credited':>16} {'expected ≤':>11}")
+    print(f"{'legacy':<10} {legacy_time * 1000 / len(resumes):>10.3f} {legacy_credit:>16} {expected:>11}")
+    print(f"{'matcher':<10} {matcher_time * 1000 / len(resumes):>10.3f} {matcher_credit:>16} {expected:>11}")
+    print(f"matcher/legacy time: {matcher_time / legacy_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
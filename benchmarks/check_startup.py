@@ -0,0 +1,99 @@
+"""
+Startup regression check: imports the CLI and the core modules in fresh
+interpreters and fails if they pull in heavy backends (PyMuPDF, Tesseract,
+python-docx, openpyxl, HTTP clients) or take longer than the import budget.
+Also builds the CLI parser, which must not import the daemons (asyncio, the
+pipeline, the job queue) that only `serve`, `watch` and `worker` use.
+
+Run from the repository root (exits non-zero on a regression):
+    python -m benchmarks.check_startup
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("fitz", "pymupdf", "pytesseract", "pdf2image", "docx2pdf", "docx", "openpyxl", "PIL",
+                 "requests", "urllib3", "dateutil", "ibm_watson", "ibm_watsonx_ai")
+
+# Module (or "module:function" to also call it) -> heavy modules it may load (its own backend)
+CHECKS = {
+    "main": (),
+    "main:build_parser": (),
+    "utils.pipeline": (),
+    "utils.ibm_extractor": (),
+    "utils.search_index": (),
+    "utils.watcher": (),
+    "utils.worker": (),
+    "utils.generate_from_json": ("docx",),
+}
+MAX_IMPORT_SECONDS = 0.5
+
+# Modules that must stay unloaded, beyond HEAVY_MODULES
+FORBIDDEN = {
+    "main:build_parser": ("asyncio", "ssl", "utils.service", "utils.watcher", "utils.worker", "utils.job_queue",
+                          "utils.pipeline", "utils.dedup", "utils.search_index"),
+}
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe(module):
+    """
+    Imports `module` (and calls the function of a "module:function" check) in a fresh
+    interpreter; returns (seconds, every loaded module).
+    """
+    module, _, function = module.partition(":")
+    statement = f"import {module}" + (f"; {module}.{function}()" if function else "")
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr.strip()}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["seconds"], set(report["modules"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-seconds", type=float, default=MAX_IMPORT_SECONDS)
+    args = parser.parse_args()
+
+    failures = []
+    for module, allowed in CHECKS.items():
+        try:
+            seconds, loaded = probe(module)
+        except RuntimeError as e:
+            failures.append(str(e))
+            print(f"❌ {module:<28} {e}")
+            continue
+        top_level = {name.split(".")[0] for name in loaded}
+        heavy = sorted(name for name in HEAVY_MODULES if name in top_level and name not in allowed)
+        heavy += [name for name in FORBIDDEN.get(module, ()) if name in loaded]
+        problems = []
+        if heavy:
+            problems.append(f"loads {', '.join(heavy)}")
+        if seconds > args.max_seconds:
+            problems.append(f"took {seconds:.2f}s > {args.max_seconds:.2f}s")
+        print(f"{'❌' if problems else '✅'} {module:<28} {seconds * 1000:7.1f} ms"
+              + (f"  ({'; '.join(problems)})" if problems else ""))
+        failures.extend(f"{module}: {problem}" for problem in problems)
+
+    if failures:
+        print(f"⚠️ {len(failures)} startup regression(s).")
+        sys.exit(1)
+    print("✅ Startup is lean.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Synthetic resume corpus for the benchmarks, generated offline:
+text PDFs, scanned (image-only) PDFs and DOCX files with tables,
+over a range of page counts, plus matching structured resume data.
+"""
+import os
+import random
+import fitz  # PyMuPDF
+from docx import Document
+
+from benchmarks.bench_pdf_extraction import EMPLOYERS, FIRST_NAMES, LAST_NAMES, WORK, make_resume_pdf
+
+SCAN_DPI = 150
+SKILLS = ["Python", "Java", "C++", "C#", "AWS", "Docker", "Kubernetes", "SQL", "React", "Node.js",
+          "Terraform", "Spark", "Kafka", "Go", "TypeScript", "Azure", "Linux", "Git"]
+
+
+def make_scanned_pdf(path, pages, seed=0):
+    """
+    Writes a text resume, then rasterises every page so only images remain (needs OCR).
+    """
+    text_path = f"{path}.text.pdf"
+    make_resume_pdf(text_path, pages, seed=seed)
+    scanned = fitz.open()
+    with fitz.open(text_path) as doc:
+        for page in doc:
+            pixmap = page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY, alpha=False)
+            scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(
+                page.rect, pixmap=pixmap
+            )
+    scanned.save(path, deflate=True)
+    scanned.close()
+    os.remove(text_path)
+
+
+def make_docx_resume(path, pages, seed=0):
+    """
+    Writes a DOCX resume with headings, bullet-style paragraphs and a skills table.
+    About one page of content per `pages`; the content is drawn from `seed`.
+    """
+    rng = random.Random(seed)
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    doc = Document()
+    doc.add_heading(f"{first_name} {last_name}", level=0)
+    doc.add_paragraph(f"{first_name.lower()}.{last_name.lower()}{seed}@example.com | "
+                      f"+91 9{rng.randint(100000000, 999999999)} | Pune, India")
+    doc.add_heading("Professional Summary", level=1)
+    doc.add_paragraph("Senior engineer with experience building data platforms and APIs.")
+    doc.add_heading("Work Experience", level=1)
+    for item in range(pages * 6):
+        doc.add_paragraph(f"{rng.choice(EMPLOYERS)} - Software Engineer "
+                          f"(Jan {2010 + item % 12} – Dec {2011 + item % 12})")
+        doc.add_paragraph(f"Built {rng.choice(WORK)} in {rng.choice(SKILLS)} and {rng.choice(SKILLS)} "
+                          f"for client {rng.randint(100, 999)}; improved latency by {rng.randint(5, 60)}%.")
+    doc.add_heading("Technical Skills", level=1)
+    table = doc.add_table(rows=1, cols=3)
+    for cell, title in zip(table.rows[0].cells, ("Skill", "Experience", "Level")):
+        cell.text = title
+    for row in range(pages * 8):
+        cells = table.add_row().cells
+        cells[0].text = rng.choice(SKILLS)
+        cells[1].text = f"{rng.randint(1, 12)} years"
+        cells[2].text = rng.choice(["Beginner", "Intermediate", "Advanced"])
+    doc.add_heading("Education", level=1)
+    doc.add_paragraph("B.Tech in Information Technology, Amity University, 2006–2010")
+    doc.save(path)
+
+
+def make_resume_data(seed=0, roles=4):
+    """
+    Structured resume data as the LLM would return it.
+    """
+    rng = random.Random(seed)
+    hard_skills = rng.sample(SKILLS, 8)
+    return {
+        "Personal Details": {
+            "Full Name": f"Candidate {seed}",
+            "Email": f"candidate{seed}@example.com",
+            "Phone": "9473840788",
+            "Location": "Pune, India",
+        },
+        "Recent Employer": "Company 0",
+        "Job Title": "Software Engineer",
+        "Professional Summary": "Senior engineer with experience building data platforms and APIs.",
+        "Employment History": {
+            f"Company {index}": [{
+                "Role": "Software Engineer",
+                "Duration": f"Jan {2010 + index} – Dec {2011 + index}",
+                "Description": f"Built services in {rng.choice(hard_skills)} and {rng.choice(hard_skills)}.",
+            }] for index in range(roles)
+        },
+        "Skills": {"Hard Skill": hard_skills, "Soft Skill": ["Communication", "Leadership"]},
+        "Certifications": [{"Certification Name": "AWS Solutions Architect", "Field": "Cloud", "Date": "2020"}],
+        "Education": [{"Degree": "B.Tech", "Institution": "Amity University", "Duration": "2006–2010"}],
+        "Languages": ["English", "Hindi"],
+        "Projects": [{"Title": "Resume Parser", "Stack": "Python", "Description": "Parses resumes."}],
+    }
+
+
+def build_corpus(folder, page_counts=(1, 3, 10), copies=3, scanned=True):
+    """
+    Writes the corpus into `folder` and returns {kind: [(path, pages)]}
+    for kind in "text_pdf", "scanned_pdf" and "docx".
+    Every file gets its own seed, so no two are identical or near-duplicates and
+    the pipeline benchmark measures real work rather than cache and dedup hits.
+    """
+    os.makedirs(folder, exist_ok=True)
+    corpus = {"text_pdf": [], "scanned_pdf": [], "docx": []}
+    seeds = iter(range(1, 1_000_000))
+    for pages in page_counts:
+        for copy in range(copies):
+            path = os.path.join(folder, f"text_{pages}p_{copy}.pdf")
+            make_resume_pdf(path, pages, seed=next(seeds))
+            corpus["text_pdf"].append((path, pages))
+
+            path = os.path.join(folder, f"tables_{pages}p_{copy}.docx")
+            make_docx_resume(path, pages, seed=next(seeds))
+            corpus["docx"].append((path, pages))
+
+            if scanned:
+                path = os.path.join(folder, f"scanned_{pages}p_{copy}.pdf")
+                make_scanned_pdf(path, pages, seed=next(seeds))
+                corpus["scanned_pdf"].append((path, pages))
+    return corpus
@@ -0,0 +1,333 @@
+"""
+End-to-end benchmark suite: times every stage and the full pipeline on a
+synthetic corpus and compares the results against a stored baseline.
+
+Each stage runs in its own forked process, so its peak RSS is its own.
+The full pipeline runs main() in a scratch folder with a fake LLM backend.
+Results are written as JSON; a stage regresses when its docs/sec drops or its
+p95 latency grows by more than --tolerance relative to the baseline.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --pages 1 3 10 --copies 3
+    python -m benchmarks.run_benchmarks --save-baseline
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import multiprocessing
+
+from benchmarks.corpus import build_corpus, make_resume_data
+from utils.llm_backend import LLMBackend
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+RESULTS_PATH = os.path.join("benchmarks", "latest.json")
+MIN_COMPARABLE_P95_MS = 1.0  # sub-millisecond p95s are mostly timer noise
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def ocr_available():
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux, bytes on macOS; child processes count too
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / divisor, 1)
+
+
+def time_items(fn, items):
+    """
+    Calls fn(item) for each item; returns the stage metrics.
+    """
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for item in items:
+            item_start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - item_start)
+        elapsed = time.perf_counter() - start
+    return {
+        "docs": len(latencies),
+        "seconds": round(elapsed, 4),
+        "docs_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 3) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+    }
+
+
+def _run_in_child(fn, args, results):
+    try:
+        metrics = fn(*args)
+        metrics["peak_rss_mb"] = _peak_rss_mb()
+        results.put(metrics)
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_isolated(fn, *args):
+    """
+    Runs a stage benchmark in a fresh forked process (in-process where fork is unavailable).
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        metrics = fn(*args)
+        metrics["peak_rss_mb"] = _peak_rss_mb()
+        return metrics
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_run_in_child, args=(fn, args, results))
+    process.start()
+    metrics = results.get()
+    process.join()
+    return metrics
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Stands in for the model: returns canned resume JSON, wrapped in chatter like a
+    real model, after `latency` seconds.
+    """
+
+    name = "fake"
+    model_id = "benchmark/fake"
+    params = {}
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate(self, prompt, params=None):
+        if self.latency:
+            time.sleep(self.latency)
+        seed = sum(map(ord, prompt[-200:]))
+        return "Here is the JSON:\n```json\n" + json.dumps(make_resume_data(seed), indent=2) + "\n```"
+
+
+# === Stage benchmarks (run in child processes) ===
+
+def bench_extract_pdf(paths):
+    from extractors.pdf_extractor import extract_pdf_text
+    return time_items(lambda path: extract_pdf_text(path, ocr=False), paths)
+
+
+def bench_extract_docx(paths):
+    from extractors.docx_extractor import extract_docx_text
+    return time_items(lambda path: extract_docx_text(path, ocr=False), paths)
+
+
+def bench_ocr(paths):
+    from extractors.pdf_extractor import extract_pdf_text
+    return time_items(extract_pdf_text, paths)
+
+
+def bench_sanitizers(outputs):
+    from utils.ibm_extractor import parse_generated_json
+    return time_items(parse_generated_json, outputs)
+
+
+def bench_clean(records):
+    from utils.postprocessing import clean_extracted_data
+    return time_items(lambda data: clean_extracted_data(json.loads(json.dumps(data))), records)
+
+
+def bench_tech_durations(records):
+    from utils.tech_duration_estimator import estimate_technology_durations
+    return time_items(lambda data: estimate_technology_durations(data, data["Skills"]["Hard Skill"]), records)
+
+
+def bench_fill_template(records):
+    from config import TEMPLATE_PATH
+    from utils.anchor_alignment import fill_template_with_data
+    template_path = os.path.join(REPO_ROOT, TEMPLATE_PATH)
+    return time_items(lambda data: fill_template_with_data(template_path, data), records)
+
+
+def bench_append_to_excel(records):
+    from utils.excel_writer import append_to_excel
+    from utils.pipeline import EXCEL_HEADERS, build_excel_row
+    with tempfile.TemporaryDirectory() as tmpdir:
+        excel_path = os.path.join(tmpdir, "summary.xlsx")
+        return time_items(lambda data: append_to_excel(excel_path, EXCEL_HEADERS, build_excel_row(data)), records)
+
+
+def bench_pipeline(paths, llm_latency):
+    """
+    Runs main() in a scratch folder holding the corpus, with the fake LLM backend.
+    """
+    from config import TEMPLATE_PATH
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, os.path.dirname(TEMPLATE_PATH)))
+        shutil.copy(os.path.join(REPO_ROOT, TEMPLATE_PATH), os.path.join(workdir, TEMPLATE_PATH))
+        os.makedirs(os.path.join(workdir, "resumes"))
+        for path in paths:
+            shutil.copy(path, os.path.join(workdir, "resumes"))
+
+        # main() works on relative folders, so run it from the scratch folder
+        sys.path.insert(0, REPO_ROOT)
+        os.chdir(workdir)
+        import main
+        from utils.ibm_extractor import register_llm_backend
+        from utils.metrics import get_metrics
+        register_llm_backend(FakeLLMBackend(llm_latency))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            main.main([])
+            elapsed = time.perf_counter() - start
+
+        written = len([name for name in os.listdir("outputs") if name.endswith(".docx")])
+        counters = get_metrics().counters
+    return {
+        "docs": len(paths),
+        "written": written,
+        # Both should stay 0: the corpus has no repeated resumes
+        "duplicates": counters.get("duplicates_found", 0),
+        "cache_hits": counters.get("cache_hits", 0),
+        "seconds": round(elapsed, 4),
+        "docs_per_sec": round(len(paths) / elapsed, 2) if elapsed else None,
+        "p50_ms": None,
+        "p95_ms": None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints per-stage changes against the baseline; returns the names of regressed stages.
+    """
+    regressed = []
+    for key in ("pages", "copies", "ocr", "cpu_count"):
+        if results["meta"].get(key) != baseline.get("meta", {}).get(key):
+            print(f"⚠️ Baseline was recorded with {key}={baseline.get('meta', {}).get(key)}, "
+                  f"this run used {results['meta'].get(key)}; numbers are not directly comparable.")
+    print(f"\n{'stage':<22} {'docs/s':>9} {'base':>9} {'Δ':>7} {'p95 ms':>9} {'base':>9} {'Δ':>7}")
+    for stage, metrics in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or "error" in metrics or "error" in base:
+            continue
+        rate_change = (metrics["docs_per_sec"] / base["docs_per_sec"] - 1) if base.get("docs_per_sec") else 0
+        p95_change = 0
+        if (metrics.get("p95_ms") or 0) >= MIN_COMPARABLE_P95_MS and (base.get("p95_ms") or 0) >= MIN_COMPARABLE_P95_MS:
+            p95_change = metrics["p95_ms"] / base["p95_ms"] - 1
+        flag = ""
+        if rate_change < -tolerance or p95_change > tolerance:
+            regressed.append(stage)
+            flag = "  ⚠️ regression"
+        print(f"{stage:<22} {metrics['docs_per_sec']:>9} {base['docs_per_sec']:>9} {rate_change:>+7.0%} "
+              f"{metrics.get('p95_ms') or '-':>9} {base.get('p95_ms') or '-':>9} {p95_change:>+7.0%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 3, 10])
+    parser.add_argument("--copies", type=int, default=3, help="documents per kind and page count")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake LLM seconds per call")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--skip-pipeline", action="store_true")
+    args = parser.parse_args()
+
+    with_ocr = ocr_available()
+    if not with_ocr:
+        print("⚠️ Tesseract not found: OCR stages and scanned PDFs are skipped.")
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pages": args.pages,
+            "copies": args.copies,
+            "ocr": with_ocr,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": {},
+    }
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        print("🏗️ Building synthetic corpus...")
+        corpus = build_corpus(corpus_dir, args.pages, args.copies, scanned=with_ocr)
+        text_pdfs = [path for path, _ in corpus["text_pdf"]]
+        docx_files = [path for path, _ in corpus["docx"]]
+        scanned_pdfs = [path for path, _ in corpus["scanned_pdf"]]
+
+        rng = random.Random(0)
+        records = [make_resume_data(seed, roles=rng.randint(1, 8)) for seed in range(len(text_pdfs) * 4)]
+        outputs = [
+            f"Sure! Here is the parsed resume:\n```json\n{json.dumps(record, indent=2)}\n```"
+            if index % 2 else json.dumps(record, indent=2).replace('"', "'")
+            for index, record in enumerate(records)
+        ]
+
+        stages = [
+            ("extract_pdf_text", bench_extract_pdf, (text_pdfs,)),
+            ("extract_docx_text", bench_extract_docx, (docx_files,)),
+            ("ocr", bench_ocr, (scanned_pdfs,)) if with_ocr else None,
+            ("sanitizers", bench_sanitizers, (outputs,)),
+            ("clean_extracted_data", bench_clean, (records,)),
+            ("tech_durations", bench_tech_durations, (records,)),
+            ("fill_template", bench_fill_template, (records,)),
+            ("append_to_excel", bench_append_to_excel, (records,)),
+            None if args.skip_pipeline else
+            ("pipeline", bench_pipeline, (text_pdfs + docx_files + scanned_pdfs, args.llm_latency)),
+        ]
+        for stage in filter(None, stages):
+            name, fn, stage_args = stage
+            print(f"⏱️ {name}...")
+            results["stages"][name] = run_isolated(fn, *stage_args)
+
+    print(f"\n{'stage':<22} {'docs':>6} {'docs/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'peak MB':>8}")
+    for name, metrics in results["stages"].items():
+        if "error" in metrics:
+            print(f"{name:<22} ❌ {metrics['error']}")
+            continue
+        print(f"{name:<22} {metrics['docs']:>6} {metrics['docs_per_sec']:>9} {metrics['p50_ms'] or '-':>9} "
+              f"{metrics['p95_ms'] or '-':>9} {metrics['peak_rss_mb']:>8}")
+        if metrics.get("duplicates") or metrics.get("cache_hits"):
+            print(f"⚠️ {name} skipped work: {metrics['duplicates']} near-duplicate(s), "
+                  f"{metrics['cache_hits']} LLM cache hit(s); check the corpus generator.")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressed = compare(results, json.load(f), args.tolerance)
+        if regressed:
+            print(f"\n⚠️ Regressions beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
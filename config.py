@@ -1,5 +1,133 @@
+import os
+
 # === Folder Paths ===
 RESUME_INPUT_FOLDER = "resumes"
 TEMPLATE_PATH = "templates/final_template.docx"
 OUTPUT_FOLDER = "outputs"
 JSON_FOLDER = "json"
+EXCEL_SUMMARY_PATH = "outputs/resume_summary.xlsx"
+
+# === Pipeline ===
+# Text extraction / OCR is CPU-bound and runs in a process pool,
+# LLM calls are network-bound and run in a thread pool,
+# and all output writing happens on a single writer thread.
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+LLM_WORKERS = 4
+PIPELINE_QUEUE_SIZE = 16  # max items buffered between two stages
+
+# === LLM Result Cache ===
+LLM_CACHE_ENABLED = True
+LLM_CACHE_FOLDER = "cache/llm"
+LLM_CACHE_MAX_BYTES = 512 * 1024 * 1024  # LRU-evicted beyond this size
+
+# === LLM Backend ===
+# "granite" calls IBM watsonx.ai; "ollama" calls a long-running local model
+# server (e.g. `ollama serve`), reusing its loaded model across resumes.
+LLM_BACKEND = "granite"
+
+# === Local LLM (Ollama) ===
+OLLAMA_URL = "http://localhost:11434"  # overridable with the OLLAMA_URL env variable
+LLAMA_MODEL_NAME = "llama3"
+OLLAMA_MAX_IN_FLIGHT = 2  # the server queues anything beyond its own parallelism anyway
+OLLAMA_TIMEOUT_SECONDS = 300
+OLLAMA_MAX_RETRIES = 2
+OLLAMA_KEEP_ALIVE = "30m"  # how long the server keeps the model loaded between requests
+
+# === IBM Granite Client ===
+GRANITE_RATE_LIMIT_PER_SEC = 2  # sustained requests/second allowed by our quota
+GRANITE_RATE_BURST = 4
+GRANITE_MAX_IN_FLIGHT = 8
+GRANITE_TIMEOUT_SECONDS = 120
+GRANITE_MAX_RETRIES = 5
+GRANITE_BACKOFF_BASE_SECONDS = 1
+GRANITE_BACKOFF_MAX_SECONDS = 60
+
+# === Run Manifest ===
+MANIFEST_PATH = "json/manifest.sqlite3"  # per-file content hash + finished stages
+
+# === Near-Duplicate Detection ===
+# Resumes whose extracted text is this similar (estimated Jaccard over word
+# shingles) to one already parsed reuse its JSON instead of calling the LLM.
+DEDUP_ENABLED = True
+DEDUP_DB_PATH = "json/dedup.sqlite3"
+DEDUP_THRESHOLD = 0.85
+DEDUP_SHINGLE_SIZE = 3  # words per shingle
+DEDUP_NUM_PERM = 128  # MinHash signature length
+DEDUP_BANDS = 32  # LSH bands (DEDUP_NUM_PERM / DEDUP_BANDS rows each)
+
+# === Summary Output ===
+# EXCEL_SUMMARY_PATH may also end in .csv or .jsonl for very large batches.
+SUMMARY_FLUSH_EVERY = 500  # rows buffered before the summary is written out
+
+# === OCR ===
+# Pages are rendered lazily with PyMuPDF and OCR'd in parallel, so peak
+# memory stays around OCR_WORKERS page images. Each extraction process
+# runs its own OCR workers.
+OCR_WORKERS = 2
+OCR_DPI = 200
+OCR_MIN_PAGE_CHARS = 50  # image pages with less text than this are OCR'd
+OCR_MIN_DOCX_CHARS = 200  # DOCX files with less text than this also OCR their embedded images
+
+# === Text Compaction ===
+TEXT_COMPACTION_ENABLED = True
+LLM_TOKEN_BUDGET = 6000  # max estimated tokens of resume text sent to the LLM (0 = no limit)
+
+# === Chunked Extraction ===
+# Long resumes can be split by section and extracted with several smaller
+# prompts in parallel, avoiding truncated JSON from one huge generation.
+LLM_CHUNKED_MODE = False
+LLM_CHUNKED_MIN_TOKENS = 1500  # only resumes at least this long are chunked
+LLM_CHUNK_MAX_NEW_TOKENS = 1536
+LLM_CHUNK_RETRIES = 1  # extra rounds for chunks that failed; a resume with a chunk still failing fails
+
+# === Batch Extraction ===
+# extract_resume_info_batch keeps up to LLM_BATCH_SIZE generate calls in flight
+# (still subject to the client's rate limit) and re-submits only failed items.
+LLM_BATCH_SIZE = 8
+LLM_BATCH_RETRIES = 1  # extra rounds for items that failed
+
+# === Streaming Generation ===
+# Stream model output and stop as soon as the JSON object is complete.
+LLM_STREAMING = False
+
+# === Search Index ===
+# Local candidate index (skills, employers, titles, locations, education,
+# years of experience), updated as each resume finishes.
+SEARCH_INDEX_ENABLED = True
+SEARCH_INDEX_FOLDER = "json/search_index"
+SEARCH_INDEX_COMPACT_EVERY = 1000  # logged updates before they are merged into the segment file
+
+# === Parsing Service ===
+# `python main.py serve`: one resume per HTTP request, with warm clients.
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_QUEUE_SIZE = 32  # requests admitted at once (queued + running); more get 429
+SERVICE_EXTRACT_CONCURRENCY = 2  # extraction/OCR processes
+SERVICE_LLM_CONCURRENCY = 4  # LLM calls in flight
+SERVICE_RENDER_CONCURRENCY = 1  # DOCX renders at once
+SERVICE_MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+SERVICE_REQUEST_TIMEOUT_SECONDS = 300
+
+# === Watch Folder ===
+# `python main.py watch`: parse resumes as they land in RESUME_INPUT_FOLDER.
+WATCH_BACKEND = "auto"  # "inotify" (Linux), "poll", or "auto" (inotify when available)
+WATCH_DEBOUNCE_SECONDS = 2.0  # a file must keep the same size/mtime this long before it is parsed
+WATCH_POLL_SECONDS = 1.0  # folder scan interval for the polling backend
+WATCH_MAX_BATCH = 50  # files handed to one pipeline run
+
+# === Job Queue ===
+# `python main.py worker`: any number of worker processes, on one host or on
+# several hosts sharing a filesystem, drain the same queue of resumes.
+JOB_QUEUE_BACKEND = "sqlite"  # "sqlite" (one host) or "directory" (shared/network filesystem)
+JOB_QUEUE_PATH = "json/jobs.sqlite3"
+JOB_QUEUE_DIRECTORY = "json/jobs"
+JOB_LEASE_SECONDS = 600  # a job whose worker stops heartbeating this long is re-queued
+JOB_HEARTBEAT_SECONDS = 30
+JOB_MAX_ATTEMPTS = 3  # attempts before a job is dead-lettered
+JOB_CLAIM_BATCH = 16  # jobs a worker leases at once and runs through one pipeline pass
+JOB_IDLE_POLL_SECONDS = 5  # how often an idle worker checks for new or expired jobs
+
+# === Logging & Metrics ===
+LOG_LEVEL = "INFO"  # DEBUG also logs the raw model output
+LOG_FORMAT = "text"  # "text" (plain messages) or "json" (one JSON object per line)
+METRICS_PATH = "json/metrics.jsonl"  # per-resume, per-stage timing events, appended per run ("" = off)
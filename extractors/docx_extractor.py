@@ -1,16 +1,53 @@
+import re
+import zipfile
+from io import BytesIO
 from docx import Document
-import pytesseract
-from pdf2image import convert_from_path
-from io import StringIO
-import tempfile
-from docx2pdf import convert as docx2pdf_convert
+from PIL import Image
+from config import OCR_MIN_DOCX_CHARS
+from extractors.ocr import ocr_images
+from utils.metrics import get_logger
 
-def extract_docx_text(docx_path, ocr=None):
+log = get_logger("docx")
+
+# Formats tesseract can read; vector formats such as EMF/WMF are skipped
+OCR_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff")
+MIN_OCR_IMAGE_SIDE = 64  # px; smaller images are icons/bullets, not text
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def iter_docx_images(docx_path):
+    """
+    Yield embedded images (word/media/*) as PIL images, in document order.
+    """
+    with zipfile.ZipFile(docx_path) as package:
+        names = sorted(
+            (
+                name for name in package.namelist()
+                if name.startswith("word/media/") and name.lower().endswith(OCR_IMAGE_EXTENSIONS)
+            ),
+            key=_natural_key,
+        )
+        for name in names:
+            try:
+                image = Image.open(BytesIO(package.read(name)))
+            except Exception as e:
+                log.warning(f"⚠️ Could not read embedded image {name}: {e}")
+                continue
+            if min(image.size) < MIN_OCR_IMAGE_SIDE:
+                continue
+            yield image
+
+
+def extract_docx_text(docx_path, ocr=None, min_chars=OCR_MIN_DOCX_CHARS):
     """
     Extracts text from a DOCX file.
     - If ocr=False: only extract text, no OCR fallback.
-    - If ocr=True: force OCR (convert to PDF and OCR).
-    - If ocr=None: try text, then OCR if empty.
+    - If ocr=True: extract text and merge in OCR of the embedded images.
+    - If ocr=None: as ocr=True when the text is shorter than `min_chars` (e.g. a
+      scanned resume pasted in as a picture under a typed name), else text only.
     """
 
     def _extract_text_from_docx():
@@ -44,26 +81,17 @@ def extract_docx_text(docx_path, ocr=None):
 
         return "\n".join(deduped).strip()
 
-    def _perform_ocr():
-        print("🟠 OCR processing DOCX file (convert to PDF)...")
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pdf_path = f"{tmpdir}/temp.pdf"
-            # Convert DOCX to PDF
-            docx2pdf_convert(docx_path, pdf_path)
-            # OCR the PDF
-            images = convert_from_path(pdf_path)
-            ocr_text = StringIO()
-            for img in images:
-                ocr_text.write(pytesseract.image_to_string(img))
-            return ocr_text.getvalue().strip()
+    def _perform_ocr(text=""):
+        log.info("🟠 OCR processing images embedded in DOCX file...")
+        lines = text.splitlines()
+        for image_text in ocr_images(iter_docx_images(docx_path)):
+            lines.extend(" ".join(line.split()) for line in image_text.splitlines() if line.strip())
+        # Deduplicate while preserving order
+        return "\n".join(dict.fromkeys(lines)).strip()
 
-    if ocr is True:
-        return _perform_ocr()
-    elif ocr is False:
-        return _extract_text_from_docx()
-    else:
-        extracted_text = _extract_text_from_docx()
-        if extracted_text:
-            return extracted_text
-        else:
-            return _perform_ocr()
+    extracted_text = _extract_text_from_docx()
+    if ocr is False:
+        return extracted_text
+    if ocr is None and len(extracted_text) >= min_chars:
+        return extracted_text
+    return _perform_ocr(extracted_text)
@@ -0,0 +1,49 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import fitz  # PyMuPDF
+from PIL import Image
+
+from config import OCR_DPI, OCR_WORKERS
+from utils.metrics import count
+
+
+def ocr_images(images, workers=OCR_WORKERS):
+    """
+    OCR an iterable of PIL images in parallel and yield their text in input order.
+    At most `workers` images are held at once, so a lazy `images` iterable
+    keeps memory bounded no matter how many pages there are.
+    """
+    import pytesseract  # only needed once a page actually has to be OCR'd
+
+    if workers > 1:
+        # Tesseract is multi-threaded itself; parallel pages would oversubscribe the CPU
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for image in images:
+            count("ocr_pages")
+            pending.append(pool.submit(pytesseract.image_to_string, image))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def render_page_image(page, dpi=OCR_DPI):
+    """
+    Rasterise one PyMuPDF page into a PIL image.
+    """
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def iter_pdf_page_images(doc, page_numbers=None, dpi=OCR_DPI):
+    """
+    Lazily render pages of an open PyMuPDF document (all pages by default).
+    """
+    if page_numbers is None:
+        page_numbers = range(doc.page_count)
+    for page_number in page_numbers:
+        yield render_page_image(doc[page_number], dpi=dpi)
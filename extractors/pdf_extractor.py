@@ -1,68 +1,100 @@
 import fitz  # PyMuPDF
-import pytesseract
-from pdf2image import convert_from_path
-from io import StringIO
+from config import OCR_MIN_PAGE_CHARS
+from extractors.ocr import iter_pdf_page_images, ocr_images
+from utils.metrics import get_logger
+
+log = get_logger("pdf")
+
+# A horizontal gap wider than this many font sizes between two spans on
+# the same line is treated as a cell boundary (table-like row).
+TABLE_CELL_GAP_RATIO = 1.0
+
+
+def _line_text(line, include_tables=True):
+    """
+    Rebuild one line from its spans.
+    - Adjacent spans (e.g. a bold word followed by regular text) are joined.
+    - Spans separated by a wide gap become " | "-joined cells when include_tables is set.
+    """
+    spans = [span for span in line.get("spans", []) if span.get("text", "").strip()]
+    if not spans:
+        return ""
+
+    cells = [spans[0]["text"]]
+    for prev, span in zip(spans, spans[1:]):
+        gap = span["bbox"][0] - prev["bbox"][2]
+        if include_tables and gap > max(prev.get("size", 0), 1) * TABLE_CELL_GAP_RATIO:
+            cells.append(span["text"])
+        else:
+            cells[-1] += span["text"]
+
+    cells = [" ".join(cell.split()) for cell in cells]
+    return " | ".join(cell for cell in cells if cell)
+
+
+def extract_page_lines(page, include_tables=True, layout=None):
+    """
+    Text lines of one page from a single get_text("dict") layout pass.
+    """
+    if layout is None:
+        layout = page.get_text("dict")
+
+    lines = []
+    for block in layout.get("blocks", []):
+        for line in block.get("lines", []):
+            line_text = _line_text(line, include_tables)
+            if line_text:
+                lines.append(line_text)
+    return lines
+
+
+def page_needs_ocr(layout, lines, min_chars=OCR_MIN_PAGE_CHARS):
+    """
+    A page needs OCR when it has (almost) no text layer but does contain images.
+    """
+    has_images = any(block.get("type") == 1 for block in layout.get("blocks", []))
+    return has_images and sum(len(line) for line in lines) < min_chars
+
 
 def extract_pdf_text(pdf_path, include_tables=True, ocr=None):
     """
     Extracts text from a PDF file.
     - If ocr=False: only extract text, no OCR fallback.
     - If ocr=True: force OCR on all pages.
-    - If ocr=None: try text first, then OCR if empty.
+    - If ocr=None: keep each page's text layer and OCR only the image-only pages.
+    OCR renders pages straight from the open document with PyMuPDF.
     """
-    def _extract_text_from_pdf():
-        text_lines = []
-
-        with fitz.open(pdf_path) as doc:
-            for page in doc:
-                # Standard page text
-                page_text = page.get_text().strip()
-                if page_text:
-                    text_lines.append(page_text)
-
-                if include_tables:
-                    # Structured blocks
-                    blocks = page.get_text("dict").get("blocks", [])
-                    for block in blocks:
-                        if "lines" in block:
-                            for line in block["lines"]:
-                                parts = [
-                                    span.get("text", "").strip()
-                                    for span in line.get("spans", [])
-                                    if span.get("text", "").strip()
-                                ]
-                                if parts:
-                                    line_text = " | ".join(parts)
-                                    text_lines.append(line_text)
-
-        # Remove duplicates while preserving order
-        seen = set()
-        deduped_lines = []
-        for line in text_lines:
+    with fitz.open(pdf_path) as doc:
+        page_lines = []
+        ocr_pages = []
+
+        for page in doc:
+            if ocr is True:
+                page_lines.append([])
+                ocr_pages.append(page.number)
+                continue
+
+            layout = page.get_text("dict")
+            lines = extract_page_lines(page, include_tables, layout)
+            page_lines.append(lines)
+            if ocr is None and page_needs_ocr(layout, lines):
+                ocr_pages.append(page.number)
+
+        if ocr_pages:
+            log.info(f"🟠 OCR processing {len(ocr_pages)} of {doc.page_count} PDF pages...")
+            images = iter_pdf_page_images(doc, ocr_pages)
+            for page_number, page_text in zip(ocr_pages, ocr_images(images)):
+                page_lines[page_number] = [
+                    " ".join(line.split()) for line in page_text.splitlines() if line.strip()
+                ]
+
+    # Remove duplicates while preserving order
+    seen = set()
+    deduped_lines = []
+    for lines in page_lines:
+        for line in lines:
             if line not in seen:
                 deduped_lines.append(line)
                 seen.add(line)
 
-        return "\n".join(deduped_lines).strip()
-
-    def _perform_ocr():
-        print("🟠 OCR processing PDF pages...")
-        images = convert_from_path(pdf_path)
-        ocr_text = StringIO()
-        for img in images:
-            ocr_text.write(pytesseract.image_to_string(img))
-        return ocr_text.getvalue().strip()
-
-    if ocr is True:
-        # Force OCR
-        return _perform_ocr()
-    elif ocr is False:
-        # Force only text extraction
-        return _extract_text_from_pdf()
-    else:
-        # Default behavior: try text, then fallback
-        extracted_text = _extract_text_from_pdf()
-        if extracted_text:
-            return extracted_text
-        else:
-            return _perform_ocr()
+    return "\n".join(deduped_lines).strip()
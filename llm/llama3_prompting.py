@@ -1,25 +1,36 @@
-import subprocess
-import json
 import re
 import unicodedata
-from config import LLAMA_MODEL_NAME, PROMPT_TEMPLATE
+from config import LLAMA_MODEL_NAME, LLM_CACHE_ENABLED
+from utils.ibm_extractor import PROMPT_TEMPLATE, get_llm_backend
+from utils.json_repair import JSONRepairError, parse_json, repair_json
+from utils.llm_cache import get_extraction_cache, make_cache_key
+from utils.metrics import count, get_logger
+
+log = get_logger("llama")
 
 MAX_DESCRIPTION_LENGTH = 1000  # prevent excessively long strings
 
+CONTEXT_PREFIX_TEMPLATE = (
+    "<<BEGIN INSTRUCTIONS>>\n"
+    "You are a strict JSON-only resume parser.\n"
+    "- DO NOT include markdown, commentary, bullet points, or explanation.\n"
+    "- Only respond with a syntactically valid JSON object.\n"
+    "- Ensure Employment and Projects are separated.\n"
+    "- Begin with '{' and end with '}'.\n"
+    "- Extract ALL companies (do not merge multiple employers).\n"
+    "- Disambiguate CLIENTS vs EMPLOYERS.\n"
+    "- Handle tables and inline formats.\n"
+    "<<END INSTRUCTIONS>>\n\n"
+    "<<BEGIN RESUME>>\n"
+    "{text}\n"
+    "<<END RESUME>>\n\n"
+    "Now respond ONLY with the JSON data in the schema described above:"
+)
+
 
 def sanitize_llama_output(raw_output):
-    raw_output = re.sub(r'^.*?{', '{', raw_output, flags=re.DOTALL)
-    raw_output = raw_output.replace("“", '"').replace("”", '"').replace("`", '"')
-    raw_output = re.sub(r'"([^"\n]+)\':', r'"\1":', raw_output)
-    raw_output = re.sub(r'\}\s*"([A-Za-z])', r'},\n"\1', raw_output)
-    raw_output = re.sub(r'\]\s*"([A-Za-z])', r'],\n"\1', raw_output)
-    raw_output = re.sub(r',\s*(\}|\])', r'\1', raw_output)
-    raw_output = re.sub(r'":\s*"([^"]*)$', r'": "Not Specified"', raw_output)
-    open_braces = raw_output.count("{")
-    close_braces = raw_output.count("}")
-    if close_braces < open_braces:
-        raw_output += "}" * (open_braces - close_braces)
-    return raw_output.strip()
+    cleaned_output, _ = repair_json(raw_output)
+    return cleaned_output
 
 
 def is_valid_duration(text):
@@ -123,48 +134,37 @@ def extract_projects_from_employment(employment_data):
 
 
 def extract_resume_info(text):
-    context_prefix = (
-        "<<BEGIN INSTRUCTIONS>>\n"
-        "You are a strict JSON-only resume parser.\n"
-        "- DO NOT include markdown, commentary, bullet points, or explanation.\n"
-        "- Only respond with a syntactically valid JSON object.\n"
-        "- Ensure Employment and Projects are separated.\n"
-        "- Begin with '{' and end with '}'.\n"
-        "- Extract ALL companies (do not merge multiple employers).\n"
-        "- Disambiguate CLIENTS vs EMPLOYERS.\n"
-        "- Handle tables and inline formats.\n"
-        "<<END INSTRUCTIONS>>\n\n"
-        "<<BEGIN RESUME>>\n"
-        f"{text}\n"
-        "<<END RESUME>>\n\n"
-        "Now respond ONLY with the JSON data in the schema described above:"
+    cache = get_extraction_cache() if LLM_CACHE_ENABLED else None
+    cache_key = make_cache_key(
+        text, f"{CONTEXT_PREFIX_TEMPLATE}\n\n{PROMPT_TEMPLATE}", LLAMA_MODEL_NAME, {}
     )
-
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            log.info("♻️ Using cached LLaMA result.")
+            count("cache_hits")
+            return cached
+        count("cache_misses")
+
+    context_prefix = CONTEXT_PREFIX_TEMPLATE.replace("{text}", text)
     full_prompt = f"{context_prefix}\n\n{PROMPT_TEMPLATE}"
 
     for attempt in range(2):
         try:
-            result = subprocess.run(
-                ["ollama", "run", LLAMA_MODEL_NAME],
-                input=full_prompt,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            raw_output = result.stdout.strip()
-            print("---- RAW LLaMA OUTPUT ----")
-            print(raw_output[:1000])
-            print("---- END ----")
-            start_idx = raw_output.find("{")
-            end_idx = raw_output.rfind("}")
-            if start_idx == -1 or end_idx == -1:
-                print("❌ No JSON found in output.")
+            # Long-running local model server: no process start or model load per resume
+            raw_output = get_llm_backend("ollama").generate(full_prompt).strip()
+            log.debug(f"---- RAW LLaMA OUTPUT ----\n{raw_output[:1000]}\n---- END ----")
+            if "{" not in raw_output:
+                log.error("❌ No JSON found in output.")
                 return {}
-            json_block = raw_output[start_idx:end_idx + 1]
-            cleaned_output = sanitize_llama_output(json_block)
             with open("json/last_raw_output.txt", "w", encoding="utf-8") as debug_file:
-                debug_file.write(cleaned_output)
-            data = json.loads(cleaned_output)
+                debug_file.write(raw_output)
+            data, repairs = parse_json(raw_output)
+            if repairs:
+                log.info(f"🩹 Repaired LLaMA JSON: {', '.join(repairs)}", extra={"repairs": repairs})
+                count("json_repairs")
+            if not isinstance(data, dict):
+                raise JSONRepairError("❌ LLaMA output is not a JSON object.")
 
             if "Projects" not in data or not isinstance(data["Projects"], list):
                 data["Projects"] = []
@@ -203,14 +203,17 @@ def extract_resume_info(text):
             if "Education" in data and isinstance(data["Education"], list):
                 data["Education"] = clean_education(data["Education"])
 
+            if cache is not None:
+                cache.set(cache_key, data)
+
             return data
 
-        except json.JSONDecodeError as e:
-            print(f"⚠️ JSON decode error: {e}")
+        except JSONRepairError as e:
+            log.warning(f"⚠️ JSON decode error: {e}")
             if attempt == 0:
-                print("🔁 Retrying once more...")
+                log.info("🔁 Retrying once more...")
                 continue
             return {}
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            log.error(f"❌ Unexpected error: {e}")
             return {}
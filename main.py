@@ -1,163 +1,201 @@
+"""
+Resume parser command line.
+
+    python main.py [parse] [paths ...] [--force]    parse resumes end to end (the default)
+    python main.py extract [paths ...] [--out DIR]  extract text only, no LLM
+    python main.py render [json files ...]          re-render Word resumes from saved JSON
+    python main.py summarize [--out PATH]           rebuild the summary sheet from saved JSON
+    python main.py search "skill:python AND years>=5"
+    python main.py serve [--port 8080]              HTTP service: POST a resume, get JSON back
+    python main.py watch [--folder resumes]         parse resumes as they arrive in a folder
+    python main.py worker [paths ...] [--wait]      drain a shared job queue (run several at once)
+    python main.py queue status|dead|retry|add      inspect or manage the job queue
+
+Paths default to the resumes folder. Each command imports only what it uses,
+so e.g. `render` starts without loading the OCR or LLM stack.
+"""
 import os
-import json
-from utils.ibm_extractor import extract_resume_info
-from extractors.pdf_extractor import extract_pdf_text
-from extractors.docx_extractor import extract_docx_text
-from utils.anchor_alignment import fill_template_with_data
-from utils.excel_writer import append_to_excel
-from utils.postprocessing import clean_extracted_data  # If you have this module
-
-def main():
-    input_folder = "resumes"
-    template_path = "templates/final_template.docx"
-    output_folder = "outputs"
-    json_folder = "json"
-    excel_path = "outputs/resume_summary.xlsx"
-
-    os.makedirs(output_folder, exist_ok=True)
-    os.makedirs(json_folder, exist_ok=True)
-
-    files = os.listdir(input_folder)
-    if not files:
+import sys
+import argparse
+
+from config import EXCEL_SUMMARY_PATH, JSON_FOLDER, OUTPUT_FOLDER, RESUME_INPUT_FOLDER, TEMPLATE_PATH
+
+COMMANDS = ("parse", "extract", "render", "summarize", "search", "serve", "watch", "worker", "queue")
+DEFAULT_COMMAND = "parse"
+
+
+def _resume_paths(paths):
+    """
+    Supported resumes among `paths` (files or folders), default the resumes folder.
+    """
+    from utils.pipeline import is_supported_resume
+
+    filepaths = []
+    for path in paths or [RESUME_INPUT_FOLDER]:
+        if not os.path.isdir(path):
+            filepaths.append(path)
+            continue
+        for filename in sorted(os.listdir(path)):
+            if not is_supported_resume(filename):
+                print(f"⏭️ Skipping unsupported or hidden file: {filename}")
+                continue
+            filepaths.append(os.path.join(path, filename))
+    return filepaths
+
+
+def parse_command(args):
+    from utils.pipeline import run_pipeline
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    os.makedirs(JSON_FOLDER, exist_ok=True)
+
+    filepaths = _resume_paths(args.paths)
+    if not filepaths:
         print("⚠️ No resumes found in the 'resumes' folder.")
         return
 
-    # Define Excel headers
-    excel_headers = [
-        "Full Name",
-        "Email",
-        "Phone",
-        "Location",
-        "Recent Employer",
-        "Most Recent Job Title",
-        "Professional Summary",
-        "Total Years of Experience",
-        "Technologies Worked On",
-        "Technology Durations"
-    ]
+    run_pipeline(filepaths, force=args.force)
 
-    for filename in files:
-        if filename.startswith(".") or not (
-            filename.lower().endswith(".pdf") or filename.lower().endswith(".docx")
-        ):
-            print(f"⏭️ Skipping unsupported or hidden file: {filename}")
-            continue
 
-        filepath = os.path.join(input_folder, filename)
-        text = ""
-
-        # Extract text (PDF)
-        if filename.lower().endswith(".pdf"):
-            print(f"🔍 Extracting text from PDF: {filename}")
-            text = extract_pdf_text(filepath, ocr=False)
-
-            if not text.strip():
-                print("🟠 No text extracted from PDF, trying OCR...")
-                text = extract_pdf_text(filepath, ocr=True)
-                if text.strip():
-                    print("🟢 OCR text extraction succeeded.")
-                else:
-                    print(f"❌ OCR also failed for {filename}. Skipping.")
-                    continue
-
-        # Extract text (DOCX)
-        elif filename.lower().endswith(".docx"):
-            print(f"🔍 Extracting text from DOCX: {filename}")
-            text = extract_docx_text(filepath, ocr=False)
-
-            if not text.strip():
-                print("🟠 No text extracted from DOCX, trying OCR...")
-                text = extract_docx_text(filepath, ocr=True)
-                if text.strip():
-                    print("🟢 OCR text extraction succeeded.")
-                else:
-                    print(f"❌ OCR also failed for {filename}. Skipping.")
-                    continue
-
-        if not text.strip():
-            print(f"⚠️ Skipping empty or unreadable resume: {filename}")
-            continue
+def extract_command(args):
+    from utils.pipeline import extract_text
 
-        # Call IBM Granite
-        print(f"📤 Sending text to IBM Granite Model → {filename}")
+    os.makedirs(args.out, exist_ok=True)
+    for filepath in _resume_paths(args.paths):
+        filename = os.path.basename(filepath)
         try:
-            extracted_data = extract_resume_info(text)
+            text = extract_text(filepath)
         except Exception as e:
-            print(f"❌ Error extracting data from {filename}: {e}")
+            print(f"❌ Error extracting text from {filename}: {e}")
             continue
+        text_path = os.path.join(args.out, f"{os.path.splitext(filename)[0]}.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(text or "")
+        print(f"💾 Saved extracted text: {text_path} ({len(text or '')} chars)")
 
-        if not extracted_data or not isinstance(extracted_data, dict):
-            print(f"❌ No valid structured JSON returned for {filename}. Skipping.")
-            continue
 
-        # Optional: Clean up (if you have postprocessing)
-        try:
-            extracted_data = clean_extracted_data(extracted_data)
-            print("🧹 Post-processing cleanup applied.")
-        except Exception as e:
-            print(f"⚠️ Post-processing failed for {filename}: {e}. Continuing without cleanup.")
+def render_command(args):
+    from utils.generate_from_json import generate_from_json
 
-        # Save JSON
-        base_name = os.path.splitext(filename)[0]
-        json_path = os.path.join(json_folder, f"{base_name}.json")
+    json_paths = args.paths or [
+        os.path.join(JSON_FOLDER, name) for name in sorted(os.listdir(JSON_FOLDER)) if name.endswith(".json")
+    ]
+    os.makedirs(args.out, exist_ok=True)
+    for json_path in json_paths:
+        base_name = os.path.splitext(os.path.basename(json_path))[0]
         try:
-            with open(json_path, "w", encoding="utf-8") as jf:
-                json.dump(extracted_data, jf, indent=2, ensure_ascii=False)
-            print(f"💾 Saved structured JSON: {json_path}")
+            generate_from_json(json_path, args.template, os.path.join(args.out, f"{base_name}.docx"))
         except Exception as e:
-            print(f"❌ Failed to save JSON for {filename}: {e}")
-            continue
+            print(f"❌ Error generating DOCX for {base_name}: {e}")
 
-        # Estimate technology durations (if you have such logic)
-        try:
-            from utils.tech_duration_estimator import estimate_technology_durations
-            # Estimate technology durations
-            technologies = extracted_data.get("Skills", {}).get("Hard Skill", [])
-            tech_durations = estimate_technology_durations(
-            extracted_data,
-            technologies
-        )
-
-        except ImportError:
-            tech_durations = "N/A"
-
-        # Prepare Excel row
-        personal = extracted_data.get("Personal Details", {})
-        skills = extracted_data.get("Skills", {})
-        tech_list = skills.get("Hard Skill", [])
-        tech_durations_str = ", ".join(
-            [f"{k}: {v}" for k, v in tech_durations.items()]
-        ) if isinstance(tech_durations, dict) else "N/A"
-
-        excel_row = [
-            personal.get("Full Name", "Not Specified"),
-            personal.get("Email", "Not Specified"),
-            personal.get("Phone", "Not Specified"),
-            personal.get("Location", "Not Specified"),
-            extracted_data.get("Recent Employer", "Not Specified"),
-            extracted_data.get("Job Title", "Not Specified"),
-            extracted_data.get("Professional Summary", "Not Specified"),
-            extracted_data.get("Total Years of Experience", "Not Specified"),
-            ", ".join(tech_list) if tech_list else "Not Specified",
-            tech_durations_str
-        ]
-
-        # Append to Excel
-        try:
-            append_to_excel(excel_path, excel_headers, excel_row)
-            print(f"📊 Appended summary to Excel: {excel_path}")
-        except Exception as e:
-            print(f"⚠️ Could not append to Excel: {e}")
 
-        # Fill Word template
-        print("📝 Generating Word document...")
-        try:
-            doc = fill_template_with_data(template_path, extracted_data)
-            docx_path = os.path.join(output_folder, f"{base_name}.docx")
-            doc.save(docx_path)
-            print(f"✅ Done: {docx_path}\n")
-        except Exception as e:
-            print(f"❌ Error generating DOCX for {filename}: {e}")
+def summarize_command(args):
+    from utils.pipeline import rebuild_summary
+
+    rows = rebuild_summary(args.json_folder, args.out)
+    if not rows:
+        print(f"⚠️ No saved resume JSON found in {args.json_folder}.")
+
+
+def search_command(args):
+    from utils.search_index import main as search_main
+
+    search_main(["query", args.query, "--limit", str(args.limit)] + (["--json"] if args.json else []))
+
+
+def serve_command(args):
+    from utils.service import run
+
+    run(args)
+
+
+def watch_command(args):
+    from utils.watcher import run
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    os.makedirs(JSON_FOLDER, exist_ok=True)
+    run(args)
+
+
+def worker_command(args):
+    from utils.worker import run
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    os.makedirs(JSON_FOLDER, exist_ok=True)
+    run(args, filepaths=[] if args.no_enqueue else _resume_paths(args.paths))
+
+
+def queue_command(args):
+    from utils.worker import queue_command as manage_queue
+
+    manage_queue(args, filepaths=_resume_paths(args.paths) if args.action == "add" else [])
+
+
+def build_parser():
+    # Argument helpers of the daemons live in utils.cli_args, so building the
+    # parser doesn't import the daemons themselves
+    from utils.cli_args import add_queue_arguments, add_service_arguments, add_watch_arguments, add_worker_arguments
+
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Parse resumes into structured JSON, Word resumes and a summary sheet.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="{" + ",".join(COMMANDS) + "}")
+
+    parse_parser = commands.add_parser("parse", help="parse resumes end to end (default)")
+    parse_parser.add_argument("paths", nargs="*", help="resume files or folders (default: resumes folder)")
+    parse_parser.add_argument("--force", action="store_true", help="reprocess files already done")
+    parse_parser.set_defaults(handler=parse_command)
+
+    extract_parser = commands.add_parser("extract", help="extract resume text only (no LLM)")
+    extract_parser.add_argument("paths", nargs="*", help="resume files or folders (default: resumes folder)")
+    extract_parser.add_argument("--out", default=os.path.join(OUTPUT_FOLDER, "text"), help="folder for .txt files")
+    extract_parser.set_defaults(handler=extract_command)
+
+    render_parser = commands.add_parser("render", help="render Word resumes from saved JSON")
+    render_parser.add_argument("paths", nargs="*", help="JSON files (default: all saved JSON)")
+    render_parser.add_argument("--template", default=TEMPLATE_PATH)
+    render_parser.add_argument("--out", default=OUTPUT_FOLDER, help="folder for .docx files")
+    render_parser.set_defaults(handler=render_command)
+
+    summarize_parser = commands.add_parser("summarize", help="rebuild the summary sheet from saved JSON")
+    summarize_parser.add_argument("--json-folder", default=JSON_FOLDER)
+    summarize_parser.add_argument("--out", default=EXCEL_SUMMARY_PATH, help=".xlsx, .csv or .jsonl")
+    summarize_parser.set_defaults(handler=summarize_command)
+
+    search_parser = commands.add_parser("search", help="query the candidate search index")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=50)
+    search_parser.add_argument("--json", action="store_true", help="print matches as JSON")
+    search_parser.set_defaults(handler=search_command)
+
+    serve_parser = commands.add_parser("serve", help="run the HTTP parsing service")
+    add_service_arguments(serve_parser)
+    serve_parser.set_defaults(handler=serve_command)
+
+    watch_parser = commands.add_parser("watch", help="parse resumes as they arrive in a folder")
+    add_watch_arguments(watch_parser)
+    watch_parser.set_defaults(handler=watch_command)
+
+    worker_parser = commands.add_parser("worker", help="process resumes from the shared job queue")
+    add_worker_arguments(worker_parser)
+    worker_parser.set_defaults(handler=worker_command)
+
+    queue_parser = commands.add_parser("queue", help="inspect or manage the job queue")
+    queue_parser.add_argument("action", choices=("status", "dead", "retry", "add"))
+    queue_parser.add_argument("paths", nargs="*", help="for add: resume files or folders (default: resumes folder)")
+    add_queue_arguments(queue_parser)
+    queue_parser.set_defaults(handler=queue_command)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv.insert(0, DEFAULT_COMMAND)
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
 
 if __name__ == "__main__":
     main()
@@ -1,128 +1,213 @@
+import io
+import os
+import copy
+import threading
 from docx import Document
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from utils.metrics import get_logger
 
-def fill_template_with_data(template_path, data):
-    doc = Document(template_path)
+log = get_logger("template")
+
+
+def _insert_after_paragraph(paragraph, text_lines, alignment=None):
+    """
+    Insert a list of lines after a given paragraph.
+    """
+    for line in text_lines:
+        new_p = OxmlElement("w:p")
+        r = OxmlElement("w:r")
+        t = OxmlElement("w:t")
+        t.text = line
+        r.append(t)
+        new_p.append(r)
+
+        if alignment == "right":
+            pPr = OxmlElement("w:pPr")
+            jc = OxmlElement("w:jc")
+            jc.set(qn("w:val"), "right")
+            pPr.append(jc)
+            new_p.insert(0, pPr)
+
+        paragraph._element.addnext(new_p)
+
+
+def _format_value(value, anchor):
+    """
+    Convert a field value into a list of lines to insert.
+    """
+    if not value:
+        return ["Not Specified"]
+
+    # EMPLOYMENT HISTORY
+    if anchor == "EMPLOYMENT HISTORY":
+        lines = []
+        if isinstance(value, dict):
+            for company, roles in value.items():
+                lines.append(company)
+                for role in roles:
+                    title = role.get("Role", "Not Specified").strip()
+                    duration = role.get("Duration", "Not Specified").strip()
+                    description = role.get("Description", "").strip()
+                    lines.append(f"• {title} ({duration})")
+                    if description:
+                        lines.append(description)
+        return lines
+
+    # CERTIFICATIONS
+    if anchor == "CERTIFICATIONS":
+        lines = []
+        if isinstance(value, list):
+            for cert in value:
+                if isinstance(cert, dict):
+                    name = cert.get("Certification Name", "Not Specified")
+                    field = cert.get("Field", "Not Specified")
+                    date = cert.get("Date", "Not Specified")
+                    lines.append(f"{name} - {field} ({date})")
+                else:
+                    lines.append(str(cert))
+        return lines
+
+    # EDUCATION
+    if anchor == "EDUCATION":
+        lines = []
+        if isinstance(value, list):
+            value = list(reversed(value))  # most recent first
+            for edu in value:
+                degree = edu.get("Degree", "Not Specified")
+                duration = edu.get("Duration", "Not Specified")
+                inst = edu.get("Institution", "Not Specified")
+                lines.append(f"{degree} ({duration})")
+                lines.append(inst)
+        return lines
+
+    # LANGUAGES
+    if anchor == "LANGUAGES":
+        lines = []
+        if isinstance(value, list):
+            for lang in value:
+                if isinstance(lang, dict):
+                    name = lang.get("Name", "Not Specified")
+                    level = lang.get("Level", "Not Specified")
+                    lines.append(f"- {name} ({level})")
+                else:
+                    lines.append(f"- {lang}")
+        return lines
 
-    def insert_after_paragraph(paragraph, text_lines, alignment=None):
+    # Skills
+    if isinstance(value, list):
+        return [f"- {item}" for item in value]
+
+    # Fallback for dicts
+    if isinstance(value, dict):
+        return [f"{k}: {v}" for k, v in value.items()]
+
+    return [str(value) or "Not Specified"]
+
+
+def _anchor_values(data):
+    """
+    (anchor, value) pairs in the order they are filled into the template.
+    """
+    skills = data.get("Skills") or {}
+    return [
+        ("Recent Employer", data.get("Recent Employer", "Not Specified")),
+        ("Job Title", data.get("Job Title", "Not Specified")),
+        ("PROFESSIONAL SUMMARY", data.get("Professional Summary", "Not Specified")),
+        ("EMPLOYMENT HISTORY", data.get("Employment History", [])),
+        ("Hard Skill", skills.get("Hard Skill", [])),
+        ("Soft Skill", skills.get("Soft Skill", [])),
+        ("CERTIFICATIONS", data.get("Certifications", [])),
+        ("EDUCATION", data.get("Education", [])),
+        ("LANGUAGES", data.get("Languages", [])),
+    ]
+
+
+class CompiledTemplate:
+    """
+    A template parsed once and rendered many times.
+    - Anchor → paragraph index map is built up front, so rendering does no scanning.
+    - `render()` returns an independent Document parsed from cached package bytes.
+    - `render_to()` reuses one Document per thread and only swaps in a deep copy
+      of the template body, which is much cheaper than re-parsing the package.
+    """
+
+    ANCHORS = [anchor for anchor, _ in _anchor_values({})]
+
+    def __init__(self, template_path):
+        self.template_path = template_path
+        with open(template_path, "rb") as f:
+            self._package_bytes = f.read()
+
+        doc = Document(io.BytesIO(self._package_bytes))
+        self._body = copy.deepcopy(doc.element.body)
+        self._anchor_index = {}
+        paragraphs = doc.paragraphs
+        for anchor in self.ANCHORS:
+            for index, para in enumerate(paragraphs):
+                if anchor.lower() in para.text.strip().lower():
+                    self._anchor_index[anchor] = index
+                    break
+            else:
+                log.warning(f"⚠️ Anchor '{anchor}' not found in the template.")
+
+        self._local = threading.local()
+
+    def _fill(self, doc, data):
+        paragraphs = doc.paragraphs
+        # Resolve every anchor before inserting anything, as insertions shift indices
+        targets = [
+            (anchor, value, paragraphs[self._anchor_index[anchor]])
+            for anchor, value in _anchor_values(data)
+            if anchor in self._anchor_index
+        ]
+        for anchor, value, para in targets:
+            lines = _format_value(value, anchor)
+            alignment = "right" if anchor.lower() == "recent employer" else None
+            _insert_after_paragraph(para, lines, alignment)
+        return doc
+
+    def render(self, data):
         """
-        Insert a list of lines after a given paragraph.
+        Fill the template and return a new, independent Document.
         """
-        for line in text_lines:
-            new_p = OxmlElement("w:p")
-            r = OxmlElement("w:r")
-            t = OxmlElement("w:t")
-            t.text = line
-            r.append(t)
-            new_p.append(r)
-
-            if alignment == "right":
-                pPr = OxmlElement("w:pPr")
-                jc = OxmlElement("w:jc")
-                jc.set(qn("w:val"), "right")
-                pPr.append(jc)
-                new_p.insert(0, pPr)
-
-            paragraph._element.addnext(new_p)
-
-    def format_value(value, anchor):
+        return self._fill(Document(io.BytesIO(self._package_bytes)), data)
+
+    def render_to(self, output, data):
         """
-        Convert a field value into a list of lines to insert.
+        Fill the template and save it straight to `output` (path or stream).
         """
-        if not value:
-            return ["Not Specified"]
-
-        # EMPLOYMENT HISTORY
-        if anchor == "EMPLOYMENT HISTORY":
-            lines = []
-            if isinstance(value, dict):
-                for company, roles in value.items():
-                    lines.append(company)
-                    for role in roles:
-                        title = role.get("Role", "Not Specified").strip()
-                        duration = role.get("Duration", "Not Specified").strip()
-                        description = role.get("Description", "").strip()
-                        lines.append(f"• {title} ({duration})")
-                        if description:
-                            lines.append(description)
-            return lines
-
-        # CERTIFICATIONS
-        if anchor == "CERTIFICATIONS":
-            lines = []
-            if isinstance(value, list):
-                for cert in value:
-                    if isinstance(cert, dict):
-                        name = cert.get("Certification Name", "Not Specified")
-                        field = cert.get("Field", "Not Specified")
-                        date = cert.get("Date", "Not Specified")
-                        lines.append(f"{name} - {field} ({date})")
-                    else:
-                        lines.append(str(cert))
-            return lines
-
-        # EDUCATION
-        if anchor == "EDUCATION":
-            lines = []
-            if isinstance(value, list):
-                value = list(reversed(value))  # most recent first
-                for edu in value:
-                    degree = edu.get("Degree", "Not Specified")
-                    duration = edu.get("Duration", "Not Specified")
-                    inst = edu.get("Institution", "Not Specified")
-                    lines.append(f"{degree} ({duration})")
-                    lines.append(inst)
-            return lines
-
-        # LANGUAGES
-        if anchor == "LANGUAGES":
-            lines = []
-            if isinstance(value, list):
-                for lang in value:
-                    if isinstance(lang, dict):
-                        name = lang.get("Name", "Not Specified")
-                        level = lang.get("Level", "Not Specified")
-                        lines.append(f"- {name} ({level})")
-                    else:
-                        lines.append(f"- {lang}")
-            return lines
-
-        # Skills
-        if isinstance(value, list):
-            return [f"- {item}" for item in value]
+        doc = getattr(self._local, "document", None)
+        if doc is None:
+            doc = Document(io.BytesIO(self._package_bytes))
+            self._local.document = doc
 
-        # Fallback for dicts
-        if isinstance(value, dict):
-            return [f"{k}: {v}" for k, v in value.items()]
+        element = doc.element
+        element.replace(element.body, copy.deepcopy(self._body))
+        # Fresh wrapper so python-docx doesn't hand back the old, cached body
+        doc = doc.part.document
+        self._local.document = doc
 
-        return [str(value) or "Not Specified"]
+        self._fill(doc, data).save(output)
 
-    def insert_below_anchor(anchor, value):
-        """
-        Locate the anchor text and insert formatted content below it.
-        """
-        found = False
-        for para in doc.paragraphs:
-            if anchor.lower() in para.text.strip().lower():
-                lines = format_value(value, anchor)
-                alignment = "right" if anchor.lower() == "recent employer" else None
-                insert_after_paragraph(para, lines, alignment)
-                found = True
-                break
-        if not found:
-            print(f"⚠️ Anchor '{anchor}' not found in the template.")
-
-    # Insert all fields
-    insert_below_anchor("Recent Employer", data.get("Recent Employer", "Not Specified"))
-    insert_below_anchor("Job Title", data.get("Job Title", "Not Specified"))
-    insert_below_anchor("PROFESSIONAL SUMMARY", data.get("Professional Summary", "Not Specified"))
-    insert_below_anchor("EMPLOYMENT HISTORY", data.get("Employment History", []))
-    skills = data.get("Skills") or {}
-    insert_below_anchor("Hard Skill", skills.get("Hard Skill", []))
-    insert_below_anchor("Soft Skill", skills.get("Soft Skill", []))
-    insert_below_anchor("CERTIFICATIONS", data.get("Certifications", []))
-    insert_below_anchor("EDUCATION", data.get("Education", []))
-    insert_below_anchor("LANGUAGES", data.get("Languages", []))
 
-    return doc
+_compiled_templates = {}
+_compiled_templates_lock = threading.Lock()
+
+
+def get_compiled_template(template_path):
+    """
+    Returns the compiled template for `template_path`, recompiling if the file changed.
+    """
+    key = os.path.abspath(template_path)
+    mtime = os.path.getmtime(template_path)
+    with _compiled_templates_lock:
+        cached = _compiled_templates.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, CompiledTemplate(template_path))
+            _compiled_templates[key] = cached
+        return cached[1]
+
+
+def fill_template_with_data(template_path, data):
+    return get_compiled_template(template_path).render(data)
@@ -0,0 +1,210 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from config import LLM_CHUNK_MAX_NEW_TOKENS, LLM_CHUNK_RETRIES, LLM_CHUNKED_MIN_TOKENS
+from utils.metrics import get_logger
+from utils.text_compaction import estimate_tokens, split_sections
+
+log = get_logger("chunked")
+
+SECTION_PROMPT_TEMPLATE = """
+You are a strict resume parser. Read the resume excerpt below and return only a valid JSON object with exactly these keys:
+
+{schema}
+
+RULES
+- Output must be syntactically valid JSON—no markdown, commentary, or notes.
+- All keys and string values must be wrapped in double quotes.
+- If information is missing, use "Not Specified" for strings and [] for lists.
+{rules}
+
+<<<RESUME_START>>>
+{text}
+<<<RESUME_END>>>
+""".strip()
+
+# Each chunk: resume sections it reads, sections to fall back to when those are
+# missing, the top-level keys it may return, and its part of the schema.
+CHUNKS = {
+    "profile": {
+        "sections": ["header", "summary", "languages", "other"],
+        "fallback_sections": ["skills"],
+        "keys": ["Personal Details", "Professional Summary", "Languages"],
+        "schema": """{
+  "Personal Details": {"Full Name": "...", "Email": "...", "Phone": "...", "Location": "..."},
+  "Professional Summary": "...",
+  "Languages": ["English", "Hindi"]
+}""",
+        "rules": """- If no summary is present, write a 2–4 line summary of the candidate from the excerpt.""",
+    },
+    "experience": {
+        "sections": ["experience"],
+        # Under an unrecognised heading, jobs end up in whichever section came before it
+        "fallback_sections": ["header", "summary", "skills", "projects", "education", "certifications",
+                              "languages", "other"],
+        "keys": ["Recent Employer", "Job Title", "Employment History"],
+        "schema": """{
+  "Recent Employer": "...",
+  "Job Title": "...",
+  "Employment History": {
+    "Company A": [{"Role": "...", "Duration": "...", "Description": "..."}]
+  }
+}""",
+        "rules": """- List every distinct employer and role, including internships and short-term roles.
+- Distinguish EMPLOYERS (organizations the candidate worked for) from CLIENTS (end customers).
+- Keep Description to high-level duties; do not include detailed project descriptions.
+- Never list universities, colleges or schools as employers.
+- "Recent Employer" and "Job Title" are the most recent employer and designation.""",
+    },
+    "skills": {
+        "sections": ["skills"],
+        "fallback_sections": ["experience", "projects"],
+        "keys": ["Skills"],
+        "schema": """{
+  "Skills": {"Hard Skill": ["..."], "Soft Skill": ["..."]}
+}""",
+        "rules": """- Hard Skills: technologies, frameworks, tools. Soft Skills: interpersonal capabilities.""",
+    },
+    "education": {
+        "sections": ["education"],
+        "fallback_sections": [],
+        "keys": ["Education"],
+        "schema": """{
+  "Education": [{"Degree": "...", "Institution": "...", "Duration": "..."}]
+}""",
+        "rules": "",
+    },
+    "projects": {
+        "sections": ["projects"],
+        "fallback_sections": [],
+        "keys": ["Projects"],
+        "schema": """{
+  "Projects": [{"Title": "...", "Stack": "...", "Description": "..."}]
+}""",
+        "rules": """- Include project titles, technology stack, objectives and outcomes.""",
+    },
+    "certifications": {
+        "sections": ["certifications"],
+        "fallback_sections": [],
+        "keys": ["Certifications"],
+        "schema": """{
+  "Certifications": [{"Certification Name": "...", "Field": "...", "Date": "..."}]
+}""",
+        "rules": "",
+    },
+}
+
+# Stands in for the prompt template in cache keys for chunked results
+CHUNKED_PROMPT_FINGERPRINT = SECTION_PROMPT_TEMPLATE + "".join(
+    chunk["schema"] + chunk["rules"] for chunk in CHUNKS.values()
+)
+
+
+def empty_result():
+    """
+    Every top-level key of the full schema, with empty defaults.
+    """
+    return {
+        "Personal Details": {
+            "Full Name": "Not Specified",
+            "Email": "Not Specified",
+            "Phone": "Not Specified",
+            "Location": "Not Specified",
+        },
+        "Recent Employer": "Not Specified",
+        "Job Title": "Not Specified",
+        "Professional Summary": "Not Specified",
+        "Employment History": {},
+        "Skills": {"Hard Skill": [], "Soft Skill": []},
+        "Certifications": [],
+        "Education": [],
+        "Languages": [],
+        "Projects": [],
+    }
+
+
+def should_chunk(text, min_tokens=LLM_CHUNKED_MIN_TOKENS):
+    """
+    Chunking only pays off for long resumes with recognisable section headings.
+    """
+    if estimate_tokens(text) < min_tokens:
+        return False
+    return len({section for section, _ in split_sections(text)} - {"header"}) >= 2
+
+
+def build_chunk_prompts(text):
+    """
+    Returns {chunk name: prompt} for every chunk that has text to read.
+    """
+    section_lines = {}
+    for section, lines in split_sections(text):
+        section_lines.setdefault(section, []).extend(lines)
+
+    prompts = {}
+    for name, chunk in CHUNKS.items():
+        sections = [s for s in chunk["sections"] if s in section_lines]
+        if not sections or sections == ["header"]:
+            sections += [s for s in chunk["fallback_sections"] if s in section_lines]
+        chunk_text = "\n".join(line for s in sections for line in section_lines.get(s, []))
+        if not chunk_text.strip():
+            continue
+        prompts[name] = (
+            SECTION_PROMPT_TEMPLATE
+            .replace("{schema}", chunk["schema"])
+            .replace("{rules}", chunk["rules"])
+            .replace("{text}", chunk_text)
+        )
+    return prompts
+
+
+def extract_resume_info_chunked(text, generate, parse, params=None, max_new_tokens=LLM_CHUNK_MAX_NEW_TOKENS,
+                                retries=LLM_CHUNK_RETRIES):
+    """
+    Extract a long resume with one smaller prompt per section group, sent concurrently.
+    - `generate(prompt, params)` returns the model's text; `parse(text)` returns a dict.
+    - Chunk results are merged into the full schema.
+    - Failed chunks are re-sent up to `retries` more times. If any still fails, this
+      raises, so a resume with missing sections is never cached or marked done.
+    """
+    prompts = build_chunk_prompts(text)
+    if not prompts:
+        raise ValueError("❌ No resume sections found to extract.")
+
+    chunk_params = dict(params or {}, max_new_tokens=max_new_tokens)
+
+    def _run(name):
+        partial = parse(generate(prompts[name], chunk_params))
+        if not isinstance(partial, dict):
+            raise ValueError("❌ Chunk output is not a JSON object.")
+        return partial
+
+    result = empty_result()
+    errors = {}
+    pending = list(prompts)
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                log.info(f"🔁 Retrying {len(pending)} failed chunk(s) (round {attempt}/{retries})...")
+            futures = {name: pool.submit(_run, name) for name in pending}
+            failed = []
+            for name, future in futures.items():
+                try:
+                    partial = future.result()
+                except Exception as e:
+                    log.warning(f"⚠️ Chunk '{name}' failed: {e}")
+                    errors[name] = e
+                    failed.append(name)
+                    continue
+                errors.pop(name, None)
+                for key in CHUNKS[name]["keys"]:
+                    if key in partial and partial[key] not in (None, ""):
+                        result[key] = partial[key]
+            pending = failed
+
+    if errors:
+        raise ValueError(f"❌ {len(errors)}/{len(prompts)} section chunk(s) failed after {retries + 1} "
+                         f"attempt(s): {', '.join(errors)}")
+
+    log.info(f"🧩 Extracted {len(prompts)} section chunks.")
+    return result
@@ -0,0 +1,66 @@
+"""
+Command-line arguments of the long-running commands (serve, watch, worker, queue).
+Kept apart from the modules that run them, and importing only config, so building
+the CLI parser doesn't load asyncio, the pipeline or the job queue.
+"""
+from config import (
+    DEDUP_DB_PATH,
+    JOB_CLAIM_BATCH,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_BACKEND,
+    MANIFEST_PATH,
+    RESUME_INPUT_FOLDER,
+    SERVICE_EXTRACT_CONCURRENCY,
+    SERVICE_HOST,
+    SERVICE_LLM_CONCURRENCY,
+    SERVICE_PORT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_RENDER_CONCURRENCY,
+    WATCH_BACKEND,
+    WATCH_DEBOUNCE_SECONDS,
+    WATCH_MAX_BATCH,
+    WATCH_POLL_SECONDS,
+)
+
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+JOB_QUEUE_BACKEND_NAMES = ("directory", "sqlite")  # keys of utils.job_queue.JOB_QUEUE_BACKENDS
+
+
+def add_service_arguments(parser):
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE)
+    parser.add_argument("--extract-concurrency", type=int, default=SERVICE_EXTRACT_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=SERVICE_LLM_CONCURRENCY)
+    parser.add_argument("--render-concurrency", type=int, default=SERVICE_RENDER_CONCURRENCY)
+
+
+def add_watch_arguments(parser):
+    parser.add_argument("--folder", default=RESUME_INPUT_FOLDER)
+    parser.add_argument("--backend", choices=WATCH_BACKENDS, default=WATCH_BACKEND)
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE_SECONDS,
+                        help="seconds a file must stay unchanged before it is parsed")
+    parser.add_argument("--poll-interval", type=float, default=WATCH_POLL_SECONDS)
+    parser.add_argument("--max-batch", type=int, default=WATCH_MAX_BATCH)
+
+
+def add_queue_arguments(parser):
+    parser.add_argument("--backend", choices=JOB_QUEUE_BACKEND_NAMES, default=JOB_QUEUE_BACKEND)
+    parser.add_argument("--queue", dest="queue_location", default=None,
+                        help="queue database (sqlite) or folder (directory)")
+    parser.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="lease length in seconds")
+    parser.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS)
+
+
+def add_worker_arguments(parser):
+    parser.add_argument("paths", nargs="*", help="resume files or folders to queue first (default: resumes folder)")
+    add_queue_arguments(parser)
+    parser.add_argument("--no-enqueue", action="store_true", help="only work on jobs already queued")
+    parser.add_argument("--wait", action="store_true", help="keep waiting for new jobs when the queue is empty")
+    parser.add_argument("--batch", type=int, default=JOB_CLAIM_BATCH)
+    parser.add_argument("--heartbeat", type=float, default=JOB_HEARTBEAT_SECONDS)
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--dedup-db", default=DEDUP_DB_PATH)
@@ -0,0 +1,182 @@
+import re
+import time
+import zlib
+import random
+import sqlite3
+import hashlib
+import threading
+from array import array
+from functools import lru_cache
+
+from config import DEDUP_BANDS, DEDUP_DB_PATH, DEDUP_NUM_PERM, DEDUP_SHINGLE_SIZE, DEDUP_THRESHOLD
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATION_SEED = 1  # fixed so signatures stay comparable across runs
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, size=DEDUP_SHINGLE_SIZE):
+    """
+    The set of `size`-word shingles of `text`, ignoring case, punctuation and layout,
+    so the PDF and DOCX exports of one resume shingle alike.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+@lru_cache(maxsize=8)
+def _permutations(num_perm):
+    rng = random.Random(_PERMUTATION_SEED)
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+
+def minhash_signature(text, num_perm=DEDUP_NUM_PERM, shingle_size=DEDUP_SHINGLE_SIZE):
+    """
+    MinHash signature of the text's shingles (an array of `num_perm` integers),
+    or None when the text has no words.
+    """
+    hashed = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, shingle_size)]
+    if not hashed:
+        return None
+    return array("Q", [
+        min((a * value + b) % _MERSENNE_PRIME for value in hashed)
+        for a, b in _permutations(num_perm)
+    ])
+
+
+def similarity(signature_a, signature_b):
+    """
+    Estimated Jaccard similarity of the texts behind two signatures.
+    """
+    return sum(x == y for x, y in zip(signature_a, signature_b)) / len(signature_a)
+
+
+class NearDuplicateIndex:
+    """
+    SQLite-backed LSH index of MinHash signatures, kept across runs.
+    - Signatures are split into `bands`; resumes sharing any band bucket are
+      candidates, and count as duplicates at `threshold` estimated similarity.
+    - Each duplicate is linked to the resume it first matched (its canonical),
+      whose structured JSON it reuses.
+    """
+
+    def __init__(self, db_path=DEDUP_DB_PATH, threshold=DEDUP_THRESHOLD,
+                 num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"❌ DEDUP_NUM_PERM ({num_perm}) must be a multiple of DEDUP_BANDS ({bands}).")
+        self.db_path = db_path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "path TEXT PRIMARY KEY, "
+                "signature BLOB NOT NULL, "
+                "canonical TEXT, "
+                "similarity REAL, "
+                "json_path TEXT, "
+                "updated_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, path TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_path ON buckets (path)")
+
+            # Signatures made with other settings can't be compared: start over
+            params = f"{num_perm}/{bands}/{DEDUP_SHINGLE_SIZE}/{_PERMUTATION_SEED}"
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+            if row is None or row["value"] != params:
+                self._conn.execute("DELETE FROM documents")
+                self._conn.execute("DELETE FROM buckets")
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('params', ?)", (params,))
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            yield band, int.from_bytes(digest, "big", signed=True)
+
+    def match(self, signature, exclude=None):
+        """
+        The most similar indexed resume at or above the threshold, as a dict with
+        `path`, `canonical`, `similarity` and `json_path`, or None.
+        `exclude` (the resume being checked) and its own duplicates are never returned.
+        """
+        with self._lock:
+            candidates = set()
+            for band, bucket in self._band_keys(signature):
+                candidates.update(
+                    row["path"] for row in self._conn.execute(
+                        "SELECT path FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)
+                    )
+                )
+            candidates.discard(exclude)
+
+            best = None
+            for path in candidates:
+                row = self._conn.execute("SELECT * FROM documents WHERE path = ?", (path,)).fetchone()
+                if row is None or (exclude is not None and row["canonical"] == exclude):
+                    continue  # a resume doesn't duplicate its own duplicates
+                score = similarity(signature, array("Q", row["signature"]))
+                if score >= self.threshold and (best is None or score > best["similarity"]):
+                    best = {
+                        "path": path,
+                        "canonical": row["canonical"] or path,
+                        "similarity": round(score, 3),
+                        "json_path": row["json_path"],
+                    }
+            return best
+
+    def add(self, path, signature, canonical=None, similarity=None):
+        """
+        Index `path`, optionally as a duplicate of `canonical`. Replaces any previous entry.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM buckets WHERE path = ?", (path,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (path, signature, canonical, similarity, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (path, signature.tobytes(), canonical, similarity, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, path) VALUES (?, ?, ?)",
+                [(band, bucket, path) for band, bucket in self._band_keys(signature)],
+            )
+
+    def set_json_path(self, path, json_path):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE documents SET json_path = ? WHERE path = ?", (json_path, path))
+
+    def clusters(self, paths=None):
+        """
+        Duplicate clusters as {canonical: [(duplicate, similarity), ...]},
+        limited to the clusters involving any of `paths` if given.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, canonical, similarity FROM documents WHERE canonical IS NOT NULL ORDER BY canonical, path"
+            ).fetchall()
+        clusters = {}
+        for row in rows:
+            clusters.setdefault(row["canonical"], []).append((row["path"], row["similarity"]))
+        if paths is not None:
+            paths = set(paths)
+            clusters = {
+                canonical: members for canonical, members in clusters.items()
+                if canonical in paths or any(path in paths for path, _ in members)
+            }
+        return clusters
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,11 @@
 import os
+import csv
+import json
+import tempfile
 from openpyxl import Workbook, load_workbook
+from utils.metrics import get_logger
+
+log = get_logger("summary")
 
 def append_to_excel(file_path, headers, row):
     """
@@ -18,3 +24,130 @@ def append_to_excel(file_path, headers, row):
 
     sheet.append(row)
     workbook.save(file_path)
+
+
+class SummarySink:
+    """
+    Buffers summary rows in memory and writes them out in one go.
+    - Rows are written on `flush()`, on `close()`, or every `flush_every` rows.
+    - `add(row, on_flushed=...)` callbacks run once that row is on disk.
+    """
+
+    def __init__(self, file_path, headers, flush_every=None):
+        self.file_path = file_path
+        self.headers = list(headers)
+        self.flush_every = flush_every
+        self._rows = []
+        self._callbacks = []
+
+    def add(self, row, on_flushed=None):
+        self._rows.append(list(row))
+        if on_flushed:
+            self._callbacks.append(on_flushed)
+        if self.flush_every and len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return 0
+        rows, callbacks = self._rows, self._callbacks
+        self._write(rows)
+        self._rows, self._callbacks = [], []
+        log.info(f"📊 Wrote {len(rows)} summary rows to {self.file_path}")
+        for callback in callbacks:
+            callback()
+        return len(rows)
+
+    def close(self):
+        self.flush()
+
+    def _write(self, rows):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ExcelSummarySink(SummarySink):
+    """
+    Writes .xlsx summaries.
+    - A new workbook is written with openpyxl's write-only mode.
+    - An existing workbook is loaded and the rows appended to its active sheet,
+      so its formatting, column widths, formulas and other sheets are kept.
+    """
+
+    def _write(self, rows):
+        if os.path.exists(self.file_path):
+            workbook = load_workbook(self.file_path)
+            sheet = workbook.active
+        else:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(title="Sheet")
+            sheet.append(self.headers)
+
+        for values in rows:
+            sheet.append(values)
+
+        _atomic_save(self.file_path, workbook.save, suffix=".xlsx")
+
+
+class CsvSummarySink(SummarySink):
+    """
+    Appends rows to a .csv file; the header is written when the file is new.
+    """
+
+    def _write(self, rows):
+        file_exists = os.path.exists(self.file_path) and os.path.getsize(self.file_path) > 0
+        with open(self.file_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(self.headers)
+            writer.writerows(rows)
+
+
+class JsonlSummarySink(SummarySink):
+    """
+    Appends one JSON object per row (keyed by header) to a .jsonl file.
+    """
+
+    def _write(self, rows):
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            for values in rows:
+                f.write(json.dumps(dict(zip(self.headers, values)), ensure_ascii=False) + "\n")
+
+
+SUMMARY_SINKS = {
+    ".xlsx": ExcelSummarySink,
+    ".csv": CsvSummarySink,
+    ".jsonl": JsonlSummarySink,
+}
+
+
+def open_summary_sink(file_path, headers, flush_every=None):
+    """
+    Returns the summary sink matching the file extension (.xlsx, .csv or .jsonl).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in SUMMARY_SINKS:
+        raise ValueError(f"❌ Unsupported summary format: {extension}")
+    return SUMMARY_SINKS[extension](file_path, headers, flush_every=flush_every)
+
+
+def _atomic_save(file_path, save, suffix=""):
+    """
+    Save through a temp file in the same folder, then swap it in,
+    so a crash never leaves a half-written summary behind.
+    """
+    folder = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=suffix)
+    os.close(fd)
+    try:
+        save(tmp_path)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
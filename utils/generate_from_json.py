@@ -1,7 +1,6 @@
 import os
 import json
-from docx import Document
-from utils.anchor_alignment import fill_template_with_data
+from utils.anchor_alignment import get_compiled_template
 
 def generate_from_json(json_path, template_path, output_path):
     if not os.path.exists(json_path):
@@ -14,8 +13,7 @@ def generate_from_json(json_path, template_path, output_path):
     with open(json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    filled_doc = fill_template_with_data(template_path, data)
-    filled_doc.save(output_path)
+    get_compiled_template(template_path).render_to(output_path, data)
     print(f"✅ Generated: {output_path}")
 
 if __name__ == "__main__":
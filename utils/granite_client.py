@@ -0,0 +1,244 @@
+import json
+import time
+import random
+import threading
+from contextlib import nullcontext
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    GRANITE_BACKOFF_BASE_SECONDS,
+    GRANITE_BACKOFF_MAX_SECONDS,
+    GRANITE_MAX_IN_FLIGHT,
+    GRANITE_MAX_RETRIES,
+    GRANITE_RATE_BURST,
+    GRANITE_RATE_LIMIT_PER_SEC,
+    GRANITE_TIMEOUT_SECONDS,
+)
+from utils.llm_backend import LLMBackend
+from utils.metrics import count, get_logger
+
+IAM_URL = "https://iam.cloud.ibm.com/identity/token"
+API_VERSION = "2023-05-29"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+
+log = get_logger("granite")
+
+
+class GraniteAPIError(RuntimeError):
+    """
+    Raised when watsonx.ai keeps failing after all retries,
+    or returns a non-retryable error.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class GraniteClient(LLMBackend):
+    """
+    Long-lived watsonx.ai text generation client, safe to share across threads.
+    - One pooled HTTP session and one cached IAM token for the whole run.
+    - Token-bucket rate limiting and a cap on in-flight requests.
+    - Jittered exponential backoff on 429/5xx, timeouts and connection errors.
+    `url` and `iam_url` can point at a local fake endpoint for testing.
+    """
+
+    name = "granite"
+
+    def __init__(self, api_key, project_id, url, model_id, params, iam_url=IAM_URL,
+                 rate_limit=GRANITE_RATE_LIMIT_PER_SEC, burst=GRANITE_RATE_BURST,
+                 max_in_flight=GRANITE_MAX_IN_FLIGHT, timeout=GRANITE_TIMEOUT_SECONDS,
+                 max_retries=GRANITE_MAX_RETRIES, backoff_base=GRANITE_BACKOFF_BASE_SECONDS,
+                 backoff_max=GRANITE_BACKOFF_MAX_SECONDS):
+        self.api_key = api_key
+        self.project_id = project_id
+        self.url = url.rstrip("/")
+        self.iam_url = iam_url
+        self.model_id = model_id
+        self.params = params
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._rate_limiter = TokenBucket(rate_limit, burst)
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_in_flight)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._token = None
+        self._token_expires_at = 0
+        self._token_lock = threading.Lock()
+
+    def _get_token(self, force_refresh=False):
+        """
+        Exchange the API key for an IAM bearer token, reusing it until shortly before expiry.
+        """
+        with self._token_lock:
+            if not force_refresh and self._token and time.time() < self._token_expires_at:
+                return self._token
+
+            response = self._session.post(
+                self.iam_url,
+                data={
+                    "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+                    "apikey": self.api_key,
+                },
+                headers={"Accept": "application/json"},
+                timeout=self.timeout,
+            )
+            if response.status_code != 200:
+                raise GraniteAPIError(
+                    f"❌ IAM token request failed ({response.status_code}): {response.text[:200]}",
+                    response.status_code,
+                )
+
+            payload = response.json()
+            expires_at = payload.get("expiration") or time.time() + payload.get("expires_in", 3600)
+            self._token = payload["access_token"]
+            self._token_expires_at = expires_at - TOKEN_REFRESH_MARGIN_SECONDS
+            return self._token
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # "Full jitter": random delay up to the exponential ceiling
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _post(self, path, payload, stream=False):
+        """
+        POST to the watsonx.ai API with rate limiting, retries and token refresh.
+        Returns the decoded JSON body, or the open response when `stream` is set
+        (the caller then holds the in-flight slot for as long as it reads).
+        """
+        url = f"{self.url}{path}?version={API_VERSION}"
+        last_error = None
+        token_refreshed = False
+
+        for attempt in range(self.max_retries + 1):
+            self._rate_limiter.acquire()
+            retry_after = None
+            with nullcontext() if stream else self._in_flight:
+                try:
+                    response = self._session.post(
+                        url,
+                        json=payload,
+                        headers={
+                            "Authorization": f"Bearer {self._get_token()}",
+                            "Accept": "text/event-stream" if stream else "application/json",
+                        },
+                        timeout=self.timeout,
+                        stream=stream,
+                    )
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    last_error = GraniteAPIError(f"❌ Granite request failed: {e}")
+                    response = None
+
+            if response is not None:
+                if response.status_code == 200:
+                    return response if stream else response.json()
+
+                if response.status_code == 401 and not token_refreshed:
+                    self._get_token(force_refresh=True)
+                    token_refreshed = True
+                    continue
+
+                last_error = GraniteAPIError(
+                    f"❌ Granite request failed ({response.status_code}): {response.text[:200]}",
+                    response.status_code,
+                )
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise last_error
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt < self.max_retries:
+                delay = self._backoff_delay(attempt, retry_after)
+                log.warning(f"🔁 Granite request throttled or failed, retrying in {delay:.1f}s "
+                            f"(attempt {attempt + 1}/{self.max_retries})...")
+                count("llm_retries")
+                time.sleep(delay)
+
+        raise last_error
+
+    def generate(self, prompt, params=None):
+        """
+        Generate text for one prompt and return the generated string.
+        """
+        result = self._post("/ml/v1/text/generation", {
+            "input": prompt,
+            "model_id": self.model_id,
+            "project_id": self.project_id,
+            "parameters": params or self.params,
+        })
+        generated = result.get("results", [{}])[0]
+        count("llm_input_tokens", generated.get("input_token_count", 0))
+        count("llm_output_tokens", generated.get("generated_token_count", 0))
+        return generated.get("generated_text", "")
+
+    def generate_stream(self, prompt, params=None):
+        """
+        Generate text for one prompt, yielding pieces as the model produces them.
+        Closing the generator early (e.g. `break`) closes the connection and stops generation.
+        """
+        with self._in_flight:
+            response = self._post("/ml/v1/text/generation_stream", {
+                "input": prompt,
+                "model_id": self.model_id,
+                "project_id": self.project_id,
+                "parameters": params or self.params,
+            }, stream=True)
+            token_counts = {}
+            try:
+                # Server-sent events: the generated text arrives in "data:" lines
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[len("data:"):].strip())
+                    for result in event.get("results", []):
+                        for name in ("input_token_count", "generated_token_count"):
+                            if result.get(name):
+                                token_counts[name] = result[name]
+                        if result.get("generated_text"):
+                            yield result["generated_text"]
+            finally:
+                response.close()
+                count("llm_input_tokens", token_counts.get("input_token_count", 0))
+                count("llm_output_tokens", token_counts.get("generated_token_count", 0))
+
+    def close(self):
+        self._session.close()
@@ -1,17 +1,41 @@
 import os
-import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from ibm_watson_machine_learning.foundation_models import Model
+from config import (
+    LLAMA_MODEL_NAME,
+    LLM_BATCH_RETRIES,
+    LLM_BATCH_SIZE,
+    LLM_BACKEND,
+    LLM_CACHE_ENABLED,
+    LLM_CHUNKED_MODE,
+    LLM_STREAMING,
+    OLLAMA_URL,
+)
+from utils.chunked_extraction import CHUNKED_PROMPT_FINGERPRINT, extract_resume_info_chunked, should_chunk
+from utils.json_repair import JSONRepairError, parse_json, repair_json
+from utils.json_stream import IncrementalJSONParser
+from utils.llm_cache import get_extraction_cache, make_cache_key
+from utils.metrics import bind_scope, count, get_logger
 
 # Load environment variables
 load_dotenv()
 
+log = get_logger("extractor")
+
 IBM_API_KEY = os.getenv("IBM_API_KEY")
 IBM_PROJECT_ID = os.getenv("IBM_PROJECT_ID")
-IBM_URL = "https://us-south.ml.cloud.ibm.com"
-
-if not IBM_API_KEY or not IBM_PROJECT_ID:
-    raise ValueError("❌ IBM_API_KEY or IBM_PROJECT_ID not set. Please check your .env file.")
+IBM_URL = os.getenv("IBM_URL", "https://us-south.ml.cloud.ibm.com")
+IBM_IAM_URL = os.getenv("IBM_IAM_URL")  # GraniteClient's default when unset
+OLLAMA_URL = os.getenv("OLLAMA_URL", OLLAMA_URL)
+
+MODEL_ID = "ibm/granite-3-3-8b-instruct"
+GENERATION_PARAMS = {
+    "decoding_method": "greedy",
+    "max_new_tokens": 4096,
+    "temperature": 0
+}
 
 # === PROMPT TEMPLATE ===
 PROMPT_TEMPLATE = """
@@ -269,68 +293,185 @@ Resume to Parse
 
 def sanitize_json_output(raw):
     """
-    Attempts to clean incomplete or messy JSON output.
+    Cleans messy model output (chatter, code fences, broken quoting/commas, truncation)
+    and returns it as valid JSON text.
     """
-    cleaned = raw.strip()
-    cleaned = cleaned.replace("```json", "").replace("```", "").strip()
-
-    lines = cleaned.splitlines()
-    json_lines = []
-    inside_json = False
-    brace_balance = 0
-
-    for line in lines:
-        if not inside_json:
-            if line.strip().startswith("{"):
-                inside_json = True
-                brace_balance = line.count("{") - line.count("}")
-                json_lines.append(line)
-        else:
-            brace_balance += line.count("{") - line.count("}")
-            json_lines.append(line)
-            if brace_balance == 0:
-                break
+    cleaned_json, _ = repair_json(raw)
+    return cleaned_json
 
-    if not json_lines:
-        raise ValueError("❌ No JSON block found in output.")
+_clients = {}
+_client_lock = threading.Lock()
 
-    return "\n".join(json_lines).strip()
-
-def extract_resume_info(text):
+def get_llm_backend(name=None):
     """
-    Calls IBM Granite model with the parsing prompt and returns structured JSON.
+    Returns the shared text generation client for `name` ("granite" or "ollama",
+    default LLM_BACKEND), creating it on first use.
     """
-    model_id = "ibm/granite-3-3-8b-instruct"
-
-    model = Model(
-        model_id=model_id,
-        params={
-            "decoding_method": "greedy",
-            "max_new_tokens": 4096,
-            "temperature": 0
-        },
-        credentials={
-            "apikey": IBM_API_KEY,
-            "url": IBM_URL
-        },
-        project_id=IBM_PROJECT_ID
-    )
-
-    prompt = PROMPT_TEMPLATE.replace("{text}", text)
+    name = name or LLM_BACKEND
+    with _client_lock:
+        if name not in _clients:
+            # Client modules are imported here so loading this one stays cheap
+            if name == "granite":
+                from utils.granite_client import GraniteClient, IAM_URL
+
+                if not IBM_API_KEY or not IBM_PROJECT_ID:
+                    raise ValueError("❌ IBM_API_KEY or IBM_PROJECT_ID not set. Please check your .env file.")
+                _clients[name] = GraniteClient(
+                    api_key=IBM_API_KEY,
+                    project_id=IBM_PROJECT_ID,
+                    url=IBM_URL,
+                    iam_url=IBM_IAM_URL or IAM_URL,
+                    model_id=MODEL_ID,
+                    params=GENERATION_PARAMS,
+                )
+            elif name == "ollama":
+                from utils.ollama_client import OllamaClient
+
+                _clients[name] = OllamaClient(
+                    url=OLLAMA_URL,
+                    model_id=LLAMA_MODEL_NAME,
+                    params=GENERATION_PARAMS,
+                )
+            else:
+                raise ValueError(f"❌ Unknown LLM backend '{name}'. Use 'granite' or 'ollama'.")
+        return _clients[name]
+
+def register_llm_backend(backend, name=None):
+    """
+    Use `backend` (any LLMBackend) for `name`, default LLM_BACKEND,
+    e.g. a fake backend for benchmarks.
+    """
+    with _client_lock:
+        _clients[name or LLM_BACKEND] = backend
 
-    response = model.generate(prompt=prompt)
+def get_granite_client():
+    """
+    Returns the shared Granite client, creating it on first use.
+    """
+    return get_llm_backend("granite")
 
-    generated_text = response.get("results", [{}])[0].get("generated_text", "")
-    print("---- RAW GRANITE OUTPUT ----")
-    print(generated_text)
-    print("---- END ----")
+def parse_generated_json(generated_text):
+    """
+    Turns raw model output into a dict, repairing common JSON glitches on the way.
+    Raises ValueError if no JSON object can be recovered.
+    """
+    try:
+        data, repairs = parse_json(generated_text)
+    except JSONRepairError as e:
+        log.warning(f"⚠️ JSON decode error: {e}")
+        raise ValueError("❌ Failed to parse JSON. Please check the model output.")
 
-    cleaned_json = sanitize_json_output(generated_text)
+    if repairs:
+        log.info(f"🩹 Repaired model JSON: {', '.join(repairs)}", extra={"repairs": repairs})
+        count("json_repairs")
+    if not isinstance(data, dict):
+        raise ValueError("❌ Failed to parse JSON. Please check the model output.")
+    return data
 
+def generate_streaming(prompt, on_section=None):
+    """
+    Streams the model response through an incremental JSON parser.
+    - `on_section(key, value)` is called as each top-level section completes.
+    - Generation stops as soon as the top-level object closes.
+    """
+    parser = IncrementalJSONParser()
+    stream = get_llm_backend().generate_stream(prompt)
     try:
-        data = json.loads(cleaned_json)
-    except json.JSONDecodeError as e:
-        print(f"⚠️ JSON decode error: {e}")
-        raise ValueError("❌ Failed to parse JSON. Please check the model output.")
+        for piece in stream:
+            for key, value in parser.feed(piece):
+                if on_section:
+                    on_section(key, value)
+            if parser.done:
+                break
+    finally:
+        stream.close()
+    return parser.text
+
+def extract_resume_info(text, chunked=None, stream=None, on_section=None):
+    """
+    Calls the configured LLM backend (IBM Granite by default) with the parsing prompt
+    and returns structured JSON.
+    Results are served from the on-disk cache when the same text was parsed before.
+    - chunked=None: use section-chunked extraction for long resumes if LLM_CHUNKED_MODE is on.
+    - chunked=True/False: force either mode.
+    - stream=None: stream the response if LLM_STREAMING is on; `on_section(key, value)`
+      then receives each top-level section as soon as it is complete.
+    """
+    if chunked is None:
+        chunked = LLM_CHUNKED_MODE and should_chunk(text)
+    if stream is None:
+        stream = LLM_STREAMING
+
+    backend = get_llm_backend()
+    cache = get_extraction_cache() if LLM_CACHE_ENABLED else None
+    prompt_template = CHUNKED_PROMPT_FINGERPRINT if chunked else PROMPT_TEMPLATE
+    cache_key = make_cache_key(text, prompt_template, backend.model_id, GENERATION_PARAMS)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            log.info(f"♻️ Using cached {backend.name} result.")
+            count("cache_hits")
+            return cached
+        count("cache_misses")
+
+    if chunked:
+        log.info("🧩 Long resume: extracting section chunks concurrently...")
+        data = extract_resume_info_chunked(
+            text,
+            generate=bind_scope(backend.generate),
+            parse=parse_generated_json,
+            params=GENERATION_PARAMS,
+        )
+    elif stream:
+        prompt = PROMPT_TEMPLATE.replace("{text}", text)
+        data = parse_generated_json(generate_streaming(prompt, on_section))
+    else:
+        prompt = PROMPT_TEMPLATE.replace("{text}", text)
+
+        generated_text = backend.generate(prompt)
+        # Raw output only at DEBUG: printing it for every resume is slow on big batches
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"---- RAW {backend.name.upper()} OUTPUT ----\n{generated_text}\n---- END ----")
+
+        data = parse_generated_json(generated_text)
+
+    if cache is not None:
+        cache.set(cache_key, data)
 
     return data
+
+def extract_resume_info_batch(texts, batch_size=LLM_BATCH_SIZE, retries=LLM_BATCH_RETRIES, **kwargs):
+    """
+    Extracts many resumes at once, keeping up to `batch_size` generate calls in flight
+    on the shared client.
+    - Cached and duplicate texts are only resolved once.
+    - Items that fail are re-submitted up to `retries` more times; the rest are not redone.
+    Returns a list of (data, error) pairs in the same order as `texts`;
+    `error` is None on success, `data` is None on failure.
+    Extra keyword arguments are passed on to extract_resume_info.
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    results = {}
+    errors = {}
+    pending = unique_texts
+
+    with ThreadPoolExecutor(max_workers=max(1, batch_size)) as pool:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                log.info(f"🔁 Retrying {len(pending)} failed resume(s) (round {attempt}/{retries})...")
+            futures = {text: pool.submit(extract_resume_info, text, **kwargs) for text in pending}
+            failed = []
+            for text, future in futures.items():
+                try:
+                    results[text] = future.result()
+                    errors.pop(text, None)
+                except Exception as e:
+                    errors[text] = e
+                    failed.append(text)
+            pending = failed
+
+    if errors:
+        log.warning(f"⚠️ {len(errors)}/{len(unique_texts)} resume(s) failed after {retries + 1} attempt(s).")
+    return [(results.get(text), errors.get(text)) for text in texts]
@@ -0,0 +1,539 @@
+"""
+Durable queue of resume jobs shared by several worker processes.
+
+Each resume is one job. A worker leases a few jobs at a time and renews the lease
+with heartbeats while it works on them. Jobs whose lease runs out (their worker
+died or hung) go back to the queue. A job that failed or timed out
+JOB_MAX_ATTEMPTS times is moved to the dead-letter list instead of being retried.
+
+Backends:
+- "sqlite": one SQLite file, for workers on one host.
+- "directory": one small JSON file per job, moved between state folders with
+  atomic renames, for workers on several hosts sharing a filesystem (where
+  SQLite locking can't be trusted).
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import (
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_BACKEND,
+    JOB_QUEUE_DIRECTORY,
+    JOB_QUEUE_PATH,
+)
+from utils.metrics import get_logger
+from utils.run_manifest import file_hash
+
+log = get_logger("job_queue")
+
+# Job states
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+JOB_STATES = (QUEUED, LEASED, DONE, DEAD)
+
+
+def job_id(path):
+    return hashlib.sha1(os.path.normpath(path).encode("utf-8")).hexdigest()[:20]
+
+
+class JobQueue:
+    """
+    Interface shared by the queue backends. Jobs are dicts with `id`, `path`,
+    `content_hash`, `state`, `attempts`, `stages` (pipeline stages finished),
+    `worker`, `error` and `updated_at`.
+    - `add(paths)` queues new files and files whose content changed since their
+      job finished; returns the number queued.
+    - `claim(worker, limit)` leases up to `limit` queued jobs (re-queueing expired
+      leases first) and returns them.
+    - `heartbeat(worker, ids)` renews leases; returns the ids whose lease was lost.
+    - `complete` / `fail` end a lease; a failed job is retried until it has been
+      attempted `max_attempts` times, then it is dead-lettered.
+    - A successful `complete` also flags the shared summary and search index as
+      stale, in the same step, so the flag is set before the queue can look
+      drained. `take_outputs_stale()` clears the flag and returns True for
+      exactly one caller, which does the rebuild.
+    """
+
+    def __init__(self, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def add(self, paths):
+        raise NotImplementedError
+
+    def claim(self, worker, limit=1):
+        raise NotImplementedError
+
+    def heartbeat(self, worker, ids):
+        raise NotImplementedError
+
+    def complete(self, worker, id, stages=()):
+        raise NotImplementedError
+
+    def fail(self, worker, id, error, stages=()):
+        raise NotImplementedError
+
+    def jobs(self, state=None):
+        raise NotImplementedError
+
+    def retry_dead(self):
+        """
+        Re-queues every dead-lettered job with a fresh attempt count; returns how many.
+        """
+        raise NotImplementedError
+
+    def take_outputs_stale(self):
+        raise NotImplementedError
+
+    def stats(self):
+        counts = dict.fromkeys(JOB_STATES, 0)
+        for job in self.jobs():
+            counts[job["state"]] += 1
+        return counts
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _content_hashes(paths):
+    for path in paths:
+        try:
+            yield path, file_hash(path)
+        except OSError as e:
+            log.error(f"❌ Could not read {os.path.basename(path)}: {e}")
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Jobs in one SQLite table. Claims run in an IMMEDIATE transaction, so two
+    workers never lease the same job.
+    """
+
+    def __init__(self, db_path=JOB_QUEUE_PATH, **options):
+        super().__init__(**options)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, "
+                "path TEXT NOT NULL, "
+                "content_hash TEXT NOT NULL, "
+                "state TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "stages TEXT NOT NULL DEFAULT '[]', "
+                "worker TEXT, "
+                "lease_expires REAL, "
+                "error TEXT, "
+                "created_at REAL, "
+                "updated_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _job(row):
+        job = dict(row)
+        job["stages"] = json.loads(job["stages"])
+        return job
+
+    def add(self, paths):
+        hashes = list(_content_hashes(paths))
+        added = 0
+        now = time.time()
+        with self._transaction():
+            for path, content_hash in hashes:
+                row = self._conn.execute(
+                    "SELECT state, content_hash FROM jobs WHERE id = ?", (job_id(path),)
+                ).fetchone()
+                if row is not None and (row["state"] in (QUEUED, LEASED) or row["content_hash"] == content_hash):
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, path, content_hash, state, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id(path), path, content_hash, QUEUED, now, now),
+                )
+                added += 1
+        return added
+
+    def _expire_leases(self, now):
+        expired = self._conn.execute(
+            "SELECT id, path, attempts FROM jobs WHERE state = ? AND lease_expires < ?", (LEASED, now)
+        ).fetchall()
+        for row in expired:
+            dead = row["attempts"] >= self.max_attempts
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (DEAD if dead else QUEUED, "lease expired", now, row["id"]),
+            )
+            _log_expired(row["path"], dead)
+
+    def claim(self, worker, limit=1):
+        now = time.time()
+        with self._transaction():
+            self._expire_leases(now)
+            ids = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE state = ? ORDER BY created_at, id LIMIT ?", (QUEUED, limit)
+            )]
+            for id in ids:
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    (LEASED, worker, now + self.lease_seconds, now, id),
+                )
+            return [
+                self._job(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (id,)).fetchone())
+                for id in ids
+            ]
+
+    def heartbeat(self, worker, ids):
+        now = time.time()
+        lost = set()
+        with self._transaction():
+            for id in ids:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND state = ? AND worker = ?",
+                    (now + self.lease_seconds, now, id, LEASED, worker),
+                )
+                if not cursor.rowcount:
+                    lost.add(id)
+        return lost
+
+    def _finish(self, worker, id, state, error, stages):
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND state = ? AND worker = ?", (id, LEASED, worker)
+            ).fetchone()
+            if row is None:
+                return None
+            if state is None:
+                state = DEAD if row["attempts"] >= self.max_attempts else QUEUED
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_expires = NULL, error = ?, stages = ?, "
+                "updated_at = ? WHERE id = ?",
+                (state, error, json.dumps(list(stages)), time.time(), id),
+            )
+            if state == DONE:
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('outputs_stale', '1')")
+            return state
+
+    def complete(self, worker, id, stages=()):
+        """
+        Returns False if the lease was lost (the job was re-queued meanwhile).
+        """
+        return self._finish(worker, id, DONE, None, stages) is not None
+
+    def fail(self, worker, id, error, stages=()):
+        """
+        Returns the job's new state (queued or dead), or None if the lease was lost.
+        """
+        return self._finish(worker, id, None, error, stages)
+
+    def jobs(self, state=None):
+        with self._lock:
+            if state is None:
+                rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at, id").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE state = ? ORDER BY created_at, id", (state,)
+                ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def stats(self):
+        counts = dict.fromkeys(JOB_STATES, 0)
+        with self._lock:
+            for row in self._conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+                counts[row["state"]] = row["n"]
+        return counts
+
+    def retry_dead(self):
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, error = NULL, updated_at = ? WHERE state = ?",
+                (QUEUED, time.time(), DEAD),
+            )
+            return cursor.rowcount
+
+    def take_outputs_stale(self):
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE meta SET value = '0' WHERE key = 'outputs_stale' AND value = '1'"
+            )
+            return cursor.rowcount == 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DirectoryJobQueue(JobQueue):
+    """
+    Jobs as JSON files under <folder>/<state>/<id>.json.
+    - A job changes state by being renamed into tmp/ under a unique name, which
+      only one worker can win, updated there, and renamed into its new state
+      folder. No job is ever in two state folders at once.
+    - Ownership is checked on the file already moved into tmp/, so a lease that
+      expired and went to another worker is put back untouched.
+    - A leased file's mtime is its last heartbeat. Leases older than the lease
+      time, and tmp/ files left by a worker that crashed mid-move (by ctime),
+      are put back by whichever worker claims next.
+    - The outputs-stale flag is a marker file; renaming it away takes it.
+    """
+
+    def __init__(self, folder=JOB_QUEUE_DIRECTORY, **options):
+        super().__init__(**options)
+        self.folder = folder
+        for name in JOB_STATES + ("tmp",):
+            os.makedirs(os.path.join(folder, name), exist_ok=True)
+
+    def _path(self, state, id):
+        return os.path.join(self.folder, state, f"{id}.json")
+
+    def _tmp_path(self, id):
+        return os.path.join(self.folder, "tmp", f"{id}.{uuid.uuid4().hex}.json")
+
+    def _ids(self, state):
+        names = sorted(os.listdir(os.path.join(self.folder, state)))
+        return [name[:-len(".json")] for name in names if name.endswith(".json")]
+
+    def _read(self, state, id):
+        try:
+            with open(self._path(state, id), "r", encoding="utf-8") as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        job["state"] = state
+        return job
+
+    def _write(self, state, job):
+        job = dict(job, state=state, updated_at=time.time())
+        tmp_path = self._tmp_path(job["id"])
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.rename(tmp_path, self._path(state, job["id"]))
+        return job
+
+    def _transition(self, id, source, decide):
+        """
+        Moves job `id` out of `source`; `decide(job)` returns its (new state, changed fields),
+        or None to put it back unchanged. Returns the updated job, or None if the job
+        was put back or another worker moved it first.
+        """
+        tmp_path = self._tmp_path(id)
+        try:
+            os.rename(self._path(source, id), tmp_path)
+        except FileNotFoundError:
+            return None
+        try:
+            with open(tmp_path, "r", encoding="utf-8") as f:
+                job = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.error(f"❌ Dropping unreadable job file {id}: {e}")
+            os.remove(tmp_path)
+            return None
+        decision = decide(job)
+        if decision is None:
+            os.rename(tmp_path, self._path(source, id))
+            return None
+        state, changes = decision
+        job.update(changes, state=state, updated_at=time.time())
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.rename(tmp_path, self._path(state, id))
+        return job
+
+    def _exists(self, id, states=JOB_STATES):
+        return any(os.path.exists(self._path(state, id)) for state in states)
+
+    def add(self, paths):
+        added = 0
+        for path, content_hash in _content_hashes(paths):
+            id = job_id(path)
+            if self._exists(id, (QUEUED, LEASED)):
+                continue
+            previous = next(filter(None, (self._read(state, id) for state in (DONE, DEAD))), None)
+            if previous is not None and previous["content_hash"] == content_hash:
+                continue
+            now = time.time()
+            self._write(QUEUED, {
+                "id": id, "path": path, "content_hash": content_hash, "attempts": 0, "stages": [],
+                "worker": None, "error": None, "created_at": now,
+            })
+            for state in (DONE, DEAD):
+                try:
+                    os.remove(self._path(state, id))
+                except FileNotFoundError:
+                    pass
+            added += 1
+        return added
+
+    def _expire_leases(self):
+        now = time.time()
+
+        def _decide(job):
+            dead = job["attempts"] >= self.max_attempts
+            _log_expired(job["path"], dead)
+            return (DEAD if dead else QUEUED), {"worker": None, "error": "lease expired"}
+
+        for id in self._ids(LEASED):
+            try:
+                if now - os.stat(self._path(LEASED, id)).st_mtime < self.lease_seconds:
+                    continue
+            except FileNotFoundError:
+                continue
+            self._transition(id, LEASED, _decide)
+
+        tmp_folder = os.path.join(self.folder, "tmp")
+        for name in os.listdir(tmp_folder):
+            tmp_path = os.path.join(tmp_folder, name)
+            try:
+                # ctime, not mtime: a rename keeps the mtime but updates the ctime
+                if now - os.stat(tmp_path).st_ctime < self.lease_seconds:
+                    continue
+            except FileNotFoundError:
+                continue
+            id = name.split(".", 1)[0]
+            if self._exists(id):
+                os.remove(tmp_path)
+                continue
+            log.warning(f"⏰ Recovering job {id} left mid-move by a crashed worker.")
+            os.rename(tmp_path, self._path(QUEUED, id))
+
+    def claim(self, worker, limit=1):
+        self._expire_leases()
+        claimed = []
+        for id in self._ids(QUEUED):
+            if len(claimed) >= limit:
+                break
+            job = self._transition(
+                id, QUEUED, lambda job: (LEASED, {"worker": worker, "attempts": job["attempts"] + 1}),
+            )
+            if job is not None:
+                claimed.append(job)
+        return claimed
+
+    def heartbeat(self, worker, ids):
+        lost = set()
+        for id in ids:
+            tmp_path = self._tmp_path(id)
+            try:
+                os.rename(self._path(LEASED, id), tmp_path)
+            except FileNotFoundError:
+                lost.add(id)
+                continue
+            try:
+                with open(tmp_path, "r", encoding="utf-8") as f:
+                    owned = json.load(f).get("worker") == worker
+            except (OSError, ValueError):
+                owned = False
+            if owned:
+                os.utime(tmp_path)
+            else:
+                lost.add(id)
+            os.rename(tmp_path, self._path(LEASED, id))
+        return lost
+
+    def _finish(self, worker, id, state, error, stages):
+        def _decide(job):
+            if job.get("worker") != worker:
+                return None  # the lease expired and the job went to another worker
+            new_state = state or (DEAD if job["attempts"] >= self.max_attempts else QUEUED)
+            if new_state == DONE:
+                # Still in tmp/ (counted as leased), so the queue can't look drained before this
+                open(os.path.join(self.folder, "outputs.stale"), "a").close()
+            return new_state, {"worker": None, "error": error, "stages": list(stages)}
+
+        job = self._transition(id, LEASED, _decide)
+        return job and job["state"]
+
+    def complete(self, worker, id, stages=()):
+        return self._finish(worker, id, DONE, None, stages) is not None
+
+    def fail(self, worker, id, error, stages=()):
+        return self._finish(worker, id, None, error, stages)
+
+    def jobs(self, state=None):
+        jobs = []
+        for name in (state,) if state else JOB_STATES:
+            jobs.extend(filter(None, (self._read(name, id) for id in self._ids(name))))
+        return sorted(jobs, key=lambda job: (job.get("created_at") or 0, job["id"]))
+
+    def stats(self):
+        counts = {state: len(self._ids(state)) for state in JOB_STATES}
+        # Jobs in the middle of a move count as leased, so the queue never looks drained early
+        counts[LEASED] += len(os.listdir(os.path.join(self.folder, "tmp")))
+        return counts
+
+    def take_outputs_stale(self):
+        taken = os.path.join(self.folder, f"outputs.stale.{uuid.uuid4().hex}")
+        try:
+            os.rename(os.path.join(self.folder, "outputs.stale"), taken)
+        except FileNotFoundError:
+            return False
+        os.remove(taken)
+        return True
+
+    def retry_dead(self):
+        retried = 0
+        for id in self._ids(DEAD):
+            if self._transition(id, DEAD, lambda job: (QUEUED, {"attempts": 0, "error": None})):
+                retried += 1
+        return retried
+
+
+def _log_expired(path, dead):
+    if dead:
+        log.error(f"☠️ Lease expired on the last attempt, dead-lettered: {os.path.basename(path)}")
+    else:
+        log.warning(f"⏰ Lease expired, re-queued: {os.path.basename(path)}")
+
+
+JOB_QUEUE_BACKENDS = {
+    "sqlite": (SQLiteJobQueue, JOB_QUEUE_PATH),
+    "directory": (DirectoryJobQueue, JOB_QUEUE_DIRECTORY),
+}
+
+
+def open_job_queue(backend=JOB_QUEUE_BACKEND, location=None, **options):
+    """
+    Returns the job queue for `backend` ("sqlite" or "directory") at `location`
+    (default JOB_QUEUE_PATH / JOB_QUEUE_DIRECTORY).
+    """
+    if backend not in JOB_QUEUE_BACKENDS:
+        raise ValueError(f"❌ Unknown job queue backend: {backend}")
+    queue_class, default_location = JOB_QUEUE_BACKENDS[backend]
+    location = location or default_location
+    os.makedirs(os.path.dirname(location) or ".", exist_ok=True)
+    return queue_class(location, **options)
@@ -0,0 +1,323 @@
+import re
+import json
+
+# Quote characters LLMs use in place of a plain double quote
+OPENING_QUOTES = {'"': '"', "'": "'", "“": "”", "”": "”"}
+LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None,
+}
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_BARE_WORD = re.compile(r"[A-Za-z_$][\w$\-.]*")
+_BARE_VALUE = re.compile(r"[^,}\]\n]*")
+# Runs of ordinary string characters, per closing quote (stops at escapes, newlines and quotes)
+_STRING_RUN = {
+    closing: re.compile("[^\\\\\n'\"" + closing + "]+") for closing in set(OPENING_QUOTES.values())
+}
+_VALUE_STARTS = tuple(OPENING_QUOTES) + ("{", "[", ",", "}")
+# Objects/arrays nested deeper than this are rejected rather than overflowing the stack;
+# resume JSON is a handful of levels deep
+MAX_NESTING_DEPTH = 100
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _find_root_start(text):
+    # Resume output is an object; only fall back to a bare array if there is none
+    start = text.find("{")
+    return start if start != -1 else text.find("[")
+
+
+class JSONRepairError(ValueError):
+    """
+    Raised when no JSON object or array can be recovered from the text.
+    """
+
+
+class _TolerantParser:
+    """
+    Single-pass recursive-descent JSON parser that repairs common LLM glitches
+    instead of failing, and records every repair it makes.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.length = len(text)
+        self.pos = 0
+        self.depth = 0
+        self.repairs = []
+
+    def repair(self, message):
+        if message not in self.repairs:
+            self.repairs.append(message)
+
+    def skip_whitespace(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            # Comments are not JSON, but models sometimes add them
+            if self.text.startswith("//", self.pos):
+                end = self.text.find("\n", self.pos)
+                self.pos = self.length if end == -1 else end
+                self.repair("removed comment")
+                continue
+            return
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < self.length else ""
+
+    def parse_root(self):
+        start = _find_root_start(self.text)
+        if start == -1:
+            raise JSONRepairError("❌ No JSON block found in output.")
+        if self.text[:start].strip():
+            self.repair("skipped leading text")
+        self.pos = start
+
+        value = self.parse_value()
+        self.skip_whitespace()
+        if self.pos < self.length and self.text[self.pos:].strip().strip("`").strip():
+            self.repair("ignored trailing text")
+        return value
+
+    def parse_value(self):
+        self.skip_whitespace()
+        char = self.peek()
+        if char in ("{", "["):
+            if self.depth >= MAX_NESTING_DEPTH:
+                raise JSONRepairError(f"❌ JSON nested deeper than {MAX_NESTING_DEPTH} levels.")
+            self.depth += 1
+            value = self.parse_object() if char == "{" else self.parse_array()
+            self.depth -= 1
+            return value
+        if char in OPENING_QUOTES:
+            return self.parse_string()
+        if char == "-" or char.isdigit():
+            match = _NUMBER.match(self.text, self.pos)
+            if match:
+                self.pos = match.end()
+                number = match.group()
+                return float(number) if any(c in number for c in ".eE") else int(number)
+        if not char:
+            raise EOFError
+        return self.parse_bare_value()
+
+    def parse_bare_value(self):
+        match = _BARE_WORD.match(self.text, self.pos)
+        if match and match.group() in LITERALS:
+            word = match.group()
+            self.pos = match.end()
+            if word not in ("true", "false", "null"):
+                self.repair("converted Python literal")
+            return LITERALS[word]
+
+        # Unquoted text: read up to the next structural character or line end
+        end = _BARE_VALUE.match(self.text, self.pos).end()
+        value = self.text[self.pos:end].strip()
+        self.pos = end
+        self.repair("quoted bare value")
+        return value
+
+    def parse_string(self, is_key=False):
+        quote = self.text[self.pos]
+        closing = OPENING_QUOTES[quote]
+        if quote == "'":
+            self.repair("replaced single quotes")
+        elif quote != '"':
+            self.repair("replaced smart quotes")
+        self.pos += 1
+
+        run = _STRING_RUN[closing]
+        chunks = []
+        while self.pos < self.length:
+            match = run.match(self.text, self.pos)
+            if match:
+                chunks.append(match.group())
+                self.pos = match.end()
+                if self.pos >= self.length:
+                    break
+            char = self.text[self.pos]
+
+            if char == "\\":
+                escape = self.text[self.pos + 1:self.pos + 2]
+                if escape == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", self.text[self.pos + 2:self.pos + 6]):
+                    chunks.append(chr(int(self.text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                elif escape in _ESCAPES:
+                    chunks.append(_ESCAPES[escape])
+                    self.pos += 2
+                else:
+                    chunks.append(escape)
+                    self.pos += 2
+                    self.repair("fixed invalid escape")
+                continue
+
+            if char == closing or (closing == "”" and char == '"'):
+                self.pos += 1
+                return "".join(chunks)
+
+            if is_key and char == "'" and quote == '"':
+                # "Key': value -> the key ends at the stray single quote
+                lookahead = _WHITESPACE.match(self.text, self.pos + 1).end()
+                if self.text[lookahead:lookahead + 1] == ":":
+                    self.pos += 1
+                    self.repair("fixed mismatched key quote")
+                    return "".join(chunks)
+
+            if char == "\n":
+                if quote == '"':
+                    self.repair("escaped newline in string")
+                chunks.append(char)
+                self.pos += 1
+                continue
+
+            chunks.append(char)
+            self.pos += 1
+
+        self.repair("closed truncated string")
+        return "".join(chunks)
+
+    def parse_key(self):
+        char = self.peek()
+        if char in OPENING_QUOTES:
+            return self.parse_string(is_key=True)
+        match = _BARE_WORD.match(self.text, self.pos)
+        if not match:
+            return None
+        self.pos = match.end()
+        self.repair("quoted bare key")
+        return match.group()
+
+    def parse_object(self):
+        self.pos += 1  # "{"
+        result = {}
+
+        while True:
+            self.skip_whitespace()
+            char = self.peek()
+
+            if not char:
+                self.repair("closed truncated object")
+                return result
+            if char == "}":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                self.skip_whitespace()
+                if self.peek() == "}":
+                    self.repair("removed trailing comma")
+                continue
+            if char == "]":
+                # Mismatched bracket: treat as the end of this object
+                self.pos += 1
+                self.repair("fixed mismatched bracket")
+                return result
+
+            key = self.parse_key()
+            if key is None:
+                # Unexpected character where a key should be; skip it
+                self.pos += 1
+                self.repair("skipped stray character")
+                continue
+
+            self.skip_whitespace()
+            if self.peek() == ":":
+                self.pos += 1
+            elif self.peek() in ("", "}", ","):
+                self.repair("dropped key without value")
+                continue
+            else:
+                # e.g. "Email"L"john@example.com": skip junk up to the value
+                while self.pos < self.length and self.text[self.pos] not in _VALUE_STARTS:
+                    if self.text[self.pos] == "\n":
+                        break
+                    self.pos += 1
+                self.repair("inserted missing colon")
+
+            try:
+                result[key] = self.parse_value()
+            except EOFError:
+                self.repair("dropped key without value")
+                return result
+
+            self.skip_whitespace()
+            char = self.peek()
+            if char and char not in ",}]":
+                self.repair("inserted missing comma")
+
+    def parse_array(self):
+        self.pos += 1  # "["
+        result = []
+
+        while True:
+            self.skip_whitespace()
+            char = self.peek()
+
+            if not char:
+                self.repair("closed truncated array")
+                return result
+            if char == "]":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                self.skip_whitespace()
+                if self.peek() == "]":
+                    self.repair("removed trailing comma")
+                continue
+            if char == "}":
+                self.pos += 1
+                self.repair("fixed mismatched bracket")
+                return result
+
+            try:
+                result.append(self.parse_value())
+            except EOFError:
+                self.repair("closed truncated array")
+                return result
+
+            self.skip_whitespace()
+            char = self.peek()
+            if char and char not in ",]}":
+                self.repair("inserted missing comma")
+
+
+def parse_json(raw):
+    """
+    Parse LLM output into a Python object, repairing it if needed.
+    Returns (value, repairs) where `repairs` lists the fixes that were applied.
+    - Strict JSON (optionally wrapped in chatter or code fences) takes the fast path.
+    - Otherwise a single linear pass fixes single/smart quotes, missing or trailing
+      commas, missing colons, bare keys/values, Python literals and truncation.
+    - Nesting deeper than MAX_NESTING_DEPTH raises JSONRepairError.
+    """
+    if raw is None:
+        raise JSONRepairError("❌ No JSON block found in output.")
+
+    start = _find_root_start(raw)
+    end = raw.rfind("}" if raw[start:start + 1] == "{" else "]")
+    if start != -1 and end > start:
+        try:
+            value = json.loads(raw[start:end + 1])
+            repairs = []
+            if raw[:start].strip() or raw[end + 1:].strip():
+                repairs.append("stripped surrounding text")
+            return value, repairs
+        except (ValueError, RecursionError):
+            pass
+
+    parser = _TolerantParser(raw)
+    try:
+        value = parser.parse_root()
+    except EOFError:
+        raise JSONRepairError("❌ Output ended before any JSON value.")
+    return value, parser.repairs
+
+
+def repair_json(raw):
+    """
+    Like parse_json, but returns (valid JSON text, repairs).
+    """
+    value, repairs = parse_json(raw)
+    return json.dumps(value, ensure_ascii=False), repairs
@@ -0,0 +1,84 @@
+import json
+
+from utils.json_repair import parse_json
+
+
+class IncrementalJSONParser:
+    """
+    Consumes a streamed JSON object chunk by chunk.
+    - Anything before the first '{' (chatter, code fences) is ignored.
+    - `feed()` returns the (key, value) pairs of top-level members completed so far,
+      so callers can use finished sections before the whole object arrives.
+    - `done` turns True as soon as the top-level object closes; anything after it is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self.sections = {}
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+
+    def feed(self, chunk):
+        completed = []
+        if self.done or not chunk:
+            return completed
+
+        if not self._started:
+            start = chunk.find("{")
+            if start == -1:
+                return completed
+            chunk = chunk[start:]
+
+        offset = len(self.text)
+        self.text += chunk
+        for position in range(offset, len(self.text)):
+            char = self.text[position]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if not self._started:
+                    self._started = True
+                    self._member_start = position + 1
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(position, completed)
+                    self.text = self.text[:position + 1]
+                    self.done = True
+                    break
+            elif char == "," and self._depth == 1:
+                self._complete_member(position, completed)
+
+        return completed
+
+    def _complete_member(self, end, completed):
+        member = self.text[self._member_start:end].strip()
+        self._member_start = end + 1
+        if not member:
+            return completed
+        try:
+            parsed = json.loads("{" + member + "}")
+        except ValueError:
+            try:
+                parsed, _ = parse_json("{" + member + "}")
+            except ValueError:
+                return completed  # unrecoverable member; left to the final parse
+        for key, value in parsed.items():
+            self.sections[key] = value
+            completed.append((key, value))
+        return completed
@@ -0,0 +1,23 @@
+class LLMBackend:
+    """
+    Interface shared by the text generation clients (watsonx.ai Granite, local Ollama).
+    Clients are long-lived and safe to share across threads.
+    - `generate(prompt, params)` returns the generated text.
+    - `generate_stream(prompt, params)` yields pieces of it as they arrive.
+    `params` use the watsonx.ai names (max_new_tokens, temperature, ...);
+    each backend translates them for its own API.
+    """
+
+    name = None
+    model_id = None
+    params = None
+
+    def generate(self, prompt, params=None):
+        raise NotImplementedError
+
+    def generate_stream(self, prompt, params=None):
+        # Backends without streaming yield the whole output at once
+        yield self.generate(prompt, params)
+
+    def close(self):
+        pass
@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+from config import LLM_CACHE_FOLDER, LLM_CACHE_MAX_BYTES
+
+
+def make_cache_key(text, prompt_template, model_id, params):
+    """
+    Content-addressed key: the same text sent with the same prompt,
+    model and decoding parameters always maps to the same entry.
+    """
+    payload = json.dumps(
+        {
+            "text": text,
+            "prompt_template": prompt_template,
+            "model_id": model_id,
+            "params": params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of structured LLM results.
+    - One JSON file per key, written atomically (temp file + os.replace),
+      so several processes can share the same folder.
+    - Reads refresh the file mtime; when the folder grows past `max_bytes`
+      the least recently used entries are evicted.
+    """
+
+    def __init__(self, folder=LLM_CACHE_FOLDER, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._approx_bytes = None  # lazily measured, resynced on every eviction pass
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += os.path.getsize(path)
+            needs_eviction = self._approx_bytes is None or self._approx_bytes > self.max_bytes
+        if needs_eviction:
+            self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in 90% of `max_bytes`.
+        """
+        if not self.max_bytes:
+            return
+
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= target:
+                    break
+
+        with self._lock:
+            self._approx_bytes = total
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """
+    Shared process-wide cache instance.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
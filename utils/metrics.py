@@ -0,0 +1,231 @@
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from config import LOG_FORMAT, LOG_LEVEL
+
+LOGGER_NAME = "resume_parser"
+
+_local = threading.local()
+_configure_lock = threading.Lock()
+_configured = False
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    One JSON object per line, including any `extra={...}` fields passed to the log call.
+    """
+
+    _RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in self._RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _configure_logging():
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonLogFormatter() if LOG_FORMAT == "json" else logging.Formatter("%(message)s"))
+        root = logging.getLogger(LOGGER_NAME)
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        _configured = True
+
+
+def get_logger(name=None):
+    """
+    Returns a logger under the "resume_parser" namespace, configured from LOG_LEVEL/LOG_FORMAT.
+    """
+    _configure_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+log = get_logger("metrics")
+
+
+@contextmanager
+def count_scope():
+    """
+    Collects the counts made by this thread (e.g. tokens, retries) while the block runs,
+    so they can be attributed to one resume. Yields a Counter.
+    """
+    previous = getattr(_local, "scope", None)
+    scope = Counter()
+    _local.scope = scope
+    try:
+        yield scope
+    finally:
+        _local.scope = previous
+        if previous is not None:
+            previous.update(scope)
+
+
+def bind_scope(fn):
+    """
+    Wraps `fn` so counts it makes on other threads (e.g. a worker pool) still land
+    in the caller's current count_scope.
+    """
+    scope = getattr(_local, "scope", None)
+    if scope is None:
+        return fn
+
+    def _bound(*args, **kwargs):
+        previous = getattr(_local, "scope", None)
+        _local.scope = scope
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.scope = previous
+
+    return _bound
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class RunMetrics:
+    """
+    Collects per-resume stage timings and run-wide counters, safe to share across threads.
+    - `record(file, stage, seconds, **fields)` adds one timing and, with a `path`,
+      appends it as a JSON line.
+    - `count(name, n)` bumps a counter (and the calling thread's count_scope).
+    - `summary()` / `log_summary()` aggregate the run.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.run_id = time.strftime("%Y%m%dT%H%M%S")
+        self.counters = Counter()
+        self.timings = defaultdict(list)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def _write(self, event):
+        if self._file is not None:
+            self._file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+
+    def count(self, name, n=1):
+        if not n:
+            return
+        scope = getattr(_local, "scope", None)
+        with self._lock:
+            self.counters[name] += n
+            if scope is not None:
+                scope[name] += n
+
+    def merge(self, counts):
+        """
+        Adds counts collected elsewhere (e.g. returned from a worker process).
+        """
+        with self._lock:
+            self.counters.update(counts)
+
+    def record(self, filename, stage, seconds, **fields):
+        with self._lock:
+            self.timings[stage].append(seconds)
+            self._write({
+                "run": self.run_id,
+                "ts": round(time.time(), 3),
+                "file": filename,
+                "stage": stage,
+                "seconds": round(seconds, 4),
+                **fields,
+            })
+
+    @contextmanager
+    def timed(self, filename, stage, **fields):
+        """
+        Times the block as `stage` for `filename`, along with the counts it made
+        (tokens, retries, ...); the yielded dict can take extra fields.
+        Failed blocks are recorded too, with `error` set.
+        """
+        start = time.perf_counter()
+        with count_scope() as counts:
+            try:
+                yield fields
+            except Exception as e:
+                fields["error"] = str(e)[:200]
+                raise
+            finally:
+                self.record(filename, stage, time.perf_counter() - start, **{**counts, **fields})
+
+    def summary(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": len(values),
+                    "total_seconds": round(sum(values), 3),
+                    "p50_seconds": round(_percentile(values, 0.5), 3),
+                    "p95_seconds": round(_percentile(values, 0.95), 3),
+                }
+                for stage, values in self.timings.items() if values
+            }
+            return {
+                "run": self.run_id,
+                "wall_seconds": round(time.perf_counter() - self._started, 3),
+                "stages": stages,
+                "counters": dict(self.counters),
+            }
+
+    def log_summary(self):
+        summary = self.summary()
+        with self._lock:
+            self._write({"run": self.run_id, "ts": round(time.time(), 3), "event": "summary", **summary})
+
+        log.info(f"📈 Run summary ({summary['wall_seconds']}s wall):", extra={"summary": summary})
+        for stage, stats in summary["stages"].items():
+            log.info(f"   {stage:<8} {stats['count']:>5} × p50 {stats['p50_seconds']:.3f}s, "
+                     f"p95 {stats['p95_seconds']:.3f}s, total {stats['total_seconds']:.1f}s")
+        if summary["counters"]:
+            log.info("   " + ", ".join(f"{name}={value}" for name, value in sorted(summary["counters"].items())))
+        return summary
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_metrics = RunMetrics()
+
+
+def get_metrics():
+    """
+    Returns the metrics of the current run (a file-less collector before start_run).
+    """
+    return _metrics
+
+
+def start_run(path=None):
+    """
+    Starts a fresh metrics collector for a run, appending events to `path` if given.
+    """
+    global _metrics
+    _metrics = RunMetrics(path)
+    return _metrics
+
+
+def count(name, n=1):
+    get_metrics().count(name, n)
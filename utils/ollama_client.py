@@ -0,0 +1,159 @@
+import json
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MAX_IN_FLIGHT,
+    OLLAMA_MAX_RETRIES,
+    OLLAMA_TIMEOUT_SECONDS,
+)
+from utils.llm_backend import LLMBackend
+from utils.metrics import count, get_logger
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+CONNECT_TIMEOUT_SECONDS = 10
+
+log = get_logger("ollama")
+
+
+class OllamaAPIError(RuntimeError):
+    """
+    Raised when the local model server is unreachable or keeps failing.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def to_ollama_options(params):
+    """
+    Translates watsonx.ai generation parameters into Ollama `options`.
+    """
+    params = params or {}
+    options = {}
+    if "max_new_tokens" in params:
+        options["num_predict"] = params["max_new_tokens"]
+    if params.get("decoding_method") == "greedy":
+        options["temperature"] = 0
+    elif "temperature" in params:
+        options["temperature"] = params["temperature"]
+    for name in ("top_p", "top_k"):
+        if name in params:
+            options[name] = params[name]
+    if params.get("random_seed") is not None:
+        options["seed"] = params["random_seed"]
+    if params.get("repetition_penalty") is not None:
+        options["repeat_penalty"] = params["repetition_penalty"]
+    if params.get("stop_sequences"):
+        options["stop"] = params["stop_sequences"]
+    return options
+
+
+class OllamaClient(LLMBackend):
+    """
+    Client for a long-running Ollama server (`/api/generate`), safe to share across threads.
+    - One pooled keep-alive HTTP session; the server keeps the model loaded between calls.
+    - A cap on in-flight requests, connect/read timeouts and retries on 5xx or connection errors.
+    `url` can point at a local stub server for testing.
+    """
+
+    name = "ollama"
+
+    def __init__(self, url, model_id, params=None, max_in_flight=OLLAMA_MAX_IN_FLIGHT,
+                 timeout=OLLAMA_TIMEOUT_SECONDS, max_retries=OLLAMA_MAX_RETRIES,
+                 keep_alive=OLLAMA_KEEP_ALIVE):
+        self.url = url.rstrip("/")
+        self.model_id = model_id
+        self.params = params or {}
+        self.timeout = (CONNECT_TIMEOUT_SECONDS, timeout)
+        self.max_retries = max_retries
+        self.keep_alive = keep_alive
+
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _post(self, prompt, params, stream):
+        """
+        POST to /api/generate, retrying with jittered backoff.
+        Returns the decoded JSON body, or the open response when `stream` is set.
+        """
+        payload = {
+            "model": self.model_id,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": to_ollama_options(params or self.params),
+        }
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._session.post(
+                    f"{self.url}/api/generate", json=payload, timeout=self.timeout, stream=stream
+                )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                last_error = OllamaAPIError(f"❌ Ollama request failed: {e}")
+            else:
+                if response.status_code == 200:
+                    return response if stream else response.json()
+                last_error = OllamaAPIError(
+                    f"❌ Ollama request failed ({response.status_code}): {response.text[:200]}",
+                    response.status_code,
+                )
+                response.close()
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise last_error
+
+            if attempt < self.max_retries:
+                delay = random.uniform(0, 2 ** attempt)
+                log.warning(f"🔁 Ollama request failed, retrying in {delay:.1f}s "
+                            f"(attempt {attempt + 1}/{self.max_retries})...")
+                count("llm_retries")
+                time.sleep(delay)
+
+        raise last_error
+
+    def generate(self, prompt, params=None):
+        """
+        Generate text for one prompt and return the generated string.
+        """
+        with self._in_flight:
+            result = self._post(prompt, params, stream=False)
+        count("llm_input_tokens", result.get("prompt_eval_count", 0))
+        count("llm_output_tokens", result.get("eval_count", 0))
+        return result.get("response", "")
+
+    def generate_stream(self, prompt, params=None):
+        """
+        Generate text for one prompt, yielding pieces as the model produces them.
+        Closing the generator early closes the connection and stops generation.
+        """
+        with self._in_flight:
+            response = self._post(prompt, params, stream=True)
+            try:
+                # Newline-delimited JSON: one {"response": ..., "done": ...} object per line
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("error"):
+                        raise OllamaAPIError(f"❌ Ollama generation failed: {event['error']}")
+                    if event.get("response"):
+                        yield event["response"]
+                    if event.get("done"):
+                        count("llm_input_tokens", event.get("prompt_eval_count", 0))
+                        count("llm_output_tokens", event.get("eval_count", 0))
+                        break
+            finally:
+                response.close()
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,548 @@
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from config import (
+    DEDUP_DB_PATH,
+    DEDUP_ENABLED,
+    EXCEL_SUMMARY_PATH,
+    EXTRACT_WORKERS,
+    JSON_FOLDER,
+    LLM_WORKERS,
+    MANIFEST_PATH,
+    METRICS_PATH,
+    OUTPUT_FOLDER,
+    PIPELINE_QUEUE_SIZE,
+    SEARCH_INDEX_ENABLED,
+    SEARCH_INDEX_FOLDER,
+    SUMMARY_FLUSH_EVERY,
+    TEMPLATE_PATH,
+    TEXT_COMPACTION_ENABLED,
+)
+from utils.dedup import NearDuplicateIndex, minhash_signature, similarity
+from utils.postprocessing import clean_extracted_data
+from utils.metrics import count, count_scope, get_logger, start_run
+from utils.run_manifest import RunManifest, file_hash, pending_stages
+from utils.search_index import SearchIndex
+from utils.text_compaction import compact_resume_text
+
+# Define Excel headers
+EXCEL_HEADERS = [
+    "Full Name",
+    "Email",
+    "Phone",
+    "Location",
+    "Recent Employer",
+    "Most Recent Job Title",
+    "Professional Summary",
+    "Total Years of Experience",
+    "Technologies Worked On",
+    "Technology Durations"
+]
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+_STOP = object()  # end-of-stream marker passed between stages
+
+log = get_logger("pipeline")
+
+
+def is_supported_resume(filename):
+    # "~$name.docx" is Word's lock file for an open document, not a resume
+    return not filename.startswith((".", "~$")) and filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def extract_text(filepath):
+    """
+    Stage 1 (process pool): extract text from a PDF/DOCX, with OCR for scanned content.
+    Returns an empty string when nothing could be extracted.
+    """
+    filename = os.path.basename(filepath)
+
+    if filename.lower().endswith(".pdf"):
+        from extractors.pdf_extractor import extract_pdf_text
+        log.info(f"🔍 Extracting text from PDF: {filename}")
+        # Pages without a usable text layer are OCR'd individually
+        return extract_pdf_text(filepath)
+
+    from extractors.docx_extractor import extract_docx_text
+    log.info(f"🔍 Extracting text from DOCX: {filename}")
+    # Embedded images are OCR'd when the document has no text of its own
+    return extract_docx_text(filepath)
+
+
+def extract_text_measured(filepath, signature=False):
+    """
+    extract_text for a worker process: returns (text, seconds, counts, signature) so the
+    parent can record the timing and the counts (e.g. OCR pages) made in the worker.
+    With `signature`, the text's MinHash signature is computed here too (else None).
+    """
+    start = time.perf_counter()
+    with count_scope() as counts:
+        text = extract_text(filepath)
+    text_signature = minhash_signature(text) if signature and text else None
+    return text, time.perf_counter() - start, dict(counts), text_signature
+
+
+def parse_resume(filename, text):
+    """
+    Stage 2 (thread pool): compact the text, send it to IBM Granite and clean the result.
+    Raises ValueError when no usable structured JSON comes back.
+    """
+    from utils.ibm_extractor import extract_resume_info
+
+    if TEXT_COMPACTION_ENABLED:
+        compacted = compact_resume_text(text)
+        note = " (truncated to token budget)" if compacted.truncated else ""
+        log.info(f"🗜️ Compacted {filename}: ~{compacted.tokens_before} → ~{compacted.tokens_after} tokens, "
+                 f"saved ~{compacted.tokens_before - compacted.tokens_after}{note}")
+        text = compacted.text
+        count("compaction_tokens_saved", compacted.tokens_before - compacted.tokens_after)
+
+    log.info(f"📤 Sending text to the LLM → {filename}")
+    extracted_data = extract_resume_info(text)
+
+    if not extracted_data or not isinstance(extracted_data, dict):
+        raise ValueError("No valid structured JSON returned.")
+
+    # Optional: Clean up (if you have postprocessing)
+    try:
+        extracted_data = clean_extracted_data(extracted_data)
+        log.info("🧹 Post-processing cleanup applied.")
+    except Exception as e:
+        log.warning(f"⚠️ Post-processing failed for {filename}: {e}. Continuing without cleanup.")
+
+    return extracted_data
+
+
+def build_excel_row(extracted_data):
+    """
+    Flatten structured resume data into one Excel summary row.
+    """
+    # Estimate technology durations (if you have such logic)
+    try:
+        from utils.tech_duration_estimator import estimate_technology_durations
+        technologies = extracted_data.get("Skills", {}).get("Hard Skill", [])
+        tech_durations = estimate_technology_durations(extracted_data, technologies)
+    except ImportError:
+        tech_durations = "N/A"
+
+    personal = extracted_data.get("Personal Details", {})
+    skills = extracted_data.get("Skills", {})
+    tech_list = skills.get("Hard Skill", [])
+    tech_durations_str = ", ".join(
+        [f"{k}: {v}" for k, v in tech_durations.items()]
+    ) if isinstance(tech_durations, dict) else "N/A"
+
+    return [
+        personal.get("Full Name", "Not Specified"),
+        personal.get("Email", "Not Specified"),
+        personal.get("Phone", "Not Specified"),
+        personal.get("Location", "Not Specified"),
+        extracted_data.get("Recent Employer", "Not Specified"),
+        extracted_data.get("Job Title", "Not Specified"),
+        extracted_data.get("Professional Summary", "Not Specified"),
+        extracted_data.get("Total Years of Experience", "Not Specified"),
+        ", ".join(tech_list) if tech_list else "Not Specified",
+        tech_durations_str
+    ]
+
+
+class DeferredSummary:
+    """
+    Summary sink for runs that leave the summary to `rebuild_summary`, e.g. several
+    workers sharing one output folder: rows are dropped and count as done.
+    """
+
+    def add(self, row, on_flushed=None):
+        if on_flushed:
+            on_flushed()
+
+    def close(self):
+        pass
+
+
+def rebuild_summary(json_folder=JSON_FOLDER, summary_path=EXCEL_SUMMARY_PATH):
+    """
+    Rewrites the summary file (.xlsx, .csv or .jsonl) from every saved resume JSON,
+    swapping it in only once complete. Returns the number of rows written.
+    """
+    from utils.excel_writer import open_summary_sink
+
+    folder = os.path.dirname(os.path.abspath(summary_path))
+    os.makedirs(folder, exist_ok=True)
+    base, extension = os.path.splitext(os.path.basename(summary_path))
+    # Unique per rebuild, so concurrent rebuilds never write into each other's file
+    tmp_path = os.path.join(folder, f".{base}.{uuid.uuid4().hex}.rebuild{extension}")
+
+    rows = 0
+    try:
+        with open_summary_sink(tmp_path, EXCEL_HEADERS, flush_every=SUMMARY_FLUSH_EVERY) as sink:
+            for name in sorted(os.listdir(json_folder)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(json_folder, name), "r", encoding="utf-8") as jf:
+                        data = json.load(jf)
+                except (OSError, ValueError) as e:
+                    log.warning(f"⚠️ Skipping unreadable {name}: {e}")
+                    continue
+                if isinstance(data, dict):
+                    sink.add(build_excel_row(data))
+                    rows += 1
+        if rows:
+            os.replace(tmp_path, summary_path)
+            log.info(f"📊 Rebuilt {summary_path} from {rows} saved resumes.")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
+
+
+def write_outputs(filename, extracted_data, skip_stages=(), on_stage_done=None, summary_sink=None,
+                  json_folder=JSON_FOLDER, output_folder=OUTPUT_FOLDER,
+                  excel_path=EXCEL_SUMMARY_PATH, template_path=TEMPLATE_PATH):
+    """
+    Stage 3 (single writer thread): save JSON, append the Excel row and render the DOCX.
+    - Stages listed in `skip_stages` are not redone.
+    - `on_stage_done(stage, **fields)` is called after each stage succeeds.
+    - With a `summary_sink`, the Excel row is buffered and counts as done once flushed.
+    """
+    from utils.anchor_alignment import get_compiled_template
+    from utils.excel_writer import append_to_excel
+
+    base_name = os.path.splitext(filename)[0]
+    on_stage_done = on_stage_done or (lambda stage, **fields: None)
+
+    # Save JSON
+    if "json" not in skip_stages:
+        json_path = os.path.join(json_folder, f"{base_name}.json")
+        try:
+            with open(json_path, "w", encoding="utf-8") as jf:
+                json.dump(extracted_data, jf, indent=2, ensure_ascii=False)
+            log.info(f"💾 Saved structured JSON: {json_path}")
+        except Exception as e:
+            log.error(f"❌ Failed to save JSON for {filename}: {e}")
+            return
+        on_stage_done("json", json_path=json_path)
+
+    # Append to Excel
+    if "excel" not in skip_stages:
+        try:
+            if summary_sink is not None:
+                summary_sink.add(build_excel_row(extracted_data), on_flushed=lambda: on_stage_done("excel"))
+            else:
+                append_to_excel(excel_path, EXCEL_HEADERS, build_excel_row(extracted_data))
+                log.info(f"📊 Appended summary to Excel: {excel_path}")
+                on_stage_done("excel")
+        except Exception as e:
+            log.warning(f"⚠️ Could not append to Excel: {e}")
+
+    # Fill Word template
+    if "docx" not in skip_stages:
+        log.info("📝 Generating Word document...")
+        try:
+            docx_path = os.path.join(output_folder, f"{base_name}.docx")
+            get_compiled_template(template_path).render_to(docx_path, extracted_data)
+            log.info(f"✅ Done: {docx_path}")
+            on_stage_done("docx")
+        except Exception as e:
+            log.error(f"❌ Error generating DOCX for {filename}: {e}")
+
+
+def _bounded_map(executor, fn, items, max_pending):
+    """
+    Like executor.map, but keeps at most `max_pending` calls in flight and
+    yields (item, result, error) in completion order.
+    """
+    pending = {}
+    items = iter(items)
+    exhausted = False
+
+    while pending or not exhausted:
+        while not exhausted and len(pending) < max_pending:
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(fn, item)] = item
+
+        if not pending:
+            break
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            error = future.exception()
+            yield item, (None if error else future.result()), error
+
+
+def run_pipeline(filepaths, extract_workers=EXTRACT_WORKERS, llm_workers=LLM_WORKERS,
+                 queue_size=PIPELINE_QUEUE_SIZE, manifest_path=MANIFEST_PATH, force=False,
+                 summary_path=EXCEL_SUMMARY_PATH, metrics_path=METRICS_PATH, dedup_path=DEDUP_DB_PATH,
+                 index_folder=SEARCH_INDEX_FOLDER):
+    """
+    Process resumes through a staged pipeline:
+    - extraction/OCR in a process pool of `extract_workers`,
+    - LLM parsing on `llm_workers` threads,
+    - JSON/DOCX output on one writer thread, which also buffers the summary
+      rows for `summary_path` (.xlsx, .csv or .jsonl) and writes them in bulk.
+    Stages are connected by queues holding at most `queue_size` items,
+    and a failure only drops the file it happened on.
+    Finished stages are recorded in the run manifest, so unchanged files are
+    skipped and an interrupted run resumes where it stopped (unless `force`).
+    Per-file stage timings go to `metrics_path` (JSONL) and a summary is logged at the end.
+    With DEDUP_ENABLED, near-duplicates of a resume already parsed (in this or an
+    earlier run, indexed in `dedup_path`) reuse its JSON instead of calling the LLM,
+    and the duplicate clusters are logged at the end.
+    With `summary_path` or `index_folder` set to None, the summary / search index
+    are not updated (rebuild them from the saved JSON afterwards).
+    """
+    if metrics_path:
+        os.makedirs(os.path.dirname(metrics_path) or ".", exist_ok=True)
+    metrics = start_run(metrics_path or None)
+    manifest = RunManifest(manifest_path)
+    llm_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+
+    dedup = NearDuplicateIndex(dedup_path) if DEDUP_ENABLED and dedup_path else None
+    dedup_lock = threading.Lock()
+    in_flight = set()  # resumes being parsed this run that others may duplicate
+    waiting = {}  # in-flight resume -> [(filepath, text, signature)] of its duplicates
+
+    def _files_to_extract():
+        """
+        Route each file to the first stage it still needs; yield the ones needing extraction.
+        """
+        for filepath in filepaths:
+            filename = os.path.basename(filepath)
+            try:
+                record = manifest.start(filepath, file_hash(filepath), force=force)
+            except OSError as e:
+                log.error(f"❌ Could not read {filename}: {e}")
+                continue
+
+            if not pending_stages(record):
+                log.info(f"⏭️ Already processed and unchanged, skipping: {filename}")
+                count("files_skipped")
+                continue
+
+            if record["json"] and record["json_path"] and os.path.exists(record["json_path"]):
+                try:
+                    with open(record["json_path"], "r", encoding="utf-8") as jf:
+                        write_queue.put((filepath, json.load(jf)))
+                    log.info(f"⏩ Resuming {filename} from saved JSON.")
+                    count("files_resumed")
+                    continue
+                except (OSError, ValueError) as e:
+                    log.warning(f"⚠️ Saved JSON for {filename} is unreadable ({e}), reprocessing.")
+
+            if record["extract"] and record["text"]:
+                log.info(f"⏩ Resuming {filename} from extracted text.")
+                count("files_resumed")
+                llm_queue.put((filepath, record["text"]))
+                continue
+
+            yield filepath
+
+    def _load_json(path):
+        try:
+            with open(path, "r", encoding="utf-8") as jf:
+                return json.load(jf)
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def _route_duplicate(filepath, text, signature):
+        """
+        Send a near-duplicate straight to the writer with its match's JSON, or park it
+        until a match parsed in this run is done. Returns False if it needs the LLM.
+        """
+        match = dedup.match(signature, exclude=filepath)
+        with dedup_lock:
+            canonical = match and match["canonical"]
+            data = None
+            if match and canonical not in in_flight:
+                data = _load_json(match["json_path"])
+            if match is None or (canonical not in in_flight and not isinstance(data, dict)):
+                dedup.add(filepath, signature)
+                in_flight.add(filepath)
+                return False
+
+            dedup.add(filepath, signature, canonical=canonical, similarity=match["similarity"])
+            if canonical in in_flight:
+                waiting.setdefault(canonical, []).append((filepath, text, signature))
+
+        count("duplicates_found")
+        log.info(f"♻️ {os.path.basename(filepath)} is a near-duplicate of {os.path.basename(match['path'])} "
+                 f"(similarity {match['similarity']:.2f}), reusing its parsed JSON.")
+        if data is not None:
+            manifest.mark(filepath, "llm")
+            write_queue.put((filepath, data))
+        return True
+
+    def _promote_duplicate(filepath):
+        """
+        After `filepath` failed to parse, the first duplicate waiting on it is parsed
+        instead and the others wait on that one. Returns its (filepath, text) or None.
+        """
+        if dedup is None:
+            return None
+        with dedup_lock:
+            in_flight.discard(filepath)
+            duplicates = waiting.pop(filepath, [])
+            if not duplicates:
+                return None
+            (path, text, signature), rest = duplicates[0], duplicates[1:]
+            dedup.add(path, signature)
+            for other_path, _, other_signature in rest:
+                dedup.add(other_path, other_signature, canonical=path,
+                          similarity=round(similarity(signature, other_signature), 3))
+            in_flight.add(path)
+            waiting[path] = rest
+        log.info(f"🔁 Parsing {os.path.basename(path)} in place of its failed duplicate {os.path.basename(filepath)}.")
+        return path, text
+
+    def _extract_stage():
+        try:
+            with ProcessPoolExecutor(max_workers=extract_workers) as pool:
+                for filepath, result, error in _bounded_map(
+                    pool, partial(extract_text_measured, signature=dedup is not None), _files_to_extract(), queue_size
+                ):
+                    filename = os.path.basename(filepath)
+                    if error is not None:
+                        log.error(f"❌ Error extracting text from {filename}: {error}")
+                        count("extract_errors")
+                        continue
+                    text, seconds, counts, signature = result
+                    metrics.merge(counts)
+                    metrics.record(filename, "extract", seconds, chars=len(text or ""), **counts)
+                    if not text or not text.strip():
+                        log.warning(f"⚠️ Skipping empty or unreadable resume: {filename}")
+                        continue
+                    manifest.mark(filepath, "extract", text=text)
+                    if signature is not None and _route_duplicate(filepath, text, signature):
+                        continue
+                    llm_queue.put((filepath, text))
+        finally:
+            for _ in range(llm_workers):
+                llm_queue.put(_STOP)
+
+    def _parse(filepath, text):
+        """
+        Returns the next (filepath, text) to parse when this one fails and a duplicate takes over.
+        """
+        filename = os.path.basename(filepath)
+        try:
+            with metrics.timed(filename, "llm", chars=len(text)):
+                extracted_data = parse_resume(filename, text)
+        except Exception as e:
+            log.error(f"❌ Error extracting data from {filename}: {e}")
+            count("llm_errors")
+            return _promote_duplicate(filepath)
+        manifest.mark(filepath, "llm")
+        write_queue.put((filepath, extracted_data))
+        return None
+
+    def _llm_stage():
+        while True:
+            item = llm_queue.get()
+            if item is _STOP:
+                return
+            while item is not None:
+                item = _parse(*item)
+
+    def _on_stage_done(filepath, stage, **fields):
+        manifest.mark(filepath, stage, **fields)
+        if dedup is not None and stage == "json":
+            dedup.set_json_path(filepath, fields.get("json_path"))
+
+    def _write_stage():
+        from utils.excel_writer import open_summary_sink
+
+        if summary_path:
+            summary_sink = open_summary_sink(summary_path, EXCEL_HEADERS, flush_every=SUMMARY_FLUSH_EVERY)
+        else:
+            summary_sink = DeferredSummary()
+        search_index = SearchIndex(index_folder) if SEARCH_INDEX_ENABLED and index_folder else None
+
+        def _write(filepath, extracted_data):
+            filename = os.path.basename(filepath)
+            record = manifest.get(filepath) or {}
+            try:
+                with metrics.timed(filename, "write"):
+                    write_outputs(
+                        filename,
+                        extracted_data,
+                        skip_stages=[stage for stage in ("json", "excel", "docx") if record.get(stage)],
+                        on_stage_done=partial(_on_stage_done, filepath),
+                        summary_sink=summary_sink,
+                    )
+                    if search_index is not None:
+                        search_index.add(os.path.splitext(filename)[0], extracted_data)
+            except Exception as e:
+                log.error(f"❌ Error writing outputs for {filename}: {e}")
+
+        try:
+            while True:
+                item = write_queue.get()
+                if item is _STOP:
+                    return
+                filepath, extracted_data = item
+                _write(filepath, extracted_data)
+
+                if dedup is not None:
+                    # Duplicates found while this resume was being parsed get the same data
+                    with dedup_lock:
+                        in_flight.discard(filepath)
+                        duplicates = waiting.pop(filepath, [])
+                    for duplicate_path, _, _ in duplicates:
+                        manifest.mark(duplicate_path, "llm")
+                        _write(duplicate_path, json.loads(json.dumps(extracted_data)))
+        finally:
+            if search_index is not None:
+                search_index.close()
+            try:
+                summary_sink.close()
+            except Exception as e:
+                log.warning(f"⚠️ Could not write summary to {summary_path}: {e}")
+
+    extractor = threading.Thread(target=_extract_stage, name="extract-stage", daemon=True)
+    parsers = [
+        threading.Thread(target=_llm_stage, name=f"llm-stage-{i}", daemon=True)
+        for i in range(llm_workers)
+    ]
+    writer = threading.Thread(target=_write_stage, name="write-stage", daemon=True)
+
+    writer.start()
+    for thread in parsers:
+        thread.start()
+    extractor.start()
+
+    extractor.join()
+    for thread in parsers:
+        thread.join()
+    write_queue.put(_STOP)
+    writer.join()
+    manifest.close()
+
+    if dedup is not None:
+        _log_duplicate_clusters(dedup.clusters(filepaths))
+        dedup.close()
+
+    metrics.log_summary()
+    metrics.close()
+
+
+def _log_duplicate_clusters(clusters):
+    if not clusters:
+        return
+    log.info(f"🧬 {len(clusters)} duplicate cluster(s) in this batch:", extra={"duplicate_clusters": clusters})
+    for canonical, members in clusters.items():
+        duplicates = ", ".join(f"{os.path.basename(path)} ({score:.2f})" for path, score in members)
+        log.info(f"   {os.path.basename(canonical)} ← {duplicates}")
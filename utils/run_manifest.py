@@ -0,0 +1,96 @@
+import time
+import hashlib
+import sqlite3
+import threading
+
+from config import MANIFEST_PATH
+
+# Pipeline stages, in the order they complete for a resume
+STAGES = ("extract", "llm", "json", "excel", "docx")
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a file's content, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    SQLite record of which pipeline stages finished for each input file.
+    - A file whose content hash changed is treated as new (all stages reset).
+    - Stages are marked one by one, so a killed run resumes where it stopped.
+    """
+
+    def __init__(self, db_path=MANIFEST_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            stage_columns = ", ".join(f"{stage} INTEGER NOT NULL DEFAULT 0" for stage in STAGES)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, "
+                "content_hash TEXT NOT NULL, "
+                "text TEXT, "
+                "json_path TEXT, "
+                f"{stage_columns}, "
+                "updated_at REAL)"
+            )
+
+    def get(self, path):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row else None
+
+    def start(self, path, content_hash, force=False):
+        """
+        Returns the record for `path`, resetting it if the file is new,
+        its content changed, or `force` is set.
+        """
+        record = self.get(path)
+        if record and record["content_hash"] == content_hash and not force:
+            return record
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._conn.execute(
+                "INSERT INTO files (path, content_hash, updated_at) VALUES (?, ?, ?)",
+                (path, content_hash, time.time()),
+            )
+        return self.get(path)
+
+    def mark(self, path, stage, **fields):
+        """
+        Record `stage` as finished for `path`, optionally storing `text` / `json_path`.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+
+        assignments = [f"{stage} = 1", "updated_at = ?"]
+        values = [time.time()]
+        for column in ("text", "json_path"):
+            if column in fields:
+                assignments.append(f"{column} = ?")
+                values.append(fields[column])
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE files SET {', '.join(assignments)} WHERE path = ?",
+                (*values, path),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def pending_stages(record):
+    return [stage for stage in STAGES if not record.get(stage)]
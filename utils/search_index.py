@@ -0,0 +1,647 @@
+"""
+Local inverted index over parsed candidates, with no external service.
+
+Storage (in SEARCH_INDEX_FOLDER):
+- segment.bin: compact, memory-mapped segment (sorted term dictionary,
+  uint32 postings, stored candidate summaries, doc ids sorted by years of experience).
+- log.jsonl: adds/updates/removals since the segment was written; replayed into
+  a small in-memory index on open and merged into the segment by compact().
+
+Usage:
+    python -m utils.search_index query 'skill:python AND years>=5 AND NOT location:delhi'
+    python -m utils.search_index rebuild
+    python -m utils.search_index stats
+"""
+import os
+import re
+import sys
+import json
+import mmap
+import uuid
+import bisect
+import struct
+import argparse
+import datetime
+import threading
+from array import array
+from collections import defaultdict
+
+from config import JSON_FOLDER, SEARCH_INDEX_COMPACT_EVERY, SEARCH_INDEX_FOLDER
+from utils.metrics import get_logger
+from utils.skill_matcher import canonical_skill
+
+log = get_logger("search_index")
+
+SEGMENT_FILE = "segment.bin"
+LOG_FILE = "log.jsonl"
+SEGMENT_MAGIC = b"RPIDX001"
+SEGMENT_SECTIONS = ("term_offsets", "terms", "posting_offsets", "postings",
+                    "doc_offsets", "docs", "years_order", "years_sorted")
+
+# Query field -> stored summary field; skills are matched as whole names, the rest by words
+TEXT_FIELDS = {
+    "employer": "employers",
+    "title": "titles",
+    "location": "locations",
+    "education": "education",
+    "language": "languages",
+    "name": "names",
+}
+NUMERIC_FIELDS = ("years",)
+UNKNOWN_YEARS = -1.0
+
+_WORD = re.compile(r"[a-z0-9+#]+(?:[.\-/][a-z0-9+#]+)*")
+_QUERY_TOKEN = re.compile(
+    r'\s*(?:(?P<paren>[()])|(?P<numeric>\w+)\s*(?P<op>>=|<=|>|<|=)\s*(?P<number>\d+(?:\.\d+)?)'
+    r'|(?P<field>\w+):(?:"(?P<quoted>[^"]*)"|(?P<value>[^\s()]+))|"(?P<phrase>[^"]*)"|(?P<word>[^\s()]+))'
+)
+_MONTHS_PER_YEAR = 12
+
+
+class SearchQueryError(ValueError):
+    """
+    Raised for queries that can't be parsed.
+    """
+
+
+def _words(value):
+    return _WORD.findall(str(value).lower())
+
+
+def _skill_term(name):
+    return "skill=" + " ".join(canonical_skill(name).lower().split())
+
+
+def _role_months(duration):
+    """
+    Months covered by a "Jan 2019 – Mar 2022" style duration ("Present" counts up to today).
+    """
+    from utils.tech_duration_estimator import parse_duration
+
+    if not isinstance(duration, str):
+        return 0
+    today = datetime.date.today().strftime("%b %Y")
+    normalized = re.sub(r"\s+(?:-|—|to)\s+", " – ", duration)
+    normalized = re.sub(r"(?i)\b(present|current|till date|now)\b", today, normalized)
+    return parse_duration(normalized)[2]
+
+
+def years_of_experience(data):
+    """
+    "Total Years of Experience" if it holds a number, else the summed role durations.
+    Returns UNKNOWN_YEARS when neither is available.
+    """
+    total = data.get("Total Years of Experience")
+    match = re.search(r"\d+(?:\.\d+)?", str(total)) if total is not None else None
+    if match:
+        return round(float(match.group()), 1)
+
+    months = sum(
+        _role_months(role.get("Duration"))
+        for roles in (data.get("Employment History") or {}).values() if isinstance(roles, list)
+        for role in roles if isinstance(role, dict)
+    )
+    return round(months / _MONTHS_PER_YEAR, 1) if months else UNKNOWN_YEARS
+
+
+def candidate_summary(key, data):
+    """
+    The stored, indexed view of one parsed resume.
+    """
+    personal = data.get("Personal Details") or {}
+    history = data.get("Employment History") or {}
+    skills = data.get("Skills") or {}
+
+    titles = [data.get("Job Title")] + [
+        role.get("Role") for roles in history.values() if isinstance(roles, list)
+        for role in roles if isinstance(role, dict)
+    ]
+    education = [
+        f"{entry.get('Degree', '')} {entry.get('Institution', '')}"
+        for entry in data.get("Education") or [] if isinstance(entry, dict)
+    ]
+
+    def _clean(values):
+        return list(dict.fromkeys(
+            " ".join(str(v).split()) for v in values
+            if isinstance(v, str) and v.strip() and v.strip().lower() != "not specified"
+        ))
+
+    return {
+        "key": key,
+        "names": _clean([personal.get("Full Name")]),
+        "email": personal.get("Email"),
+        "employers": _clean([data.get("Recent Employer"), *history.keys()]),
+        "titles": _clean(titles),
+        "locations": _clean([personal.get("Location")]),
+        "education": _clean(education),
+        "languages": _clean(data.get("Languages") or []),
+        "skills": _clean(skills.get("Hard Skill") or [] if isinstance(skills, dict) else []),
+        "years": years_of_experience(data),
+    }
+
+
+def _doc_terms(doc):
+    terms = {"key=" + doc["key"]}
+    terms.update(_skill_term(skill) for skill in doc.get("skills", []))
+    for field, stored in TEXT_FIELDS.items():
+        for value in doc.get(stored, []):
+            terms.update(f"{field}:{word}" for word in _words(value))
+    return terms
+
+
+def _align(data):
+    return data + b"\0" * (-len(data) % 4)
+
+
+def write_segment(path, docs):
+    """
+    Writes `docs` (candidate summaries) as a segment file, atomically.
+    """
+    postings = defaultdict(list)
+    for doc_id, doc in enumerate(docs):
+        for term in _doc_terms(doc):
+            postings[term].append(doc_id)
+
+    term_offsets, terms = array("I", [0]), bytearray()
+    posting_offsets, posting_ids = array("I", [0]), array("I")
+    for term in sorted(postings):
+        terms += term.encode("utf-8")
+        term_offsets.append(len(terms))
+        posting_ids.extend(postings[term])
+        posting_offsets.append(len(posting_ids))
+
+    doc_offsets, doc_blob = array("I", [0]), bytearray()
+    for doc in docs:
+        doc_blob += json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        doc_offsets.append(len(doc_blob))
+
+    years = array("f", [doc.get("years", UNKNOWN_YEARS) for doc in docs])
+    order = sorted(range(len(docs)), key=years.__getitem__)
+    sections = [
+        term_offsets.tobytes(), bytes(terms), posting_offsets.tobytes(), posting_ids.tobytes(),
+        doc_offsets.tobytes(), bytes(doc_blob),
+        array("I", order).tobytes(), array("f", [years[i] for i in order]).tobytes(),
+    ]
+
+    header_size = len(SEGMENT_MAGIC) + 4 + 16 * len(sections)
+    offset = header_size
+    table = []
+    for section in sections:
+        table.append((offset, len(section)))
+        offset += len(_align(section))
+
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SEGMENT_MAGIC + struct.pack("<I", len(sections)))
+        for entry in table:
+            f.write(struct.pack("<QQ", *entry))
+        for section in sections:
+            f.write(_align(section))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _Segment:
+    """
+    Read-only, memory-mapped view of a segment file. Nothing is loaded up front;
+    term lookups binary-search the mapped dictionary.
+    """
+
+    def __init__(self, path):
+        self._file = None
+        self._mmap = None
+        self._views = []
+        self.doc_count = 0
+        self.term_count = 0
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            self.close()
+            raise ValueError(f"❌ Not a search index segment: {path}")
+
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+        sections = {}
+        (count,) = struct.unpack_from("<I", self._mmap, len(SEGMENT_MAGIC))
+        for index, name in enumerate(SEGMENT_SECTIONS[:count]):
+            offset, length = struct.unpack_from("<QQ", self._mmap, len(SEGMENT_MAGIC) + 4 + 16 * index)
+            view = buffer[offset:offset + length]
+            if name not in ("terms", "docs"):
+                view = view.cast("f" if name == "years_sorted" else "I")
+            self._views.append(view)
+            sections[name] = view
+
+        self._term_offsets, self._terms = sections["term_offsets"], sections["terms"]
+        self._posting_offsets, self._postings = sections["posting_offsets"], sections["postings"]
+        self._doc_offsets, self._docs = sections["doc_offsets"], sections["docs"]
+        self._years_order, self._years_sorted = sections["years_order"], sections["years_sorted"]
+        self.term_count = len(self._term_offsets) - 1
+        self.doc_count = len(self._doc_offsets) - 1
+
+    def _term(self, index):
+        return self._terms[self._term_offsets[index]:self._term_offsets[index + 1]].tobytes()
+
+    def postings(self, term):
+        """
+        Doc ids containing `term`, as a set.
+        """
+        term = term.encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self._term(low) == term:
+            return set(self._postings[self._posting_offsets[low]:self._posting_offsets[low + 1]])
+        return set()
+
+    def doc(self, doc_id):
+        return json.loads(self._docs[self._doc_offsets[doc_id]:self._doc_offsets[doc_id + 1]].tobytes())
+
+    def years_between(self, low, high):
+        """
+        Doc ids with low <= years < high (unknown years are never included).
+        """
+        if not self.doc_count:
+            return set()
+        low = max(low, UNKNOWN_YEARS + 0.5)
+        start = bisect.bisect_left(self._years_sorted, low)
+        end = bisect.bisect_left(self._years_sorted, high)
+        return set(self._years_order[start:end])
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SearchIndex:
+    """
+    Embeddable candidate search index, safe to share across threads.
+    - add(key, data) indexes or re-indexes one parsed resume (appended to the log).
+    - search(query) returns matching candidate summaries; see parse_query for the syntax.
+    - compact() merges the log into a new segment (done automatically every `compact_every` updates).
+    """
+
+    def __init__(self, folder=SEARCH_INDEX_FOLDER, compact_every=SEARCH_INDEX_COMPACT_EVERY):
+        self.folder = folder
+        self.compact_every = compact_every
+        os.makedirs(folder, exist_ok=True)
+        self._segment_path = os.path.join(folder, SEGMENT_FILE)
+        self._log_path = os.path.join(folder, LOG_FILE)
+        self._lock = threading.RLock()
+        self._open()
+
+    def _open(self):
+        self._segment = _Segment(self._segment_path)
+        self._deleted = set()  # segment doc ids replaced or removed since it was written
+        self._delta_docs = {}  # doc id -> summary, for docs added since then
+        self._delta_postings = defaultdict(set)
+        self._delta_keys = {}
+        self._next_id = self._segment.doc_count
+        self._log_entries = 0
+        if os.path.exists(self._log_path):
+            with open(self._log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    self._apply(entry)
+                    self._log_entries += 1
+        self._log = open(self._log_path, "a", encoding="utf-8")
+
+    def _apply(self, entry):
+        key = entry["key"]
+        self._deleted.update(self._segment.postings("key=" + key))
+        old_id = self._delta_keys.pop(key, None)
+        if old_id is not None:
+            for term in _doc_terms(self._delta_docs.pop(old_id)):
+                self._delta_postings[term].discard(old_id)
+
+        if entry["op"] == "add":
+            doc_id = self._next_id
+            self._next_id += 1
+            self._delta_docs[doc_id] = entry["doc"]
+            self._delta_keys[key] = doc_id
+            for term in _doc_terms(entry["doc"]):
+                self._delta_postings[term].add(doc_id)
+
+    def _append(self, entry):
+        with self._lock:
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log.flush()
+            self._apply(entry)
+            self._log_entries += 1
+            if self.compact_every and self._log_entries >= self.compact_every:
+                self.compact()
+
+    def add(self, key, data):
+        """
+        Index (or re-index) the parsed resume `data` under `key` (e.g. its file name).
+        """
+        self._append({"op": "add", "key": key, "doc": candidate_summary(key, data)})
+
+    def remove(self, key):
+        self._append({"op": "remove", "key": key})
+
+    def _live_ids(self):
+        return (set(range(self._segment.doc_count)) - self._deleted) | set(self._delta_docs)
+
+    def _term_ids(self, term):
+        ids = self._segment.postings(term) - self._deleted if self._segment.doc_count else set()
+        return ids | self._delta_postings.get(term, set())
+
+    def _years_ids(self, low, high):
+        ids = self._segment.years_between(low, high) - self._deleted
+        ids.update(
+            doc_id for doc_id, doc in self._delta_docs.items()
+            if doc["years"] != UNKNOWN_YEARS and low <= doc["years"] < high
+        )
+        return ids
+
+    def _doc(self, doc_id):
+        if doc_id in self._delta_docs:
+            return self._delta_docs[doc_id]
+        return self._segment.doc(doc_id)
+
+    def search(self, query, limit=None):
+        """
+        Candidate summaries matching `query`, most experienced first.
+        """
+        with self._lock:
+            ids = _evaluate(parse_query(query), self)
+            docs = [self._doc(doc_id) for doc_id in ids]
+        docs.sort(key=lambda doc: (-doc["years"], doc["key"]))
+        return docs[:limit] if limit else docs
+
+    def count(self, query):
+        with self._lock:
+            return len(_evaluate(parse_query(query), self))
+
+    def __len__(self):
+        with self._lock:
+            return self._segment.doc_count - len(self._deleted) + len(self._delta_docs)
+
+    def compact(self):
+        """
+        Rewrite the segment with every live candidate and start a fresh log.
+        """
+        with self._lock:
+            docs = [self._doc(doc_id) for doc_id in sorted(self._live_ids())]
+            self._log.close()
+            self._segment.close()
+            write_segment(self._segment_path, docs)
+            open(self._log_path, "w").close()
+            self._open()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "candidates": len(self),
+                "segment_candidates": self._segment.doc_count,
+                "segment_terms": self._segment.term_count,
+                "logged_updates": self._log_entries,
+                "segment_bytes": os.path.getsize(self._segment_path) if os.path.exists(self._segment_path) else 0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+            self._segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# === Query language ===
+# Terms: skill:python, title:"data engineer", employer:infosys, location:pune,
+# education:b.tech, language:hindi, name:jane, years>=5 (>, >=, <, <=, =), or a bare word.
+# Combine with AND (default between terms), OR, NOT and parentheses.
+
+def _tokenize(query):
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _QUERY_TOKEN.match(query, position)
+        if not match or match.end() == position:
+            raise SearchQueryError(f"❌ Can't parse query near: {query[position:]!r}")
+        position = match.end()
+        groups = {k: v for k, v in match.groupdict().items() if v is not None}
+        if "paren" in groups:
+            tokens.append(("paren", groups["paren"]))
+        elif "numeric" in groups:
+            tokens.append(("numeric", groups["numeric"].lower(), groups["op"], float(groups["number"])))
+        elif "field" in groups:
+            tokens.append(("field", groups["field"].lower(), groups.get("quoted", groups.get("value"))))
+        elif "phrase" in groups:
+            tokens.append(("word", groups["phrase"]))
+        elif groups["word"].upper() in ("AND", "OR", "NOT"):
+            tokens.append(("op", groups["word"].upper()))
+        else:
+            tokens.append(("word", groups["word"]))
+        position = len(query) - len(query[position:].lstrip())
+    return tokens
+
+
+def parse_query(query):
+    """
+    Parses a query into a nested tuple tree: ("and"|"or", [children]), ("not", child),
+    ("term", field, value) or ("range", field, op, number).
+    """
+    tokens = _tokenize(query)
+    position = 0
+
+    def _peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def _or():
+        nonlocal position
+        children = [_and()]
+        while _peek() == ("op", "OR"):
+            position += 1
+            children.append(_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def _and():
+        nonlocal position
+        children = [_not()]
+        while _peek() is not None and _peek() not in (("op", "OR"), ("paren", ")")):
+            if _peek() == ("op", "AND"):
+                position += 1
+            children.append(_not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def _not():
+        nonlocal position
+        if _peek() == ("op", "NOT"):
+            position += 1
+            return ("not", _not())
+        return _atom()
+
+    def _atom():
+        nonlocal position
+        token = _peek()
+        if token is None:
+            raise SearchQueryError("❌ Query ended unexpectedly.")
+        position += 1
+        if token == ("paren", "("):
+            node = _or()
+            if _peek() != ("paren", ")"):
+                raise SearchQueryError("❌ Missing closing parenthesis in query.")
+            position += 1
+            return node
+        if token[0] == "numeric":
+            if token[1] not in NUMERIC_FIELDS:
+                raise SearchQueryError(f"❌ Unknown numeric field '{token[1]}'. Use: {', '.join(NUMERIC_FIELDS)}.")
+            return ("range", token[1], token[2], token[3])
+        if token[0] == "field":
+            if token[1] != "skill" and token[1] not in TEXT_FIELDS:
+                raise SearchQueryError(
+                    f"❌ Unknown field '{token[1]}'. Use: skill, {', '.join(TEXT_FIELDS)}."
+                )
+            return ("term", token[1], token[2])
+        if token[0] == "word":
+            return ("term", None, token[1])
+        raise SearchQueryError(f"❌ Unexpected '{token[1]}' in query.")
+
+    if not tokens:
+        raise SearchQueryError("❌ Empty query.")
+    tree = _or()
+    if position != len(tokens):
+        raise SearchQueryError(f"❌ Unexpected '{tokens[position][1]}' in query.")
+    return tree
+
+
+def _term_ids(index, field, value):
+    if field == "skill":
+        return index._term_ids(_skill_term(value))
+    if field is None:
+        # Bare word: a skill, or a word in any text field
+        ids = index._term_ids(_skill_term(value))
+        for name in TEXT_FIELDS:
+            ids |= _term_ids(index, name, value)
+        return ids
+    words = _words(value)
+    if not words:
+        return set()
+    ids = index._term_ids(f"{field}:{words[0]}")
+    for word in words[1:]:
+        ids &= index._term_ids(f"{field}:{word}")
+    return ids
+
+
+def _evaluate(node, index):
+    kind = node[0]
+    if kind == "term":
+        return _term_ids(index, node[1], node[2])
+    if kind == "range":
+        _, _, op, number = node
+        epsilon = 1e-4  # years are stored as float32
+        low, high = {
+            ">": (number + epsilon, float("inf")),
+            ">=": (number - epsilon, float("inf")),
+            "<": (UNKNOWN_YEARS + 0.5, number - epsilon),
+            "<=": (UNKNOWN_YEARS + 0.5, number + epsilon),
+            "=": (number - epsilon, number + epsilon),
+        }[op]
+        return index._years_ids(low, high)
+    if kind == "not":
+        return index._live_ids() - _evaluate(node[1], index)
+    children = sorted((_evaluate(child, index) for child in node[1]), key=len)
+    if kind == "and":
+        result = children[0]
+        for ids in children[1:]:
+            result = result & ids
+        return result
+    return set().union(*children)
+
+
+def rebuild_index(json_folder=JSON_FOLDER, folder=SEARCH_INDEX_FOLDER):
+    """
+    Rebuilds the index from scratch from the saved resume JSON files.
+    """
+    docs = []
+    for filename in sorted(os.listdir(json_folder)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(json_folder, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ Skipping unreadable {filename}: {e}")
+            continue
+        if isinstance(data, dict):
+            docs.append(candidate_summary(os.path.splitext(filename)[0], data))
+
+    os.makedirs(folder, exist_ok=True)
+    write_segment(os.path.join(folder, SEGMENT_FILE), docs)
+    open(os.path.join(folder, LOG_FILE), "w").close()
+    log.info(f"🔎 Indexed {len(docs)} candidates into {folder}")
+    return len(docs)
+
+
+def _print_results(docs, as_json):
+    if as_json:
+        print(json.dumps(docs, ensure_ascii=False, indent=2))
+        return
+    for doc in docs:
+        years = "?" if doc["years"] == UNKNOWN_YEARS else f"{doc['years']:g}y"
+        print(f"{doc['key']:<30} {', '.join(doc['names'])[:25]:<25} {years:>6}  "
+              f"{(doc['titles'] or ['-'])[0][:30]:<30} {', '.join(doc['skills'])[:60]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search parsed candidates.")
+    parser.add_argument("--index", default=SEARCH_INDEX_FOLDER, help="index folder")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query_parser = commands.add_parser("query", help="run a boolean query")
+    query_parser.add_argument("query")
+    query_parser.add_argument("--limit", type=int, default=50)
+    query_parser.add_argument("--json", action="store_true", help="print matches as JSON")
+    rebuild_parser = commands.add_parser("rebuild", help="rebuild the index from saved JSON")
+    rebuild_parser.add_argument("--json-folder", default=JSON_FOLDER)
+    commands.add_parser("compact", help="merge logged updates into the segment")
+    commands.add_parser("stats", help="show index size")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        rebuild_index(args.json_folder, args.index)
+        return
+
+    with SearchIndex(args.index) as index:
+        if args.command == "query":
+            try:
+                matches = index.search(args.query)
+            except SearchQueryError as e:
+                print(e)
+                sys.exit(2)
+            _print_results(matches[:args.limit], args.json)
+            if not args.json:
+                print(f"🔎 {len(matches)} match(es)" + (f", showing {args.limit}" if len(matches) > args.limit else ""))
+        elif args.command == "compact":
+            index.compact()
+            print(f"🗜️ Compacted index: {index.stats()}")
+        else:
+            print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
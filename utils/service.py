@@ -0,0 +1,447 @@
+"""
+Long-running parsing service: one resume per HTTP request, JSON back.
+
+    POST /parse?filename=cv.pdf[&render=1]   body: the raw PDF/DOCX bytes
+    GET  /health                             warm-up state and load
+    GET  /metrics                            per-stage timings and counters
+
+Built on asyncio streams (no extra dependencies). The LLM client, compiled template,
+extraction cache and extraction processes are created once and stay warm.
+At most SERVICE_QUEUE_SIZE requests are admitted at a time; beyond that the
+service answers 429 so callers back off instead of piling up. Admission is decided
+from the headers, before the upload is read; `Expect: 100-continue` clients (curl,
+for uploads over 1 MB) only send the file once admitted.
+"""
+import os
+import json
+import time
+import uuid
+import signal
+import asyncio
+import tempfile
+import argparse
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import (
+    METRICS_PATH,
+    OUTPUT_FOLDER,
+    SERVICE_EXTRACT_CONCURRENCY,
+    SERVICE_HOST,
+    SERVICE_LLM_CONCURRENCY,
+    SERVICE_MAX_UPLOAD_BYTES,
+    SERVICE_PORT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_RENDER_CONCURRENCY,
+    SERVICE_REQUEST_TIMEOUT_SECONDS,
+    TEMPLATE_PATH,
+)
+from utils.metrics import get_logger, start_run
+from utils.pipeline import SUPPORTED_EXTENSIONS, extract_text_measured, parse_resume
+
+MAX_HEADER_BYTES = 64 * 1024
+KEEP_ALIVE_SECONDS = 30
+CONTENT_TYPES = {
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+}
+
+log = get_logger("service")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _init_worker():
+    # Ctrl+C reaches the whole process group; the service shuts the workers down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _warm_up_worker():
+    """
+    Runs once in each extraction process so the extractors are imported before the first request.
+    """
+    import extractors.pdf_extractor  # noqa: F401
+    import extractors.docx_extractor  # noqa: F401
+    return os.getpid()
+
+
+def _detect_extension(filename, content_type, body):
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in SUPPORTED_EXTENSIONS:
+        return extension
+    extension = CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+    if extension:
+        return extension
+    if body.startswith(b"%PDF"):
+        return ".pdf"
+    if body.startswith(b"PK"):
+        return ".docx"
+    raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Send a PDF or DOCX file.")
+
+
+class ParsingService:
+    """
+    Wraps the pipeline stages (extract -> LLM -> clean -> optional DOCX) for single requests.
+    - `extract_concurrency` processes, `llm_concurrency` LLM calls and `render_concurrency`
+      renders run at once; requests wait for their stage in between.
+    - `queue_size` caps admitted requests (waiting + running); more are refused with 429.
+    """
+
+    def __init__(self, queue_size=SERVICE_QUEUE_SIZE, extract_concurrency=SERVICE_EXTRACT_CONCURRENCY,
+                 llm_concurrency=SERVICE_LLM_CONCURRENCY, render_concurrency=SERVICE_RENDER_CONCURRENCY,
+                 output_folder=OUTPUT_FOLDER, template_path=TEMPLATE_PATH,
+                 request_timeout=SERVICE_REQUEST_TIMEOUT_SECONDS, max_upload_bytes=SERVICE_MAX_UPLOAD_BYTES,
+                 metrics_path=METRICS_PATH):
+        self.queue_size = queue_size
+        self.concurrency = {"extract": extract_concurrency, "llm": llm_concurrency, "render": render_concurrency}
+        self.output_folder = output_folder
+        self.template_path = template_path
+        self.request_timeout = request_timeout
+        self.max_upload_bytes = max_upload_bytes
+        if metrics_path:
+            os.makedirs(os.path.dirname(metrics_path) or ".", exist_ok=True)
+        self.metrics = start_run(metrics_path or None)
+        self.started = time.time()
+        self.warm = {}
+        self.admitted = 0
+        self.stage_active = {stage: 0 for stage in self.concurrency}
+        self._semaphores = {}
+        self._extract_pool = None
+        self._llm_pool = None
+        self._render_pool = None
+        self._upload_folder = None
+
+    async def start(self):
+        """
+        Starts the executors and warms the LLM client, template and caches.
+        """
+        loop = asyncio.get_running_loop()
+        self._semaphores = {stage: asyncio.Semaphore(n) for stage, n in self.concurrency.items()}
+        self._extract_pool = ProcessPoolExecutor(max_workers=self.concurrency["extract"], initializer=_init_worker)
+        self._llm_pool = ThreadPoolExecutor(max_workers=self.concurrency["llm"], thread_name_prefix="service-llm")
+        self._render_pool = ThreadPoolExecutor(max_workers=self.concurrency["render"],
+                                               thread_name_prefix="service-render")
+        self._upload_folder = tempfile.mkdtemp(prefix="resume-service-")
+
+        await asyncio.gather(*[
+            loop.run_in_executor(self._extract_pool, _warm_up_worker) for _ in range(self.concurrency["extract"])
+        ])
+        self.warm["extract_processes"] = self.concurrency["extract"]
+        for name, warm_up in (("llm", self._warm_llm), ("template", self._warm_template), ("cache", self._warm_cache)):
+            try:
+                await loop.run_in_executor(self._llm_pool, warm_up)
+                self.warm[name] = "ready"
+            except Exception as e:
+                self.warm[name] = f"error: {e}"
+                log.warning(f"⚠️ Could not warm up {name}: {e}")
+
+    def _warm_llm(self):
+        from utils.ibm_extractor import get_llm_backend
+        get_llm_backend()
+
+    def _warm_template(self):
+        from utils.anchor_alignment import get_compiled_template
+        get_compiled_template(self.template_path)
+
+    def _warm_cache(self):
+        from config import LLM_CACHE_ENABLED
+        from utils.llm_cache import get_extraction_cache
+        if LLM_CACHE_ENABLED:
+            get_extraction_cache()
+
+    async def close(self):
+        # _run_stage never submits more work than a pool has workers, so nothing is
+        # left queued to cancel; shutdown just waits for the running calls
+        for pool in (self._extract_pool, self._llm_pool, self._render_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        if self._upload_folder:
+            for name in os.listdir(self._upload_folder):
+                os.remove(os.path.join(self._upload_folder, name))
+            os.rmdir(self._upload_folder)
+        self.metrics.log_summary()
+        self.metrics.close()
+
+    async def _run_stage(self, stage, pool, fn, *args):
+        """
+        Runs `fn` in the stage's executor once the stage has a free slot. Work in an
+        executor can't be interrupted, so a timed-out request keeps its slot until it ends.
+        """
+        semaphore = self._semaphores[stage]
+        await semaphore.acquire()
+        self.stage_active[stage] += 1
+
+        def _finished(_):
+            self.stage_active[stage] -= 1
+            semaphore.release()
+
+        future = asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        future.add_done_callback(_finished)
+        return await asyncio.shield(future)
+
+    def admit(self):
+        if self.admitted >= self.queue_size:
+            self.metrics.count("service_rejected")
+            raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, "Too many resumes in progress, retry shortly.",
+                            {"Retry-After": "5"})
+        self.admitted += 1
+
+    def release(self):
+        self.admitted -= 1
+
+    async def parse(self, body, filename=None, content_type=None, render=False):
+        """
+        Parses one uploaded resume; returns the response document.
+        """
+        extension = _detect_extension(filename, content_type, body)
+        request_id = uuid.uuid4().hex[:12]
+        filename = os.path.basename(filename or "") or f"{request_id}{extension}"
+        upload_path = os.path.join(self._upload_folder, f"{request_id}-{os.path.splitext(filename)[0]}{extension}")
+        with open(upload_path, "wb") as f:
+            f.write(body)
+
+        started = time.perf_counter()
+        try:
+            text, seconds, counts, _ = await self._run_stage(
+                "extract", self._extract_pool, extract_text_measured, upload_path
+            )
+        except Exception as e:
+            self.metrics.count("extract_errors")
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Could not extract text: {e}")
+        finally:
+            os.remove(upload_path)
+        self.metrics.merge(counts)
+        self.metrics.record(filename, "extract", seconds, chars=len(text or ""), **counts)
+        if not text or not text.strip():
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, "No text could be extracted from the resume.")
+
+        try:
+            data = await self._run_stage("llm", self._llm_pool, self._parse_text, filename, text)
+        except Exception as e:
+            self.metrics.count("llm_errors")
+            raise HTTPError(HTTPStatus.BAD_GATEWAY, f"Could not parse the resume: {e}")
+
+        response = {"id": request_id, "filename": filename, "data": data}
+        if render:
+            docx_path = os.path.join(self.output_folder, f"{os.path.splitext(filename)[0]}-{request_id}.docx")
+            try:
+                await self._run_stage("render", self._render_pool, self._render, filename, docx_path, data)
+            except Exception as e:
+                raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Could not render the DOCX: {e}")
+            response["docx_path"] = docx_path
+        response["seconds"] = round(time.perf_counter() - started, 3)
+        return response
+
+    def _parse_text(self, filename, text):
+        with self.metrics.timed(filename, "llm", chars=len(text)):
+            return parse_resume(filename, text)
+
+    def _render(self, filename, docx_path, data):
+        from utils.anchor_alignment import get_compiled_template
+
+        os.makedirs(self.output_folder, exist_ok=True)
+        with self.metrics.timed(filename, "render"):
+            get_compiled_template(self.template_path).render_to(docx_path, data)
+
+    def health(self):
+        ready = all(state == "ready" for name, state in self.warm.items() if name != "extract_processes")
+        return {
+            "status": "ok" if ready else "degraded",
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "warm": self.warm,
+            "admitted": self.admitted,
+            "queue_size": self.queue_size,
+            "active": dict(self.stage_active),
+            "concurrency": dict(self.concurrency),
+        }
+
+    def metrics_report(self):
+        return {**self.metrics.summary(), "load": self.health()}
+
+    # === HTTP ===
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(self._read_head(reader), KEEP_ALIVE_SECONDS)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {"error": e.message}, e.headers, keep_alive=False)
+                    return
+                if head is None:
+                    return
+
+                method, path, query, headers, length = head
+                keep_alive = headers.get("connection", "").lower() != "close"
+                # Admit uploads before reading them, so a full service refuses
+                # without taking in up to max_upload_bytes first
+                admitted = method == "POST" and path == "/parse" and length > 0
+                try:
+                    if admitted:
+                        self.admit()
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {"error": e.message}, e.headers, keep_alive=False)
+                    return
+                try:
+                    if length and headers.get("expect", "").lower() == "100-continue":
+                        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                        await writer.drain()
+                    body = await asyncio.wait_for(reader.readexactly(length), KEEP_ALIVE_SECONDS) if length else b""
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    if admitted:
+                        self.release()
+                    return
+
+                try:
+                    status, document, extra_headers = await self._dispatch(method, path, query, headers, body)
+                except HTTPError as e:
+                    status, document, extra_headers = e.status, {"error": e.message}, e.headers
+                except Exception as e:
+                    log.error(f"❌ Unexpected error serving {method} {path}: {e}")
+                    status, document, extra_headers = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, {}
+                finally:
+                    if admitted:
+                        self.release()
+                await self._respond(writer, status, document, extra_headers, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_head(self, reader):
+        """
+        Reads the request line and headers, leaving the body unread. Returns
+        (method, path, query, headers, body length), or None if the client closed.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large.")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Send the file with a Content-Length.")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if length > self.max_upload_bytes:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"Upload larger than {self.max_upload_bytes} bytes.")
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return method.upper(), url.path, query, headers, length
+
+    async def _dispatch(self, method, path, query, headers, body):
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET.", {"Allow": "GET"})
+            return HTTPStatus.OK, self.health(), {}
+        if path == "/metrics":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET.", {"Allow": "GET"})
+            return HTTPStatus.OK, self.metrics_report(), {}
+        if path != "/parse":
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST.", {"Allow": "POST"})
+        if not body:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Send the resume file as the request body.")
+
+        # handle_connection admitted the request before reading its body
+        try:
+            document = await asyncio.wait_for(
+                self.parse(
+                    body,
+                    filename=query.get("filename") or headers.get("x-filename"),
+                    content_type=headers.get("content-type"),
+                    render=query.get("render", "").lower() in ("1", "true", "yes"),
+                ),
+                self.request_timeout,
+            )
+        except asyncio.TimeoutError:
+            self.metrics.count("service_timeouts")
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Parsing took too long.")
+        self.metrics.count("service_parsed")
+        return HTTPStatus.OK, document, {}
+
+    async def _respond(self, writer, status, document, headers=None, keep_alive=True):
+        payload = json.dumps(document, ensure_ascii=False, default=str).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *(f"{name}: {value}" for name, value in (headers or {}).items()),
+        ]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+
+async def serve(host=SERVICE_HOST, port=SERVICE_PORT, **options):
+    """
+    Runs the service until cancelled (Ctrl+C).
+    """
+    service = ParsingService(**options)
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    log.info(f"🚀 Parsing service listening on http://{host}:{port} "
+             f"(queue {service.queue_size}, concurrency {service.concurrency}, warm {service.warm})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def run(args):
+    try:
+        asyncio.run(serve(
+            args.host, args.port,
+            queue_size=args.queue_size,
+            extract_concurrency=args.extract_concurrency,
+            llm_concurrency=args.llm_concurrency,
+            render_concurrency=args.render_concurrency,
+        ))
+    except KeyboardInterrupt:
+        log.info("👋 Parsing service stopped.")
+
+
+def main(argv=None):
+    from utils.cli_args import add_service_arguments
+
+    parser = argparse.ArgumentParser(description="Serve resume parsing over HTTP.")
+    add_service_arguments(parser)
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from functools import lru_cache
+
+# Canonical skill -> other names it goes by (compared case-insensitively, except short names)
+SKILL_ALIASES = {
+    "JavaScript": ["JS", "ECMAScript", "ES6"],
+    "TypeScript": ["TS"],
+    "Node.js": ["NodeJS", "Node JS"],
+    "React": ["React.js", "ReactJS"],
+    "Angular": ["AngularJS", "Angular.js"],
+    "Vue.js": ["Vue", "VueJS"],
+    "Go": ["Golang"],
+    "Python": ["Py"],
+    "C++": ["CPP"],
+    "C#": ["CSharp", "C Sharp"],
+    ".NET": ["dotnet", "dot net", ".NET Core"],
+    "PostgreSQL": ["Postgres", "psql"],
+    "MongoDB": ["Mongo"],
+    "Kubernetes": ["K8s"],
+    "AWS": ["Amazon Web Services"],
+    "GCP": ["Google Cloud", "Google Cloud Platform"],
+    "Azure": ["Microsoft Azure"],
+    "Machine Learning": ["ML"],
+    "Artificial Intelligence": ["AI"],
+    "Natural Language Processing": ["NLP"],
+    "CI/CD": ["CICD", "CI-CD"],
+    "Spring Boot": ["SpringBoot"],
+    "Scikit-learn": ["sklearn", "scikit learn"],
+    "TensorFlow": ["TF"],
+    "Microsoft Excel": ["MS Excel"],
+}
+CASE_SENSITIVE_MAX_LENGTH = 2  # "Go", "R", "JS": only match with the listed capitalisation
+
+# Skill names contain symbols ("C++", "C#", ".NET", "Node.js"), so words keep ASCII
+# letters, digits and "_.+#"; anything else (including non-ASCII) separates words, as
+# does a "." that ends a sentence. Texts are translated byte-wise with this table.
+_WORD_BYTES = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.+#"
+_SEPARATE = bytes(byte if byte in _WORD_BYTES else ord(" ") for byte in range(256))
+
+_ALIAS_LOOKUP = {
+    name.lower(): canonical
+    for canonical, aliases in SKILL_ALIASES.items()
+    for name in [canonical, *aliases]
+}
+
+
+def canonical_skill(name):
+    """
+    The canonical name for a skill or one of its aliases ("JS" -> "JavaScript").
+    """
+    name = " ".join(name.split())
+    return _ALIAS_LOOKUP.get(name.lower(), name)
+
+
+def _names_for(skill):
+    canonical = _ALIAS_LOOKUP.get(skill.lower())
+    if canonical is None:
+        return {skill}
+    return {skill, canonical, *SKILL_ALIASES[canonical]}
+
+
+def _normalized(text):
+    """
+    `text` as ASCII bytes where only words and the spaces between them are left.
+    """
+    return (text.encode("utf-8", "replace").translate(_SEPARATE) + b" ").replace(b". ", b" ")
+
+
+@lru_cache(maxsize=8192)
+def _skill_terms(skill):
+    """
+    (lowercase first word, word to match case-sensitively or None, b" multi word name " or None)
+    for each name of `skill`.
+    """
+    terms = set()
+    for name in _names_for(skill):
+        normalized = _normalized(name)
+        words = normalized.lower().split()
+        if len(words) > 1:
+            terms.add((words[0], None, b" " + b" ".join(words) + b" "))
+        elif words:
+            exact = len(words[0]) <= CASE_SENSITIVE_MAX_LENGTH
+            terms.add((words[0], normalized.split()[0] if exact else None, None))
+    return tuple(terms)
+
+
+class SkillMatcher:
+    """
+    Finds which of a set of skills a text mentions.
+    - Whole-word matches only, so "Go" doesn't hit "good" and "C" doesn't hit "C++".
+    - Aliases count for their skill ("JS" -> "JavaScript"), see SKILL_ALIASES.
+    - Names of up to CASE_SENSITIVE_MAX_LENGTH characters are matched case-sensitively.
+    - A name found only inside a longer one doesn't count, so "Spring Boot" isn't also "Spring".
+    The text is split into words once and the words are looked up in a dict of names by
+    first word; only multi-word names whose first word occurs are searched for in the
+    text. Matching barely depends on the number of skills, and building a matcher for
+    every resume's own skill list is a few dict inserts per skill.
+    """
+
+    def __init__(self, skills):
+        self.skills = list(dict.fromkeys(skill.strip() for skill in skills if skill and skill.strip()))
+        skills_by_term = {}
+        for skill in self.skills:
+            for term in _skill_terms(skill):
+                skills_by_term.setdefault(term, []).append(skill)
+
+        self._words = {}    # lowercase word -> skills
+        self._cased = {}    # lowercase word -> [(word as written, skills)], for short names
+        self._phrases = {}  # lowercase first word -> [(b" multi word name ", skills)]
+        for (first, cased, phrase), skills in skills_by_term.items():
+            if phrase is not None:
+                self._phrases.setdefault(first, []).append((phrase, skills))
+            elif cased is not None:
+                self._cased.setdefault(first, []).append((cased, skills))
+            else:
+                self._words[first] = skills
+        self._first_words = frozenset(self._words).union(self._cased, self._phrases)
+
+    def find(self, text):
+        """
+        Returns the set of skills mentioned in `text`.
+        """
+        found = set()
+        if not text:
+            return found
+        normalized = _normalized(text)
+        words = normalized.lower().split()
+        hits = self._first_words.intersection(words)
+        if not hits:
+            return found
+
+        line, phrases = None, []
+        for word in hits:
+            if word in self._phrases:
+                if line is None:
+                    line = b" " + b" ".join(words) + b" "
+                phrases.extend((phrase, skills) for phrase, skills in self._phrases[word] if phrase in line)
+        if phrases:
+            for phrase, skills in phrases:
+                if len(phrases) == 1 or not _only_inside(phrase, line.count(phrase), phrases, line):
+                    found.update(skills)
+            inner = set(b" ".join(phrase for phrase, _ in phrases).split())
+            hits -= {word for word in hits & inner if _only_inside(b" " + word + b" ", words.count(word), phrases, line)}
+
+        cased_words = None
+        for word in hits:
+            skills = self._words.get(word)
+            if skills:
+                found.update(skills)
+            for cased, skills in self._cased.get(word, ()):
+                if cased_words is None:
+                    cased_words = set(normalized.split())
+                if cased in cased_words:
+                    found.update(skills)
+        return found
+
+
+def _only_inside(term, count, phrases, line):
+    # Whether each of the `count` occurrences of `term` is part of a longer matched name
+    covered = sum(line.count(phrase) for phrase, _ in phrases if len(phrase) > len(term) and term in phrase)
+    return count <= covered
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(skills):
+    return SkillMatcher(skills)
+
+
+def get_skill_matcher(skills):
+    """
+    Returns a SkillMatcher for `skills`, reusing the one built for the same skill set.
+    """
+    return _cached_matcher(tuple(sorted({skill for skill in skills if isinstance(skill, str)})))
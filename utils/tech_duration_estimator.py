@@ -1,6 +1,8 @@
 from collections import defaultdict
 from dateutil import parser
 
+from utils.skill_matcher import get_skill_matcher
+
 def parse_duration(duration_text):
     """
     Convert 'Jan 2019 – Mar 2022' into number of months.
@@ -26,18 +28,25 @@ def estimate_technology_durations(extracted_data, technologies):
     """
     employment_history = extracted_data.get("Employment History", {})
     durations = {}
+    # The matcher reports stripped names; map them back to the names as given
+    input_names = {}
 
     for tech in technologies:
         durations[tech] = 0
+        if isinstance(tech, str) and tech.strip():
+            input_names.setdefault(tech.strip(), {})[tech] = None
+
+    # One tokenizing pass per description, looked up against the skill set's names
+    matcher = get_skill_matcher(technologies)
 
     for company, roles in employment_history.items():
         for role in roles:
             duration_text = role.get("Duration", "")
-            description = role.get("Description", "").lower()
+            description = role.get("Description") or ""
 
             # Heuristic: if tech mentioned in description, add dummy duration (e.g., 12 months)
-            for tech in technologies:
-                if tech.lower() in description:
+            for skill in matcher.find(description):
+                for tech in input_names.get(skill, ()):
                     durations[tech] += 12  # or your calculation logic
 
     return durations
@@ -0,0 +1,183 @@
+import re
+from collections import defaultdict, namedtuple
+
+from config import LLM_TOKEN_BUDGET
+
+CHARS_PER_TOKEN = 4  # rough average for English resume text
+
+# Section name -> headings that introduce it (compared case-insensitively)
+SECTION_HEADINGS = {
+    "summary": [
+        "summary", "professional summary", "profile", "professional profile", "objective",
+        "career objective", "about me", "career summary",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment history",
+        "employment", "work history", "career history", "relevant experience",
+    ],
+    "education": [
+        "education", "academic qualifications", "educational qualifications", "qualifications",
+        "academics", "academic background", "education and training",
+    ],
+    "skills": [
+        "skills", "technical skills", "key skills", "core competencies", "skill set", "technologies",
+        "technical expertise", "tools and technologies",
+    ],
+    "projects": ["projects", "key projects", "academic projects", "personal projects", "project details"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "courses", "training"],
+    "languages": ["languages", "language proficiency"],
+    "other": [
+        "achievements", "awards", "honors", "interests", "hobbies", "declaration", "references",
+        "personal details", "personal information", "publications", "extracurricular activities",
+        "volunteering",
+    ],
+}
+_HEADING_LOOKUP = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+
+# Sections trimmed first when a resume is over budget ("header" is the text before any heading)
+TRUNCATION_ORDER = ["other", "projects", "certifications", "languages", "summary",
+                    "education", "skills", "experience", "header"]
+MIN_SECTION_LINES = 3  # lines kept per section in the first trimming pass
+MIN_PAGE_MARKER_GAP = 5  # lines between repeats of a page header/footer
+
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$",
+        r"^-\s*\d{1,3}\s*-$",
+        r"^(curriculum vitae|resume|résumé|cv)$",
+        r"^references (are )?available (up)?on request\.?$",
+        r"^i hereby declare\b.*",
+        r"^(date|place)\s*:?\s*$",
+    )
+]
+
+CompactionResult = namedtuple("CompactionResult", ["text", "tokens_before", "tokens_after", "truncated"])
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate (~4 characters per token), good enough for budgeting.
+    """
+    if not text:
+        return 0
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+def detect_heading(line):
+    """
+    Returns the section a heading line starts, or None for ordinary lines.
+    """
+    if len(line) > 40:
+        return None
+    normalized = re.sub(r"[^a-z ]+", " ", line.lower().replace("&", " and "))
+    return _HEADING_LOOKUP.get(" ".join(normalized.split()))
+
+
+def split_sections(text):
+    """
+    Split resume text into [(section, lines)] by detected headings.
+    Text before the first heading belongs to the "header" section.
+    """
+    sections = [("header", [])]
+    for line in text.splitlines():
+        section = detect_heading(line.strip())
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(section, lines) for section, lines in sections if lines]
+
+
+def _near_duplicate_key(line):
+    # Ignores case, spacing, punctuation and " | " cell separators
+    return re.sub(r"[\W_]+", "", line.lower())
+
+
+def _page_marker_lines(lines):
+    """
+    Indexes of repeated header/footer lines: lines that are identical once digits
+    are masked, whose numbers only differ by a small increasing counter (page number)
+    and which are spread out like pages rather than listed one after another.
+    The first occurrence is kept.
+    """
+    groups = defaultdict(list)
+    for index, line in enumerate(lines):
+        if len(line) <= 80 and re.search(r"\d", line):
+            groups[re.sub(r"\d+", "#", line.lower())].append(index)
+
+    repeated = set()
+    for indexes in groups.values():
+        if len(indexes) < 2 or min(b - a for a, b in zip(indexes, indexes[1:])) < MIN_PAGE_MARKER_GAP:
+            continue
+        numbers = [[int(n) for n in re.findall(r"\d+", lines[i])] for i in indexes]
+        varying = [
+            position for position in range(len(numbers[0]))
+            if len({row[position] for row in numbers}) > 1
+        ]
+        if len(varying) != 1:
+            continue
+        counter = [row[varying[0]] for row in numbers]
+        if all(n < 1000 for n in counter) and counter == sorted(counter):
+            repeated.update(indexes[1:])
+    return repeated
+
+
+def _clean_lines(text):
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    lines = [line for line in lines if line and not any(p.match(line) for p in BOILERPLATE_PATTERNS)]
+
+    page_markers = _page_marker_lines(lines)
+    seen = set()
+    cleaned = []
+    for index, line in enumerate(lines):
+        if index in page_markers:
+            continue
+        key = _near_duplicate_key(line)
+        if key in seen:
+            continue
+        seen.add(key)
+        cleaned.append(line)
+    return cleaned
+
+
+def _truncate_sections(sections, token_budget):
+    """
+    Drop lines from the end of low-priority sections until the text fits.
+    First pass keeps MIN_SECTION_LINES per section, the second keeps only headings.
+    """
+    char_budget = token_budget * CHARS_PER_TOKEN
+    total_chars = sum(len(line) + 1 for _, lines in sections for line in lines)
+
+    for keep in (MIN_SECTION_LINES, 1):
+        for section_name in TRUNCATION_ORDER:
+            for section, lines in sections:
+                if section != section_name:
+                    continue
+                while len(lines) > keep and total_chars > char_budget:
+                    total_chars -= len(lines.pop()) + 1
+                if total_chars <= char_budget:
+                    return sections
+    return sections
+
+
+def compact_resume_text(text, token_budget=LLM_TOKEN_BUDGET):
+    """
+    Shrink extracted resume text before it is sent to the LLM:
+    - drops blank lines, page numbers and common boilerplate,
+    - removes near-duplicate lines (e.g. " | "-joined copies) and repeated page headers/footers,
+    - if still over `token_budget` tokens, trims low-priority sections first.
+    """
+    tokens_before = estimate_tokens(text)
+    compacted = "\n".join(_clean_lines(text))
+
+    truncated = False
+    if token_budget and estimate_tokens(compacted) > token_budget:
+        sections = _truncate_sections(split_sections(compacted), token_budget)
+        compacted = "\n".join(line for _, lines in sections for line in lines)
+        if estimate_tokens(compacted) > token_budget:
+            compacted = compacted[:token_budget * CHARS_PER_TOKEN]
+        truncated = True
+
+    return CompactionResult(compacted, tokens_before, estimate_tokens(compacted), truncated)
@@ -0,0 +1,289 @@
+"""
+Watch-folder ingestion: parse resumes as they land in RESUME_INPUT_FOLDER.
+
+    python main.py watch [--folder resumes] [--backend auto|inotify|poll]
+
+Changes are picked up with inotify (Linux, through ctypes, no extra dependencies)
+or by rescanning the folder. A file is only parsed once its size and mtime have
+stayed the same for WATCH_DEBOUNCE_SECONDS, so half-copied uploads are not read.
+Ready files go through the regular pipeline in batches of up to WATCH_MAX_BATCH;
+the run manifest skips anything already processed and unchanged, so a restart
+only parses what arrived or changed while the daemon was down.
+"""
+import os
+import time
+import errno
+import select
+import signal
+import struct
+import threading
+
+from config import (
+    RESUME_INPUT_FOLDER,
+    WATCH_BACKEND,
+    WATCH_DEBOUNCE_SECONDS,
+    WATCH_MAX_BATCH,
+    WATCH_POLL_SECONDS,
+)
+from utils.metrics import get_logger
+from utils.pipeline import is_supported_resume
+
+log = get_logger("watcher")
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class InotifyWatcher:
+    """
+    inotify watch on one folder. `changes(timeout)` blocks up to `timeout` seconds and
+    returns the names of entries created, written or moved in, or None when the
+    kernel queue overflowed and the folder has to be rescanned.
+    """
+
+    def __init__(self, folder):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.folder = folder
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(folder), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"inotify_add_watch failed for {folder}")
+
+    def changes(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                raise FileNotFoundError(errno.ENOENT, "Watched folder was removed or moved", self.folder)
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Portable fallback: rescans the folder every `interval` seconds and reports
+    entries whose size or mtime changed since the previous scan.
+    """
+
+    def __init__(self, folder, interval=WATCH_POLL_SECONDS):
+        self.folder = folder
+        self.interval = interval
+        self._seen = scan_folder(folder)
+        self._next_scan = time.monotonic() + interval
+
+    def changes(self, timeout):
+        delay = min(timeout, self._next_scan - time.monotonic())
+        if delay > 0:
+            time.sleep(delay)
+        if time.monotonic() < self._next_scan:
+            return set()
+        self._next_scan = time.monotonic() + self.interval
+
+        if not os.path.isdir(self.folder):
+            raise FileNotFoundError(errno.ENOENT, "Watched folder was removed or moved", self.folder)
+        current = scan_folder(self.folder)
+        changed = {name for name, state in current.items() if self._seen.get(name) != state}
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def scan_folder(folder):
+    """
+    name -> (size, mtime_ns) of the supported resumes directly inside `folder`.
+    """
+    states = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not is_supported_resume(entry.name):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    states[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue  # removed while scanning
+    return states
+
+
+def open_watcher(folder, backend=WATCH_BACKEND, poll_seconds=WATCH_POLL_SECONDS):
+    """
+    Returns an inotify watcher when `backend` allows it and the platform supports it,
+    else a polling watcher.
+    """
+    if backend not in ("auto", "inotify", "poll"):
+        raise ValueError(f"❌ Unknown watch backend: {backend}")
+    if backend != "poll":
+        try:
+            watcher = InotifyWatcher(folder)
+            log.info(f"👀 Watching {folder} with inotify.")
+            return watcher
+        except (OSError, AttributeError) as e:
+            if backend == "inotify":
+                raise
+            log.warning(f"⚠️ inotify unavailable ({e}), falling back to polling.")
+    log.info(f"👀 Watching {folder} by polling every {poll_seconds:g}s.")
+    return PollingWatcher(folder, interval=poll_seconds)
+
+
+class Debouncer:
+    """
+    Tracks changed files until they stop changing.
+    - `touch(name)` (re)starts the quiet period for a file.
+    - `ready()` returns the files whose size and mtime have not changed for
+      `quiet_seconds`, oldest first; files that disappeared are dropped and
+      empty files keep waiting for content.
+    """
+
+    def __init__(self, folder, quiet_seconds=WATCH_DEBOUNCE_SECONDS):
+        self.folder = folder
+        self.quiet_seconds = quiet_seconds
+        self._pending = {}  # name -> [(size, mtime_ns) or None, stable since]
+
+    def __len__(self):
+        return len(self._pending)
+
+    def touch(self, name):
+        self._pending[name] = [None, time.monotonic()]
+
+    def ready(self):
+        now = time.monotonic()
+        ready = []
+        for name, entry in list(self._pending.items()):
+            try:
+                stat = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                del self._pending[name]
+                continue
+            state = (stat.st_size, stat.st_mtime_ns)
+            if state != entry[0] or not stat.st_size:
+                # Empty files restart their quiet period each check, so they
+                # don't hold next_deadline() at 0 while waiting for content
+                entry[0], entry[1] = state, now
+            elif now - entry[1] >= self.quiet_seconds:
+                ready.append((entry[1], name))
+        ready.sort()
+        for _, name in ready:
+            del self._pending[name]
+        return [name for _, name in ready]
+
+    def next_deadline(self):
+        """
+        Seconds until the next pending file could become ready (None when nothing is pending).
+        """
+        if not self._pending:
+            return None
+        oldest = min(since for _, since in self._pending.values())
+        return max(0.0, oldest + self.quiet_seconds - time.monotonic())
+
+
+def watch_folder(folder=RESUME_INPUT_FOLDER, process=None, backend=WATCH_BACKEND,
+                 debounce_seconds=WATCH_DEBOUNCE_SECONDS, poll_seconds=WATCH_POLL_SECONDS,
+                 max_batch=WATCH_MAX_BATCH, stop_event=None):
+    """
+    Watches `folder` until `stop_event` is set, calling `process(filepaths)` with
+    batches of settled resumes (default: the pipeline).
+    - Files already in the folder at startup are queued too; the pipeline's
+      manifest skips the ones processed before.
+    - A batch in progress always finishes before the watcher stops.
+    """
+    if process is None:
+        from utils.pipeline import run_pipeline
+        process = run_pipeline
+    stop_event = stop_event or threading.Event()
+
+    os.makedirs(folder, exist_ok=True)
+    watcher = open_watcher(folder, backend=backend, poll_seconds=poll_seconds)
+    debouncer = Debouncer(folder, quiet_seconds=debounce_seconds)
+    try:
+        # Subscribe before the initial scan so nothing slips in between
+        for name in sorted(scan_folder(folder)):
+            debouncer.touch(name)
+        if len(debouncer):
+            log.info(f"📂 {len(debouncer)} resumes already in {folder}, checking for unprocessed ones.")
+
+        while not stop_event.is_set():
+            deadline = debouncer.next_deadline()
+            timeout = poll_seconds if deadline is None else min(poll_seconds, deadline)
+            names = watcher.changes(timeout)
+            if names is None:
+                log.warning("⚠️ Watch event queue overflowed, rescanning the folder.")
+                names = scan_folder(folder)
+            for name in names:
+                if is_supported_resume(name):
+                    debouncer.touch(name)
+
+            ready = debouncer.ready()
+            for start in range(0, len(ready), max_batch):
+                batch = [os.path.join(folder, name) for name in ready[start:start + max_batch]]
+                log.info(f"📥 {len(batch)} new or changed resume(s): {', '.join(ready[start:start + max_batch])}")
+                try:
+                    process(batch)
+                except Exception as e:
+                    log.error(f"❌ Batch failed, waiting for the next change: {e}")
+    finally:
+        watcher.close()
+    log.info("👋 Stopped watching.")
+
+
+def run(args, process=None):
+    """
+    Runs the watcher in the foreground. SIGTERM stops it after the current batch;
+    Ctrl+C stops it at once (the manifest lets the next start resume).
+    """
+    stop_event = threading.Event()
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    try:
+        watch_folder(
+            args.folder, process=process, backend=args.backend,
+            debounce_seconds=args.debounce, poll_seconds=args.poll_interval,
+            max_batch=args.max_batch, stop_event=stop_event,
+        )
+    except KeyboardInterrupt:
+        log.info("👋 Stopped watching.")
+    finally:
+        signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,226 @@
+"""
+Queue workers: several processes drain one backlog of resumes without
+processing the same resume twice.
+
+    python main.py worker [paths ...]   queue `paths` (default: resumes folder), then work
+    python main.py worker --wait        keep waiting for new jobs instead of exiting
+    python main.py queue status|dead|retry|add [paths ...]
+
+Each worker leases up to JOB_CLAIM_BATCH jobs, runs them through the pipeline and
+renews the leases every JOB_HEARTBEAT_SECONDS while it does. A job is done once
+the run manifest has every stage of it. Otherwise it is failed and retried (on
+any worker) until JOB_MAX_ATTEMPTS, then dead-lettered.
+
+Workers don't write the shared summary sheet or the search index. Once the queue
+is drained, one worker rebuilds both from the saved JSON.
+On several hosts, use the "directory" backend on the shared filesystem and keep
+--manifest / --dedup-db on each host's local disk.
+"""
+import os
+import signal
+import socket
+import threading
+
+from config import (
+    DEDUP_DB_PATH,
+    EXCEL_SUMMARY_PATH,
+    JOB_CLAIM_BATCH,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_IDLE_POLL_SECONDS,
+    JSON_FOLDER,
+    MANIFEST_PATH,
+    SEARCH_INDEX_ENABLED,
+    SEARCH_INDEX_FOLDER,
+)
+from utils.job_queue import DEAD, LEASED, QUEUED, open_job_queue
+from utils.metrics import get_logger
+from utils.run_manifest import STAGES, RunManifest, pending_stages
+
+log = get_logger("worker")
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseKeeper:
+    """
+    Renews the leases on `ids` every `interval` seconds on a background thread
+    while the `with` block runs. Ids whose lease was taken over end up in `lost`.
+    """
+
+    def __init__(self, job_queue, worker, ids, interval=JOB_HEARTBEAT_SECONDS):
+        self.job_queue = job_queue
+        self.worker = worker
+        self.ids = set(ids)
+        self.interval = interval
+        self.lost = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                lost = self.job_queue.heartbeat(self.worker, self.ids - self.lost)
+            except Exception as e:
+                log.warning(f"⚠️ Heartbeat failed, retrying: {e}")
+                continue
+            if lost:
+                log.warning(f"⚠️ Lost the lease on {len(lost)} job(s); another worker will redo them.")
+                self.lost |= lost
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def job_outcome(manifest, path):
+    """
+    (finished stages, error or None) for a resume after a pipeline pass.
+    """
+    record = manifest.get(path)
+    if record is None:
+        return [], "could not be read"
+    stages = [stage for stage in STAGES if record.get(stage)]
+    missing = pending_stages(record)
+    if not missing:
+        return stages, None
+    return stages, f"stopped before the {missing[0]} stage (see the worker log)"
+
+
+def rebuild_outputs(json_folder=JSON_FOLDER, summary_path=EXCEL_SUMMARY_PATH, index_folder=SEARCH_INDEX_FOLDER):
+    """
+    Rebuilds the summary sheet and the search index from every saved resume JSON.
+    """
+    from utils.pipeline import rebuild_summary
+
+    rebuild_summary(json_folder, summary_path)
+    if SEARCH_INDEX_ENABLED and index_folder:
+        from utils.search_index import rebuild_index
+
+        rebuild_index(json_folder, index_folder)
+
+
+def work(job_queue, worker=None, batch_size=JOB_CLAIM_BATCH, heartbeat_seconds=JOB_HEARTBEAT_SECONDS,
+         idle_seconds=JOB_IDLE_POLL_SECONDS, wait=False, stop_event=None, manifest_path=MANIFEST_PATH,
+         dedup_path=DEDUP_DB_PATH, summary_path=EXCEL_SUMMARY_PATH, index_folder=SEARCH_INDEX_FOLDER):
+    """
+    Leases and processes jobs until the queue is drained (or, with `wait`, until
+    `stop_event` is set). Returns the number of jobs this worker completed.
+    - While other workers still hold leases, this one waits too, so it can pick
+      up their jobs if they die.
+    - A batch in progress always finishes before the worker stops.
+    - Once the queue is drained, exactly one worker rebuilds the summary and
+      search index (whichever takes the queue's outputs-stale flag).
+    """
+    from utils.pipeline import run_pipeline
+
+    if heartbeat_seconds >= job_queue.lease_seconds:
+        raise ValueError(f"❌ Heartbeat interval ({heartbeat_seconds}s) must be shorter "
+                         f"than the lease ({job_queue.lease_seconds}s).")
+    worker = worker or default_worker_id()
+    stop_event = stop_event or threading.Event()
+    completed = 0
+
+    while not stop_event.is_set():
+        jobs = job_queue.claim(worker, limit=batch_size)
+        if not jobs:
+            stats = job_queue.stats()
+            if not stats[QUEUED] and not stats[LEASED] and job_queue.take_outputs_stale():
+                log.info("🏁 Queue drained, rebuilding the summary and search index.")
+                try:
+                    rebuild_outputs(summary_path=summary_path, index_folder=index_folder)
+                except Exception as e:
+                    log.error(f"❌ Could not rebuild the summary / search index ({e}); "
+                              f"run `python main.py summarize` to retry.")
+            if not stats[LEASED] and not wait:
+                break
+            stop_event.wait(idle_seconds)
+            continue
+
+        log.info(f"📦 {worker} leased {len(jobs)} job(s).")
+        failure = None
+        with LeaseKeeper(job_queue, worker, [job["id"] for job in jobs], heartbeat_seconds) as keeper:
+            try:
+                run_pipeline(
+                    [job["path"] for job in jobs], manifest_path=manifest_path, dedup_path=dedup_path,
+                    summary_path=None, index_folder=None,
+                )
+            except Exception as e:
+                log.error(f"❌ Pipeline pass failed: {e}")
+                failure = str(e)
+
+        manifest = RunManifest(manifest_path)
+        try:
+            outcomes = [(job, *job_outcome(manifest, job["path"])) for job in jobs if job["id"] not in keeper.lost]
+        finally:
+            manifest.close()
+
+        for job, stages, error in outcomes:
+            filename = os.path.basename(job["path"])
+            if error is None:
+                if job_queue.complete(worker, job["id"], stages):
+                    completed += 1
+                else:
+                    log.warning(f"⚠️ Lost the lease on {filename} before completing it; another worker redoes it.")
+                continue
+            state = job_queue.fail(worker, job["id"], failure or error, stages)
+            if state == DEAD:
+                log.error(f"☠️ {filename} failed {job['attempts']} time(s), dead-lettered: {failure or error}")
+            elif state == QUEUED:
+                log.warning(f"🔁 {filename} failed (attempt {job['attempts']}), re-queued: {failure or error}")
+
+    log.info(f"👋 Worker {worker} stopping after {completed} completed job(s).")
+    return completed
+
+
+def open_queue(args):
+    return open_job_queue(args.backend, args.queue_location, lease_seconds=args.lease,
+                          max_attempts=args.max_attempts)
+
+
+def run(args, filepaths=()):
+    """
+    Runs one worker in the foreground, first queueing `filepaths`.
+    SIGTERM stops it after the current batch.
+    """
+    stop_event = threading.Event()
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    try:
+        with open_queue(args) as job_queue:
+            if filepaths:
+                log.info(f"📥 Queued {job_queue.add(filepaths)} new or changed resume(s).")
+            work(
+                job_queue, worker=args.worker_id, batch_size=args.batch, heartbeat_seconds=args.heartbeat,
+                wait=args.wait, stop_event=stop_event, manifest_path=args.manifest, dedup_path=args.dedup_db,
+            )
+    except KeyboardInterrupt:
+        log.info("👋 Worker interrupted; its leases will expire and be retried.")
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def queue_command(args, filepaths=()):
+    """
+    `queue status|dead|retry|add`: inspect or manage the job queue.
+    """
+    with open_queue(args) as job_queue:
+        if args.action == "add":
+            print(f"📥 Queued {job_queue.add(filepaths)} new or changed resume(s).")
+        elif args.action == "retry":
+            print(f"🔁 Re-queued {job_queue.retry_dead()} dead-lettered job(s).")
+        elif args.action == "dead":
+            dead = job_queue.jobs(DEAD)
+            for job in dead:
+                print(f"☠️ {job['path']}  attempts={job['attempts']}  stages={','.join(job['stages']) or '-'}  "
+                      f"error={job['error']}")
+            print(f"{len(dead)} dead-lettered job(s).")
+        else:
+            stats = job_queue.stats()
+            print("  ".join(f"{state}={number}" for state, number in stats.items()))
+            for job in job_queue.jobs(LEASED):
+                print(f"⏳ {job['path']}  worker={job['worker']}  attempt={job['attempts']}")